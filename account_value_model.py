@@ -1,83 +1,283 @@
-from PyQt5.QtCore import Qt, QAbstractTableModel
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex
 from PyQt5.QtGui import QColor
+import sys
+
+# Field order of a row record; the first four are also the table's columns
+EXCHANGE, CURRENCY, POTENTIAL_GAIN, OPEN_ORDERS, AVAILABLE_COINS = range(5)
+
+HIGHLIGHT_COLOR = QColor(255, 165, 0)  # Orange-red color
+LEFT_ALIGNMENT = Qt.AlignLeft | Qt.AlignVCenter
+RIGHT_ALIGNMENT = Qt.AlignRight | Qt.AlignVCenter
 
 class AccountValueTableModel(QAbstractTableModel):
-    """Table model for displaying account values in a QTableView."""
-    
-    def __init__(self, account_values=None):
+    """
+    Table model for displaying account values in a QTableView.
+
+    Rows are stored column-wise in parallel lists, with exchange and currency
+    names interned and display strings formatted once per row update, so data()
+    is a plain list lookup. A dict maps each (exchange, currency) key to its
+    row, so updates find their rows without scanning the table.
+    """
+
+    def __init__(self, account_values=None, open_order_counts=None):
         super().__init__()
-        self._account_values = []
-        self._headers = ["Currency", "Potential Gain", "Open Orders"]
-        
+        self._headers = ["Exchange", "Currency", "Potential Gain", "Open Orders"]
+        self._alignments = [LEFT_ALIGNMENT, LEFT_ALIGNMENT, RIGHT_ALIGNMENT, RIGHT_ALIGNMENT]
+
+        # Columnar row storage: one list per field, plus cached display strings and highlight flags
+        self._fields = [[] for _ in range(AVAILABLE_COINS + 1)]
+        self._display = []
+        self._highlight = []
+        self._rows = {}
+
+        # Sort by potential gain value (descending) until the user picks a column
+        self._sort_column = POTENTIAL_GAIN
+        self._sort_order = Qt.DescendingOrder
+
         if account_values:
-            self.update_account_values(account_values)
-    
+            self.update_account_values(account_values, open_order_counts or {})
+
     def rowCount(self, parent=None):
-        return len(self._account_values)
-    
+        if parent is not None and parent.isValid():
+            return 0
+        return len(self._display)
+
     def columnCount(self, parent=None):
         return len(self._headers)
-    
+
     def headerData(self, section, orientation, role=Qt.DisplayRole):
         if orientation == Qt.Horizontal and role == Qt.DisplayRole:
             return self._headers[section]
         return None
-    
+
     def data(self, index, role=Qt.DisplayRole):
-        if not index.isValid() or not (0 <= index.row() < len(self._account_values)):
+        row = index.row()
+        if not index.isValid() or not (0 <= row < len(self._display)):
             return None
-        
-        item = self._account_values[index.row()]
-        column = index.column()
-        
+
         if role == Qt.DisplayRole:
-            if column == 0:  # Currency
-                return item["currency"]
-            elif column == 1:  # Potential Gain
-                return float(item['potential_gain'])  # Ensure it's a float
-            elif column == 2:  # Open Orders
-                return item['open_orders']  # Number of open orders
-        
+            return self._display[row][index.column()]
+
         elif role == Qt.TextAlignmentRole:
-            if column == 0:  # Currency
-                return Qt.AlignLeft | Qt.AlignVCenter
-            return Qt.AlignRight | Qt.AlignVCenter
-        
+            return self._alignments[index.column()]
+
         elif role == Qt.BackgroundRole:
-            # Check if there is an available balance but no open orders
-            if item['available_coins'] > 0 and item['open_orders'] == 0:
-                return QColor(255, 165, 0)  # Orange-red color
-        
+            # Available balance but no open orders
+            if self._highlight[row]:
+                return HIGHLIGHT_COLOR
+
         return None
-    
-    def update_account_values(self, account_values, open_orders):
+
+    def row_key(self, row):
+        """Return the (exchange, currency) pair shown in a row."""
+        return self._fields[EXCHANGE][row], self._fields[CURRENCY][row]
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        """Sort rows by a column, keeping selection and persistent indexes on the same items."""
+        self._sort_column = column
+        self._sort_order = order
+        self._resort()
+
+    def update_account_values(self, account_values, open_order_counts):
         """
         Update the model with new account values and open orders.
-        
+
+        Only rows whose values changed are touched: removed currencies emit
+        rowsRemoved, new ones are inserted at their sorted position and changed
+        ones emit dataChanged and move if their sort position changed.
+
         Args:
-            account_values (dict): Dictionary of account values from CoinbaseClient.
-            open_orders (list): List of open orders from CoinbaseClient.
+            account_values (dict): CoinInfo objects keyed by (exchange, currency) from ExchangeAggregator.
+            open_order_counts (dict): Number of open orders keyed by (exchange, currency).
         """
-        self.beginResetModel()
-        self._account_values = []
-        
-        # Calculate the number of open orders for each currency
-        open_orders_count = {}
-        for order in open_orders:
-            currency = order.product_id.split('-')[0]
-            if currency not in open_orders_count:
-                open_orders_count[currency] = 0
-            open_orders_count[currency] += 1
-        
-        for coin, coin_info in account_values.items():
-            self._account_values.append({
-                "currency": coin,
-                "potential_gain": coin_info.potential_gain,
-                "open_orders": open_orders_count.get(coin, 0),
-                "available_coins": coin_info.available_coins  # Store available coins
-            })
-        
-        # Sort by potential gain value (descending)
-        self._account_values.sort(key=lambda x: x["potential_gain"], reverse=True)
-        
-        self.endResetModel()
\ No newline at end of file
+        records = {
+            key: self._make_record(key, coin_info, open_order_counts.get(key, 0))
+            for key, coin_info in account_values.items()
+        }
+        removed = set(zip(self._fields[EXCHANGE], self._fields[CURRENCY])) - set(records)
+        self._apply_changes(records, removed)
+
+    def update_rows(self, account_values, open_order_counts, keys):
+        """
+        Apply an incremental update for a few (exchange, currency) keys.
+
+        Args:
+            account_values (dict): CoinInfo objects keyed by (exchange, currency).
+            open_order_counts (dict): Number of open orders keyed by (exchange, currency).
+            keys (set): The (exchange, currency) keys that changed.
+        """
+        records = {
+            key: self._make_record(key, account_values[key], open_order_counts.get(key, 0))
+            for key in keys if key in account_values
+        }
+        removed = {key for key in keys if key not in account_values}
+        self._apply_changes(records, removed)
+
+    @staticmethod
+    def _make_record(key, coin_info, open_orders):
+        return (sys.intern(key[0]), sys.intern(key[1]), float(coin_info.potential_gain), open_orders,
+                coin_info.available_coins)
+
+    # Columnar storage primitives
+
+    def _record(self, row):
+        return tuple(field[row] for field in self._fields)
+
+    def _find_row(self, key):
+        return self._rows[key]
+
+    def _reindex(self, start=0):
+        """Refresh the key to row index from row start on, after rows were inserted or deleted there."""
+        exchanges, currencies = self._fields[EXCHANGE], self._fields[CURRENCY]
+        for row in range(start, len(exchanges)):
+            self._rows[exchanges[row], currencies[row]] = row
+
+    @staticmethod
+    def _format(record):
+        return (record[EXCHANGE], record[CURRENCY], f"{record[POTENTIAL_GAIN]:.8f}", str(record[OPEN_ORDERS]))
+
+    def _set_row(self, row, record):
+        for field, value in zip(self._fields, record):
+            field[row] = value
+        self._display[row] = self._format(record)
+        self._highlight[row] = record[AVAILABLE_COINS] > 0 and record[OPEN_ORDERS] == 0
+
+    def _insert_row(self, row, record):
+        for field, value in zip(self._fields, record):
+            field.insert(row, value)
+        self._display.insert(row, self._format(record))
+        self._highlight.insert(row, record[AVAILABLE_COINS] > 0 and record[OPEN_ORDERS] == 0)
+        self._reindex(row)
+
+    def _delete_row(self, row):
+        del self._rows[self.row_key(row)]
+        for field in self._fields:
+            del field[row]
+        del self._display[row]
+        del self._highlight[row]
+        self._reindex(row)
+
+    def _permute(self, order):
+        """Reorder every column so that new row i holds old row order[i]."""
+        self._fields = [[field[row] for row in order] for field in self._fields]
+        self._display = [self._display[row] for row in order]
+        self._highlight = [self._highlight[row] for row in order]
+        self._reindex()
+
+    # Sorting and diffing
+
+    def _sort_key(self, record):
+        return record[self._sort_column], record[EXCHANGE], record[CURRENCY]
+
+    def _row_sort_key(self, row):
+        return self._fields[self._sort_column][row], self._fields[EXCHANGE][row], self._fields[CURRENCY][row]
+
+    def _comes_before(self, record, row):
+        if self._sort_order == Qt.DescendingOrder:
+            return self._sort_key(record) > self._row_sort_key(row)
+        return self._sort_key(record) < self._row_sort_key(row)
+
+    def _apply_changes(self, records, removed):
+        """Remove, update, move and insert rows so the model matches records without a reset."""
+        # Remove rows from the bottom up so earlier row numbers stay valid
+        removed_rows = sorted(self._rows[key] for key in removed if key in self._rows)
+        for row in reversed(removed_rows):
+            self.beginRemoveRows(QModelIndex(), row, row)
+            self._delete_row(row)
+            self.endRemoveRows()
+
+        inserted = []
+        moved = []
+        for key, record in records.items():
+            row = self._rows.get(key)
+            if row is None:
+                inserted.append(record)
+                continue
+
+            old_record = self._record(row)
+            if record == old_record:
+                continue
+
+            self._set_row(row, record)
+            self.dataChanged.emit(self.index(row, 0), self.index(row, self.columnCount() - 1))
+            if self._sort_key(record) != self._sort_key(old_record):
+                moved.append(key)
+
+        # Many changes are cheaper to handle with one re-sort than row-by-row moves
+        if len(inserted) + len(moved) > max(8, len(self._display) // 4):
+            if inserted:
+                first = len(self._display)
+                self.beginInsertRows(QModelIndex(), first, first + len(inserted) - 1)
+                for offset, record in enumerate(inserted):
+                    self._insert_row(first + offset, record)
+                self.endInsertRows()
+            self._resort()
+            return
+
+        # Rows still waiting to move are out of order, so they are skipped when placing the others
+        pending = set(moved)
+        for key in moved:
+            pending.discard(key)
+            self._move_to_sorted_position(self._find_row(key), pending)
+
+        for record in inserted:
+            position = self._sorted_position(record)
+            self.beginInsertRows(QModelIndex(), position, position)
+            self._insert_row(position, record)
+            self.endInsertRows()
+
+    def _sorted_position(self, record):
+        """Binary search for the row a new record belongs at."""
+        low, high = 0, len(self._display)
+        while low < high:
+            middle = (low + high) // 2
+            if self._comes_before(record, middle):
+                high = middle
+            else:
+                low = middle + 1
+        return low
+
+    def _move_to_sorted_position(self, row, pending):
+        """Move a row in front of the first settled row that sorts after it, found by binary search."""
+        record = self._record(row)
+        # The row itself and rows still waiting to move are out of order, so the search steps over them
+        skipped = {self._rows[key] for key in pending}
+        skipped.add(row)
+        count = len(self._display)
+        low, high = 0, count
+        while low < high:
+            middle = (low + high) // 2
+            probe = middle
+            while probe < high and probe in skipped:
+                probe += 1
+            if probe < high and not self._comes_before(record, probe):
+                low = probe + 1
+            else:
+                high = middle
+        destination = low
+        while destination < count and destination in skipped:
+            destination += 1
+
+        # Qt's destination is the row before which the record is placed in the original order
+        if destination in (row, row + 1):
+            return
+        self.beginMoveRows(QModelIndex(), row, row, QModelIndex(), destination)
+        self._delete_row(row)
+        self._insert_row(destination if destination < row else destination - 1, record)
+        self.endMoveRows()
+
+    def _resort(self):
+        """Re-sort all rows with a layout change so persistent indexes (and selection) follow their records."""
+        self.layoutAboutToBeChanged.emit()
+
+        old_indexes = self.persistentIndexList()
+
+        order = sorted(range(len(self._display)), key=self._row_sort_key,
+                       reverse=self._sort_order == Qt.DescendingOrder)
+        self._permute(order)
+
+        new_rows = {old_row: new_row for new_row, old_row in enumerate(order)}
+        new_indexes = [self.index(new_rows[index.row()], index.column()) for index in old_indexes]
+        self.changePersistentIndexList(old_indexes, new_indexes)
+
+        self.layoutChanged.emit()
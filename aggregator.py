@@ -0,0 +1,221 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from exchange_client import ExchangeClient
+from store import DEFAULT_DB_PATH, LocalStore
+
+
+class ExchangeAggregator:
+    """Runs several ExchangeClient instances side by side and merges their data."""
+
+    def __init__(self, clients, store=None):
+        """
+        Initialize the aggregator.
+
+        Args:
+            clients (list): ExchangeClient instances. The first one is the primary client
+                used for single-exchange features such as the Market Buy tab.
+            store (LocalStore, optional): History store shared by the clients, closed by close().
+
+        Raises:
+            ValueError: If there are no clients or two share a name.
+        """
+        if not clients:
+            raise ValueError("At least one exchange client is required.")
+
+        self.clients = {}
+        for client in clients:
+            if client.name in self.clients:
+                raise ValueError(f"Two exchanges are named {client.name}; give each a unique \"name\".")
+            self.clients[client.name] = client
+        self.primary = clients[0]
+        self.store = store
+
+        # Merged data
+        self.balances = {}
+        self.account_values = {}
+        self.total_potential_gain = 0
+        self.total_current_value = 0
+
+    @classmethod
+    def from_config_file(cls, config_file):
+        """
+        Create clients from a configuration file.
+
+        The file either describes a single exchange (exchange, api_key, api_secret)
+        or holds an "exchanges" list of such entries. Top-level keys other than
+        "exchanges" are used as defaults for every entry. Snapshots and fills are
+        recorded in the SQLite database at "history_db" (~/.field_orders/history.db
+        by default); set it to null to disable history. Snapshots are kept for
+        "history_retention_days" (90).
+
+        Args:
+            config_file (str): Path to the JSON configuration file.
+        """
+        with open(config_file, 'r') as file:
+            config = json.load(file)
+
+        history_db = config.pop('history_db', DEFAULT_DB_PATH)
+        retention_days = config.pop('history_retention_days', 90)
+        store = LocalStore(history_db, retention_days=retention_days) if history_db else None
+
+        entries = config.pop('exchanges', None)
+        if entries is None:
+            return cls([ExchangeClient(config=config, store=store)], store=store)
+        return cls([ExchangeClient(config={**config, **entry}, store=store) for entry in entries], store=store)
+
+    def _map_clients(self, fn):
+        """Run fn(client) for every client concurrently. Returns results keyed by client name."""
+        with ThreadPoolExecutor(max_workers=len(self.clients)) as executor:
+            futures = {name: executor.submit(fn, client) for name, client in self.clients.items()}
+            results = {}
+            for name, future in futures.items():
+                try:
+                    results[name] = future.result()
+                except Exception as e:
+                    print(f"Error refreshing {name}: {e}")
+            return results
+
+    def refresh_data(self):
+        """
+        Refresh every exchange concurrently and merge the results.
+
+        Returns:
+            dict: CoinInfo objects keyed by (exchange name, currency).
+        """
+        self._map_clients(lambda client: client.refresh_data())
+        return self._merge()
+
+    def restore_last_state(self):
+        """
+        Load every client's last recorded snapshot and merge them.
+
+        Returns:
+            int or None: Time in milliseconds of the oldest restored snapshot, or None
+            if no client had one.
+        """
+        timestamps = [stamp for stamp in (client.restore_last_state() for client in self.clients.values()) if stamp]
+        if not timestamps:
+            return None
+        self._merge()
+        return min(timestamps)
+
+    def close(self):
+        """Flush pending history writes."""
+        if self.store is not None:
+            self.store.close()
+
+    def _merge(self):
+        """Merge the clients' cached data, keyed by (exchange name, currency)."""
+        balances = {}
+        account_values = {}
+        for name, client in self.clients.items():
+            for currency, amount in client.balances.items():
+                balances[(name, currency)] = amount
+            for currency, coin_info in client.account_values.items():
+                account_values[(name, currency)] = coin_info
+
+        self.balances = balances
+        self.account_values = account_values
+        self.total_potential_gain = sum(client.total_potential_gain for client in self.clients.values())
+        self.total_current_value = sum(client.total_current_value for client in self.clients.values())
+        return account_values
+
+    def apply_stream_update(self, exchange, kind, payload):
+        """
+        Apply a streamed update from one exchange to its client and the merged data.
+
+        Args:
+            exchange (str): Name of the client the update belongs to.
+            kind (str): 'balance', 'orders', 'tickers', or 'refresh' for a REST poll.
+            payload: The value returned by the matching ccxt.pro watch_* call, or the poll's result.
+
+        Returns:
+            set: (exchange, currency) keys whose account values changed.
+        """
+        client = self.clients[exchange]
+        if kind == 'balance':
+            currencies = client.apply_balance_update(payload)
+        elif kind == 'orders':
+            currencies = client.apply_order_updates(payload)
+        elif kind == 'refresh':
+            currencies = client.apply_polled_update(payload)
+        else:
+            currencies = client.apply_ticker_update(payload)
+
+        self.total_potential_gain = sum(c.total_potential_gain for c in self.clients.values())
+        self.total_current_value = sum(c.total_current_value for c in self.clients.values())
+
+        changed = {(exchange, currency) for currency in currencies}
+        account_values = dict(self.account_values)
+        for key in changed:
+            if key[1] in client.account_values:
+                account_values[key] = client.account_values[key[1]]
+            else:
+                account_values.pop(key, None)
+            if key[1] in client.balances:
+                self.balances[key] = client.balances[key[1]]
+        self.account_values = account_values
+        return changed
+
+    @property
+    def open_orders(self):
+        return self.get_open_orders()
+
+    def get_open_orders(self):
+        """Return the merged list of open orders, each tagged with its 'exchange'."""
+        return [order for client in self.clients.values() for order in client.get_open_orders()]
+
+    def get_open_orders_for_currency(self, exchange, currency):
+        """Return the open orders for one currency on one exchange without scanning other orders."""
+        return self.clients[exchange].get_open_orders_for_currency(currency)
+
+    def open_order_counts(self, keys=None):
+        """
+        Return the number of open orders per (exchange, currency).
+
+        Args:
+            keys (iterable, optional): Only count these (exchange, currency) keys.
+        """
+        if keys is not None:
+            return {key: self.clients[key[0]].order_index.count_for_currency(key[1]) for key in keys}
+        return {
+            (name, currency): count
+            for name, client in self.clients.items()
+            for currency, count in client.order_index.currency_counts().items()
+        }
+
+    def cancel_all_orders(self, exchange, symbol=None, currency=None):
+        """Cancel orders on one exchange. See ExchangeClient.cancel_all_orders."""
+        return self.clients[exchange].cancel_all_orders(symbol=symbol, currency=currency)
+
+    def market_sell_entire_position(self, exchange, symbol):
+        """Market sell a position on one exchange. See ExchangeClient.market_sell_entire_position."""
+        return self.clients[exchange].market_sell_entire_position(symbol)
+
+    def get_chart_data(self, exchange, symbol, timeframe='1h'):
+        """Chart candles and order prices from one exchange. See ExchangeClient.get_chart_data."""
+        return self.clients[exchange].get_chart_data(symbol, timeframe)
+
+    def fetch_balances(self):
+        """Fetch balances on the primary exchange."""
+        return self.primary.fetch_balances()
+
+    def get_usd_pairs_under_threshold(self, *args, **kwargs):
+        """USD pairs under threshold on the primary exchange."""
+        return self.primary.get_usd_pairs_under_threshold(*args, **kwargs)
+
+    def market_buy_multiple(self, *args, **kwargs):
+        """Market buys on the primary exchange."""
+        return self.primary.market_buy_multiple(*args, **kwargs)
+
+    def get_fat_finger_pairs(self, *args, **kwargs):
+        """Fat Finger Catcher pairs on the primary exchange."""
+        return self.primary.get_fat_finger_pairs(*args, **kwargs)
+
+    def place_fat_finger_orders(self, *args, **kwargs):
+        """Fat Finger Catcher ladders on the primary exchange."""
+        return self.primary.place_fat_finger_orders(*args, **kwargs)
+
+    def scan_volume_spikes(self):
+        """Volume spike scan on the primary exchange."""
+        return self.primary.scan_volume_spikes()
@@ -1,74 +1,223 @@
+"""
+TradingView webhook bot placing spot orders through the desktop app's exchange backend.
+
+Usage, from the repository root (the app's modules, such as backends, are
+imported from there):
+    python -m aster.aster_bot
+
+Importing the module only reads the configuration; main() or configure()
+builds the exchange, so the module can be imported without credentials.
+"""
 import os
+import threading
 import time
-import hmac
-import hashlib
-from urllib.parse import urlencode
 from flask import Flask, request, jsonify
-import requests
+import ccxt
+from backends import GovernedExchange, create_exchange
+from rate_limiter import RateLimitGovernor
 
 app = Flask(__name__)
 
 # Configuration
 API_KEY = os.getenv('ASTER_API_KEY')
 API_SECRET = os.getenv('ASTER_API_SECRET')
-BASE_URL = 'https://sapi.asterdex.com/v1'  # Spot API base URL
-
-def get_timestamp():
-    """Generate current timestamp in ms."""
-    return int(time.time() * 1000)
-
-def sign_request(params):
-    """Generate HMAC-SHA256 signature for query string."""
-    query_string = urlencode(sorted(params.items()))
-    signature = hmac.new(
-        API_SECRET.encode('utf-8'),
-        query_string.encode('utf-8'),
-        hashlib.sha256
-    ).hexdigest()
-    return signature
-
-def get_account_balance():
-    """Fetch account balances."""
-    timestamp = get_timestamp()
-    params = {'timestamp': timestamp, 'recvWindow': 5000}
-    params['signature'] = sign_request(params)
-    headers = {'X-MBX-APIKEY': API_KEY}
+BASE_URL = os.getenv('ASTER_BASE_URL', 'https://sapi.asterdex.com/v1')  # Spot API base URL
+
+# Exchange the alerts trade on: Aster's native backend by default, or any ccxt exchange id
+EXCHANGE = os.getenv('WEBHOOK_EXCHANGE', 'aster')
+
+# HTTP connection pool: sockets stay open between webhooks, so an order costs one round trip
+POOL_SIZE = int(os.getenv('ASTER_POOL_SIZE', '10'))
+TIMEOUT = (float(os.getenv('ASTER_CONNECT_TIMEOUT', '3.05')), float(os.getenv('ASTER_READ_TIMEOUT', '10')))
+
+# Seconds a fetched account balance is served from cache
+BALANCE_TTL = float(os.getenv('ASTER_BALANCE_TTL', '5'))
+
+# Seconds between reloads of the markets orders are checked against, and between retries until they first load
+EXCHANGE_INFO_TTL = float(os.getenv('ASTER_EXCHANGE_INFO_TTL', '3600'))
+MARKETS_RETRY_INTERVAL = 30
+
+# Milliseconds a signed request stays valid, and seconds between server clock syncs
+RECV_WINDOW = int(os.getenv('ASTER_RECV_WINDOW', '5000'))
+TIME_SYNC_INTERVAL = float(os.getenv('ASTER_TIME_SYNC_INTERVAL', '60'))
+
+# Requests per second sent to the exchange; 0 follows the backend's advertised rate limit
+RATE_LIMIT = float(os.getenv('ASTER_RATE_LIMIT', '0'))
+
+# Exchange alerts trade on, set by configure()
+exchange = None
+
+_balance_lock = threading.Lock()
+_balance_cache = {'balance': None, 'fetched_at': 0.0}
+_markets_stop = threading.Event()
+
+def create_governed_exchange():
+    """
+    Build the exchange from the environment: the desktop app's backend (for Aster its connection
+    pool, signer, server clock and symbol rules, for other exchanges ccxt) behind the rate limit governor.
+    """
+    backend = create_exchange({
+        'exchange': EXCHANGE,
+        'api_key': API_KEY,
+        'api_secret': API_SECRET,
+        'base_url': BASE_URL,
+        'pool_size': POOL_SIZE,
+        'timeout': TIMEOUT,
+        'recv_window': RECV_WINDOW,
+        'time_sync_interval': TIME_SYNC_INTERVAL,
+        'exchange_info_ttl': EXCHANGE_INFO_TTL,
+    })
+    governor = RateLimitGovernor(RATE_LIMIT, RATE_LIMIT) if RATE_LIMIT else RateLimitGovernor.from_exchange(backend)
+    return GovernedExchange(backend, governor)
+
+def configure(governed_exchange=None):
+    """
+    Set the exchange alerts trade on, built from the environment if None, and return the Flask app.
+    """
+    global exchange
+    exchange = governed_exchange or create_governed_exchange()
+    _balance_cache['balance'] = None
+    return app
+
+def get_account_balance(max_age=BALANCE_TTL):
+    """
+    Fetch free, used and total balances, served from cache if fetched less than max_age seconds ago.
+    Concurrent callers with a stale cache wait for a single fetch.
+    """
+    with _balance_lock:
+        if _balance_cache['balance'] is not None and time.monotonic() - _balance_cache['fetched_at'] < max_age:
+            return _balance_cache['balance']
+
+        try:
+            balance = exchange.fetch_balance()
+        except ccxt.BaseError as e:
+            print(f"Balance fetch failed: {e}")
+            return None
+
+        _balance_cache['balance'] = {key: balance[key] for key in ('free', 'used', 'total')}
+        _balance_cache['fetched_at'] = time.monotonic()
+        return _balance_cache['balance']
+
+def invalidate_balance():
+    """Drop the cached balance, e.g. after an order changed it."""
+    with _balance_lock:
+        _balance_cache['balance'] = None
+
+def load_markets():
+    """Reload the markets alerts are checked against. On failure the previous ones are kept."""
     try:
-        response = requests.get(f'{BASE_URL}/account', params=params, headers=headers)
-        response.raise_for_status()
-        return response.json()
-    except requests.RequestException as e:
-        print(f"Balance fetch failed: {e}")
-        return None
-
-def place_spot_order(action, symbol, amount):
+        exchange.load_markets(reload=True)
+        return True
+    except ccxt.BaseError as e:
+        print(f"Market load failed: {e}")
+        return False
+
+def _refresh_markets():
+    while not _markets_stop.wait(EXCHANGE_INFO_TTL if exchange.markets else MARKETS_RETRY_INTERVAL):
+        load_markets()
+
+def start():
+    """
+    Load the markets and reload them every ASTER_EXCHANGE_INFO_TTL seconds in the background.
+    The first balance fetch opens a pooled connection and syncs the server clock before any alert arrives.
+    Builds the exchange from the environment unless configure() set one.
+    """
+    if exchange is None:
+        configure()
+    load_markets()
+    get_account_balance()
+    _markets_stop.clear()
+    threading.Thread(target=_refresh_markets, name="MarketRefresh", daemon=True).start()
+
+def stop():
+    _markets_stop.set()
+    exchange.close()
+
+def market_for(market_id):
+    """The market of an exchange symbol such as 'ETHUSDC', or None."""
+    markets = (exchange.markets_by_id or {}).get(market_id)
+    return markets[0] if markets else None
+
+def validate_order(action, market, amount):
+    """
+    Check a market order against the market's limits and round its amount down to what the exchange accepts.
+    Buys are sized in the quote currency and sells in the base currency. The minimum notional of a
+    sell cannot be checked without a price and is left to the exchange.
+    Returns (amount, None), or (None, error message).
+    """
+    market_id = market['id']
+    if market.get('active') is False:
+        return None, f'{market_id} is not trading'
+    limits = market.get('limits') or {}
+    try:
+        if action == 'buy':
+            value = float(exchange.cost_to_precision(market['symbol'], amount))
+            min_cost = (limits.get('cost') or {}).get('min')
+            if value <= 0 or (min_cost and value < min_cost):
+                return None, f'Amount {amount} is below the minimum notional {min_cost} for {market_id}'
+        else:
+            value = float(exchange.amount_to_precision(market['symbol'], amount))
+            amount_limits = limits.get('amount') or {}
+            if value <= 0 or (amount_limits.get('min') and value < amount_limits['min']):
+                return None, f'Quantity {amount} is below the minimum {amount_limits.get("min")} for {market_id}'
+            if amount_limits.get('max') and value > amount_limits['max']:
+                return None, f'Quantity {amount} is above the maximum {amount_limits["max"]} for {market_id}'
+    except ccxt.BaseError as e:
+        # ccxt raises when rounding leaves less than the smallest amount
+        return None, str(e)
+    return value, None
+
+def place_spot_order(action, symbol, amount, client_order_id=None):
     """
     Place a spot market order.
     - action: 'buy' or 'sell'
-    - symbol: e.g., 'ETHUSDC'
+    - symbol: unified market symbol, e.g. 'ETH/USDC'
     - amount: quote amount for buy (USDC), base amount for sell (ETH)
+    - client_order_id: optional client order id; the exchange rejects a second order with the same one
+    Returns the ccxt order, or a dict with the error.
     """
-    timestamp = get_timestamp()
-    side = 'BUY' if action.lower() == 'buy' else 'SELL'
-    params = {
-        'symbol': symbol,
-        'side': side,
-        'type': 'MARKET',
-        'timestamp': timestamp,
-        'recvWindow': 5000
-    }
-    if action.lower() == 'buy':
-        params['quoteOrderQty'] = amount  # Buy with fixed USDC amount
-    else:
-        params['quantity'] = amount  # Sell fixed token amount
-    params['signature'] = sign_request(params)
-    headers = {'X-MBX-APIKEY': API_KEY}
+    params = {'clientOrderId': client_order_id} if client_order_id else {}
+    try:
+        if action == 'buy':
+            return exchange.create_market_buy_order_with_cost(symbol, amount, params)
+        return exchange.create_market_sell_order(symbol, amount, params)
+    except ccxt.BaseError as e:
+        return {'error': str(e), 'type': type(e).__name__}
+
+def parse_alert(data):
+    """
+    Validate a TradingView alert against the exchange's markets.
+    Returns ((action, symbol, amount), None) for a valid alert, with the unified
+    symbol and amount rounded down to the market's step, or (None, error message).
+    """
+    if not isinstance(data, dict):
+        return None, 'Invalid JSON'
+    action = data.get('action')
+    symbol = data.get('symbol')
     try:
-        response = requests.post(f'{BASE_URL}/order', params=params, headers=headers)
-        response.raise_for_status()
-        return response.json()
-    except requests.RequestException as e:
-        return {'error': str(e), 'statusCode': response.status_code if response else None}
+        amount = float(data.get('amount', 0))
+    except (TypeError, ValueError):
+        amount = 0
+
+    if not action or not symbol or amount <= 0:
+        return None, 'Missing action, symbol, or valid amount'
+
+    action = action.lower()
+    if action not in ['buy', 'sell']:
+        return None, 'Action must be "buy" or "sell"'
+
+    if not symbol.endswith('USDC'):  # The bot only trades USDC pairs
+        return None, 'Symbol must end with USDC (e.g., ETHUSDC)'
+
+    if not exchange.markets:
+        return None, 'Markets are not loaded yet'
+    market = market_for(symbol)
+    if market is None:
+        return None, f'Unknown symbol {symbol}'
+    amount, error = validate_order(action, market, amount)
+    if error:
+        return None, error
+    return (action, market['symbol'], amount), None
 
 @app.route('/webhook', methods=['POST'])
 def webhook():
@@ -76,42 +225,41 @@ def webhook():
     if not request.is_json:
         return jsonify({'error': 'Invalid JSON'}), 400
     
-    data = request.get_json()
-    action = data.get('action')
-    symbol = data.get('symbol')
-    amount = float(data.get('amount', 0))
-    
-    if not action or not symbol or amount <= 0:
-        return jsonify({'error': 'Missing action, symbol, or valid amount'}), 400
-    
-    if action.lower() not in ['buy', 'sell']:
-        return jsonify({'error': 'Action must be "buy" or "sell"'}), 400
-    
-    # Validate symbol (optional: fetch valid symbols from /exchangeInfo)
-    if not symbol.endswith('USDC'):  # Basic validation; enhance as needed
-        return jsonify({'error': 'Symbol must end with USDC (e.g., ETHUSDC)'}), 400
+    order, error = parse_alert(request.get_json())
+    if error:
+        return jsonify({'error': error}), 400
+    action, symbol, amount = order
     
-    # Check balance (optional)
-    balance = get_account_balance()
-    if balance:
-        print(f"Current balances: {balance}")
-    
-    # Place order
+    # Place order straight away; balances are served separately from /balance
     result = place_spot_order(action, symbol, amount)
     
-    if 'orderId' in result:
-        print(f"Order placed: {action} {amount} {symbol} - Order ID: {result['orderId']}")
+    if result.get('id') is not None:
+        invalidate_balance()
+        print(f"Order placed: {action} {amount} {symbol} - Order ID: {result['id']}")
         return jsonify({'status': 'success', 'order': result}), 200
     else:
         print(f"Order failed: {result}")
         return jsonify({'status': 'error', 'details': result}), 500
 
+@app.route('/balance', methods=['GET'])
+def balance():
+    """Account balances, cached for ASTER_BALANCE_TTL seconds."""
+    result = get_account_balance()
+    if result is None:
+        return jsonify({'status': 'error', 'details': 'Balance fetch failed'}), 502
+    return jsonify(result), 200
+
 @app.route('/', methods=['GET'])
 def health():
     """Health check endpoint."""
     return jsonify({'status': 'Bot running'}), 200
 
-if __name__ == '__main__':
+def main():
     if not API_KEY or not API_SECRET:
         raise ValueError("Set ASTER_API_KEY and ASTER_API_SECRET environment variables.")
-    app.run(host='0.0.0.0', port=5000, debug=False)
\ No newline at end of file
+    configure()
+    start()
+    app.run(host='0.0.0.0', port=5000, debug=False)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,202 @@
+"""
+Async webhook server for the Aster bot.
+
+The webhook validates an alert, queues the order and answers straight away;
+worker tasks place the queued orders through the Flask bot's exchange
+backend, each on its own thread of a pool. Each symbol always maps to the
+same worker, so one symbol's orders are placed in the order their alerts
+arrived while different symbols are placed concurrently. Alerts carrying an idempotency key (the Idempotency-Key header
+or an "id" field in the alert) are placed at most once per key.
+
+Usage:
+    python -m aster.async_server
+
+Runs as a single process: the queue and the idempotency keys live in memory,
+so do not put several processes behind one port.
+"""
+import asyncio
+import hashlib
+import os
+import re
+import time
+import uuid
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from aiohttp import web
+from .aster_bot import API_KEY, API_SECRET, parse_alert, place_spot_order, start, stop
+
+# Concurrent order workers, orders allowed to wait in the queue, and seconds an idempotency key is remembered
+WORKERS = int(os.getenv('ASTER_WORKERS', '8'))
+QUEUE_SIZE = int(os.getenv('ASTER_QUEUE_SIZE', '1000'))
+DEDUP_TTL = float(os.getenv('ASTER_DEDUP_TTL', '3600'))
+
+# newClientOrderId must be 1-36 of these characters
+CLIENT_ORDER_ID = re.compile(r'^[.A-Z:/a-z0-9_-]{1,36}$')
+
+def client_order_id(key):
+    """Turn an idempotency key into a valid newClientOrderId, hashing keys that are not one already."""
+    if CLIENT_ORDER_ID.match(key):
+        return key
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()[:32]
+
+class OrderQueue:
+    """
+    Bounded order queue drained by worker tasks, sharded by symbol.
+
+    Every submitted order is tracked under its idempotency key (a random one
+    if the alert had none) until DEDUP_TTL passes, so its state can be looked
+    up and a resent alert is not placed again. An alert whose earlier order
+    failed may be resent with the same key.
+    """
+
+    def __init__(self, place=place_spot_order, workers=WORKERS, maxsize=QUEUE_SIZE, dedup_ttl=DEDUP_TTL):
+        """
+        Args:
+            place (callable): Blocking order function with place_spot_order's arguments and result.
+            workers (int): Number of worker tasks and threads, i.e. orders placed concurrently.
+            maxsize (int): Orders allowed to wait before new alerts are refused.
+            dedup_ttl (float): Seconds an order stays tracked under its key.
+        """
+        self.place = place
+        self.maxsize = maxsize
+        self.dedup_ttl = dedup_ttl
+        self.pending = 0
+        self.placed = 0
+        self.failed = 0
+        self.orders = OrderedDict()
+        self._shards = [asyncio.Queue() for _ in range(workers)]
+        self._tasks = []
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='OrderWorker')
+
+    def start(self):
+        self._tasks = [asyncio.ensure_future(self._work(shard)) for shard in self._shards]
+
+    async def stop(self):
+        """Cancel the workers. Orders still queued are dropped."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._executor.shutdown(wait=False)
+
+    def submit(self, order, key=None):
+        """
+        Queue an order unless its key was already submitted.
+
+        Args:
+            order (tuple): (action, symbol, amount) from parse_alert.
+            key (str, optional): Idempotency key of the alert.
+
+        Returns:
+            tuple: (key, entry, queued). entry is the tracked order dict with
+            order, state ('queued', 'placing', 'placed' or 'failed') and result;
+            queued is False for a duplicate.
+
+        Raises:
+            asyncio.QueueFull: If maxsize orders are already waiting.
+        """
+        self._expire()
+        key = key or uuid.uuid4().hex
+        entry = self.orders.get(key)
+        if entry is not None and entry['state'] != 'failed':
+            return key, entry, False
+        if self.pending >= self.maxsize:
+            raise asyncio.QueueFull()
+
+        entry = {'order': order, 'state': 'queued', 'result': None, 'submitted_at': time.monotonic()}
+        self.orders.pop(key, None)
+        self.orders[key] = entry
+        self.pending += 1
+        symbol = order[1]
+        self._shards[zlib.crc32(symbol.encode('utf-8')) % len(self._shards)].put_nowait((key, entry))
+        return key, entry, True
+
+    def _expire(self):
+        # Entries are kept in submission order, so expired ones are at the front
+        cutoff = time.monotonic() - self.dedup_ttl
+        while self.orders:
+            key, entry = next(iter(self.orders.items()))
+            if entry['submitted_at'] >= cutoff or entry['state'] in ('queued', 'placing'):
+                break
+            del self.orders[key]
+
+    async def _work(self, shard):
+        while True:
+            key, entry = await shard.get()
+            action, symbol, amount = entry['order']
+            entry['state'] = 'placing'
+            try:
+                result = await asyncio.get_running_loop().run_in_executor(
+                    self._executor, self.place, action, symbol, amount, client_order_id(key))
+            except Exception as e:
+                result = {'error': str(e), 'type': type(e).__name__}
+            entry['result'] = result
+            self.pending -= 1
+            if result.get('id') is not None:
+                entry['state'] = 'placed'
+                self.placed += 1
+                print(f"Order placed: {action} {amount} {symbol} - Order ID: {result['id']}")
+            else:
+                entry['state'] = 'failed'
+                self.failed += 1
+                print(f"Order failed: {result}")
+
+ORDERS = web.AppKey('orders', OrderQueue)
+
+async def webhook(request):
+    """Handle TradingView alert POST: validate, queue and acknowledge."""
+    try:
+        data = await request.json()
+    except ValueError:
+        return web.json_response({'error': 'Invalid JSON'}, status=400)
+
+    order, error = parse_alert(data)
+    if error:
+        return web.json_response({'error': error}, status=400)
+
+    key = request.headers.get('Idempotency-Key') or data.get('id')
+    try:
+        key, entry, queued = request.app[ORDERS].submit(order, str(key) if key else None)
+    except asyncio.QueueFull:
+        return web.json_response({'status': 'error', 'details': 'Order queue full'}, status=503,
+                                 headers={'Retry-After': '1'})
+    body = {'status': 'queued' if queued else 'duplicate', 'id': key, 'state': entry['state']}
+    return web.json_response(body, status=202 if queued else 200)
+
+async def order_status(request):
+    """State and exchange response of a submitted order."""
+    entry = request.app[ORDERS].orders.get(request.match_info['key'])
+    if entry is None:
+        return web.json_response({'error': 'Unknown order'}, status=404)
+    return web.json_response({'state': entry['state'], 'result': entry['result']})
+
+async def health(request):
+    """Health check endpoint, with queue counters."""
+    orders = request.app[ORDERS]
+    return web.json_response({'status': 'Bot running', 'pending': orders.pending,
+                              'placed': orders.placed, 'failed': orders.failed})
+
+def create_app(place=place_spot_order, workers=WORKERS, queue_size=QUEUE_SIZE, dedup_ttl=DEDUP_TTL):
+    """Build the aiohttp application. The exchange backend is started and closed with the app."""
+    app = web.Application()
+
+    async def lifecycle(app):
+        # Loading the markets and the first balance block, so run them off the event loop
+        await asyncio.get_running_loop().run_in_executor(None, start)
+        app[ORDERS] = OrderQueue(place, workers, queue_size, dedup_ttl)
+        app[ORDERS].start()
+        yield
+        await app[ORDERS].stop()
+        stop()
+
+    app.cleanup_ctx.append(lifecycle)
+    app.router.add_post('/webhook', webhook)
+    app.router.add_get('/orders/{key}', order_status)
+    app.router.add_get('/', health)
+    return app
+
+if __name__ == '__main__':
+    if not API_KEY or not API_SECRET:
+        raise ValueError("Set ASTER_API_KEY and ASTER_API_SECRET environment variables.")
+    web.run_app(create_app(), host='0.0.0.0', port=5000)
@@ -0,0 +1,172 @@
+"""
+Webhook latency benchmark against a local mock of the Aster spot API.
+
+Compares the old order path (a new connection per request, plus a balance
+fetch before every order) with the bot's pooled session and cached balance.
+The mock charges --handshake-ms once per new connection, standing in for the
+TCP and TLS handshakes of the real API, and --latency-ms per request.
+
+Usage:
+    python -m aster.bench [--requests 200] [--handshake-ms 30] [--latency-ms 5]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import socket
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+class MockAsterHandler(BaseHTTPRequestHandler):
+    """Answers the Aster endpoints the bot uses with canned JSON."""
+
+    protocol_version = 'HTTP/1.1'
+    handshake = 0.0
+    latency = 0.0
+    # Milliseconds the mock's clock runs ahead of the local one
+    clock_skew = 0.0
+    order_ids = iter(range(1, 1 << 62))
+    # (symbol, newClientOrderId) of every order received, in arrival order
+    received = []
+
+    def setup(self):
+        super().setup()
+        # Headers and body are written separately; without this, Nagle's algorithm adds ~40 ms per reply
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        time.sleep(self.handshake)
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, body, status=200):
+        time.sleep(self.latency)
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        if self.path.startswith('/v1/account'):
+            self._reply({'balances': [{'asset': 'USDC', 'free': '1000', 'locked': '0'}]})
+        elif self.path.startswith('/v1/time'):
+            self._reply({'serverTime': int(time.time() * 1000 + self.clock_skew)})
+        elif self.path.startswith('/v1/exchangeInfo'):
+            self._reply({'symbols': [self._symbol(base) for base in ['ETH'] + [f'COIN{i}' for i in range(1000)]]})
+        else:
+            self.send_error(404)
+
+    @staticmethod
+    def _symbol(base):
+        return {
+            'symbol': f'{base}USDC', 'status': 'TRADING', 'baseAsset': base, 'quoteAsset': 'USDC',
+            'quoteAssetPrecision': 8,
+            'filters': [
+                {'filterType': 'LOT_SIZE', 'minQty': '0.001', 'maxQty': '100000', 'stepSize': '0.001'},
+                {'filterType': 'MIN_NOTIONAL', 'minNotional': '5'},
+            ],
+        }
+
+    def do_POST(self):
+        # Drain any request body so the connection can be reused
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            self.rfile.read(length)
+        if self.path.startswith('/v1/order'):
+            query = parse_qs(urlsplit(self.path).query)
+            # Reject timestamps outside recvWindow, like the exchange
+            now = time.time() * 1000 + self.clock_skew
+            timestamp = int(query.get('timestamp', [0])[0])
+            if not now - int(query.get('recvWindow', [5000])[0]) <= timestamp <= now + 1000:
+                self._reply({'code': -1021, 'msg': "Timestamp for this request is outside of the recvWindow."}, 400)
+                return
+            symbol = query.get('symbol', [None])[0]
+            client_order_id = query.get('newClientOrderId', [None])[0]
+            self.received.append((symbol, client_order_id))
+            self._reply({'symbol': symbol, 'orderId': next(self.order_ids), 'clientOrderId': client_order_id,
+                         'transactTime': int(now), 'status': 'FILLED', 'type': 'MARKET',
+                         'side': query.get('side', [''])[0], 'origQty': '1', 'executedQty': '1',
+                         'cummulativeQuoteQty': query.get('quoteOrderQty', ['10'])[0]})
+        else:
+            self.send_error(404)
+
+
+def start_mock_server(handshake_ms, latency_ms, clock_skew_ms=0.0):
+    """Start the mock API on a free local port. Returns the server; its base URL is server.base_url."""
+    MockAsterHandler.handshake = handshake_ms / 1000.0
+    MockAsterHandler.latency = latency_ms / 1000.0
+    MockAsterHandler.clock_skew = clock_skew_ms
+    server = ThreadingHTTPServer(('127.0.0.1', 0), MockAsterHandler)
+    server.daemon_threads = True
+    server.base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def measure(fn, count):
+    samples = []
+    # The bot logs every order; keep the report readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(count):
+            start = time.perf_counter()
+            fn()
+            samples.append(time.perf_counter() - start)
+    return samples
+
+
+def report(name, samples):
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(f"{name}: median {statistics.median(samples) * 1000:.1f} ms, p95 {p95 * 1000:.1f} ms "
+          f"({len(samples)} webhooks)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--handshake-ms', type=float, default=30.0)
+    parser.add_argument('--latency-ms', type=float, default=5.0)
+    args = parser.parse_args()
+
+    server = start_mock_server(args.handshake_ms, args.latency_ms)
+    os.environ['ASTER_BASE_URL'] = server.base_url
+    os.environ.setdefault('ASTER_API_KEY', 'benchmark')
+    os.environ.setdefault('ASTER_API_SECRET', 'benchmark')
+    # The mock has no rate limit; measure the webhook, not the governor's pacing
+    os.environ.setdefault('ASTER_RATE_LIMIT', '100000')
+
+    from . import aster_bot
+    import requests
+
+    def unpooled_webhook():
+        # The order path before pooling: fresh connections and a balance fetch per alert
+        signer = aster_bot.exchange.exchange.client
+        headers = {'X-MBX-APIKEY': aster_bot.API_KEY}
+        requests.get(f'{server.base_url}/account', params=signer.sign({}), headers=headers).json()
+        params = signer.sign({'symbol': 'ETHUSDC', 'side': 'BUY', 'type': 'MARKET', 'quoteOrderQty': 10})
+        requests.post(f'{server.base_url}/order', params=params, headers=headers).json()
+
+    client = aster_bot.configure().test_client()
+    aster_bot.load_markets()
+
+    def pooled_webhook():
+        response = client.post('/webhook', json={'action': 'buy', 'symbol': 'ETHUSDC', 'amount': 10})
+        assert response.status_code == 200, response.get_json()
+
+    # Warm up both paths so imports and the first pooled connection are not measured
+    measure(unpooled_webhook, 1)
+    measure(pooled_webhook, 1)
+
+    report("new connection per request", measure(unpooled_webhook, args.requests))
+    report("pooled session", measure(pooled_webhook, args.requests))
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+from urllib.parse import urlencode
+import requests
+from requests.adapters import HTTPAdapter
+from .exchange_info import ExchangeInfoCache
+from .signing import RequestSigner, ServerClock, is_timestamp_error
+
+DEFAULT_BASE_URL = 'https://sapi.asterdex.com/v1'
+
+
+def create_session(pool_size=10, api_key=None):
+    """Create a keep-alive HTTP session with a connection pool of pool_size sockets."""
+    session = requests.Session()
+    # No automatic retries: a retried order POST could place the order twice
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    if api_key:
+        session.headers['X-MBX-APIKEY'] = api_key
+    return session
+
+
+def _json_or_none(response):
+    try:
+        return response.json()
+    except ValueError:
+        return None
+
+
+class AsterClient:
+    """
+    Pooled, signed access to the Aster spot REST API.
+
+    Holds the layers every Aster caller needs: a keep-alive connection pool,
+    the precomputed request signer, the server clock offset and the cached
+    symbol rules. The webhook bot and the desktop app's AsterBackend both
+    build on it.
+    """
+
+    def __init__(self, api_key, api_secret, base_url=DEFAULT_BASE_URL, pool_size=10, timeout=(3.05, 10),
+                 recv_window=5000, time_sync_interval=60, exchange_info_ttl=3600):
+        """
+        Args:
+            api_key (str): API key, sent with every request.
+            api_secret (str): API secret used to sign private requests.
+            base_url (str): Spot API base URL.
+            pool_size (int): Maximum pooled connections.
+            timeout (tuple): requests (connect, read) timeout in seconds.
+            recv_window (int): Milliseconds a signed request stays valid.
+            time_sync_interval (float): Seconds between server clock syncs.
+            exchange_info_ttl (float): Seconds between symbol rule refreshes.
+        """
+        self.base_url = base_url
+        self.timeout = timeout
+        self.recv_window = recv_window
+        self.session = create_session(pool_size, api_key)
+        # The secret is checked by the caller; an empty one only allows public requests
+        self.signer = RequestSigner(api_secret or '')
+        self.clock = ServerClock(self.session, base_url, time_sync_interval, timeout=timeout)
+        self.exchange_info = ExchangeInfoCache(self.session, base_url, exchange_info_ttl, timeout)
+        # Headers of the latest response, read for the exchange's rate limit accounting
+        self.last_response_headers = {}
+
+    def start(self):
+        """Load the symbol rules and sync the clock, then keep both current in the background."""
+        self.exchange_info.start()
+        self.clock.start()
+
+    def close(self):
+        self.exchange_info.stop()
+        self.clock.stop()
+        self.session.close()
+
+    def sign(self, params):
+        """
+        Return params with timestamp, recvWindow and signature added, in the order they were signed in.
+        """
+        params = dict(params, timestamp=self.clock.now(), recvWindow=self.recv_window)
+        params = dict(sorted(params.items()))
+        params['signature'] = self.signer.sign(urlencode(params))
+        return params
+
+    def request(self, method, path, params=None, signed=False):
+        """
+        Send a request and return its decoded JSON body.
+
+        A signed request rejected for its timestamp was not executed, so it is
+        resent once after resyncing the clock.
+
+        Args:
+            method (str): HTTP method.
+            path (str): Path below the base URL, e.g. '/order'.
+            params (dict, optional): Query parameters.
+            signed (bool): Whether to timestamp and sign the request.
+
+        Raises:
+            requests.RequestException: On connection failures and error responses.
+        """
+        for attempt in range(2):
+            query = self.sign(params or {}) if signed else params
+            response = self.session.request(method, f'{self.base_url}{path}', params=query, timeout=self.timeout)
+            self.last_response_headers = response.headers
+            if (signed and attempt == 0 and response.status_code == 400
+                    and is_timestamp_error(_json_or_none(response))):
+                self.clock.sync()
+                continue
+            response.raise_for_status()
+            return response.json()
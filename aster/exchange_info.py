@@ -0,0 +1,112 @@
+import threading
+import time
+from decimal import Decimal, InvalidOperation
+import requests
+
+# Seconds between retries while exchange info has never loaded
+RETRY_INTERVAL = 30
+
+
+def _decimal(value):
+    try:
+        return Decimal(str(value))
+    except (InvalidOperation, TypeError, ValueError):
+        return Decimal(0)
+
+
+def parse_symbol(info):
+    """
+    Extract the trading rules of one exchangeInfo symbol entry.
+
+    Zero values mean the exchange sets no such limit.
+
+    Returns:
+        dict: status, step (base quantity step), min_qty, max_qty, min_notional,
+        quote_step (quote amount step) and tick (price step) as Decimals, except status.
+    """
+    filters = {f.get('filterType'): f for f in info.get('filters', [])}
+    lot = filters.get('LOT_SIZE', {})
+    # Market orders may have their own lot size; its step is often 0, meaning LOT_SIZE's applies
+    market_lot = filters.get('MARKET_LOT_SIZE', {})
+    notional = filters.get('MIN_NOTIONAL') or filters.get('NOTIONAL') or {}
+    price = filters.get('PRICE_FILTER', {})
+    precision = info.get('quoteAssetPrecision', info.get('quotePrecision'))
+    return {
+        'status': info.get('status', 'TRADING'),
+        'step': _decimal(market_lot.get('stepSize')) or _decimal(lot.get('stepSize')),
+        'min_qty': max(_decimal(market_lot.get('minQty')), _decimal(lot.get('minQty'))),
+        'max_qty': _decimal(market_lot.get('maxQty')) or _decimal(lot.get('maxQty')),
+        'min_notional': _decimal(notional.get('minNotional', notional.get('notional'))),
+        'quote_step': Decimal(1).scaleb(-int(precision)) if precision is not None else Decimal(0),
+        'tick': _decimal(price.get('tickSize')),
+    }
+
+
+class ExchangeInfoCache:
+    """
+    Symbol rules from /exchangeInfo, kept current by a background thread.
+
+    AsterBackend builds its ccxt-style markets from the cached rules, so
+    orders are checked and rounded against them before they are signed and
+    sent.
+    """
+
+    def __init__(self, session, base_url, ttl=3600, timeout=None):
+        """
+        Args:
+            session (requests.Session): Session the exchange info is fetched with.
+            base_url (str): API base URL, e.g. https://sapi.asterdex.com/v1.
+            ttl (float): Seconds between refreshes.
+            timeout (tuple, optional): requests (connect, read) timeout.
+        """
+        self.session = session
+        self.base_url = base_url
+        self.ttl = ttl
+        self.timeout = timeout
+        self.info = None
+        self.symbols = {}
+        self.loaded_at = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def loaded(self):
+        return self.loaded_at is not None
+
+    def load(self):
+        """
+        Fetch /exchangeInfo and replace the cached rules and raw response
+        (info). On failure the previous ones are kept.
+
+        Returns:
+            bool: Whether the rules were refreshed.
+        """
+        try:
+            response = self.session.get(f'{self.base_url}/exchangeInfo', timeout=self.timeout)
+            response.raise_for_status()
+            info = response.json()
+            symbols = {entry['symbol']: parse_symbol(entry) for entry in info.get('symbols', [])}
+        except (requests.RequestException, ValueError, KeyError) as e:
+            print(f"Exchange info fetch failed: {e}")
+            return False
+        # Swap in the whole index at once so concurrent checks never see a partial one
+        self.info = info
+        self.symbols = symbols
+        self.loaded_at = time.monotonic()
+        return True
+
+    def start(self):
+        """Load the rules now, then refresh them every ttl seconds in the background."""
+        self.load()
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._refresh_loop, name="ExchangeInfoRefresh", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread = None
+
+    def _refresh_loop(self):
+        while not self._stop.wait(self.ttl if self.loaded else RETRY_INTERVAL):
+            self.load()
@@ -0,0 +1,184 @@
+"""
+Load test for the Aster webhook servers against a local mock of the Aster spot API.
+
+Fires a burst of alerts at the async server (aster/async_server.py) and at the
+Flask bot (aster/aster_bot.py) and reports accepted alerts per second, webhook
+latency, the time until every order reached the exchange, and whether the
+mock exchange received each idempotency key exactly once. A share of the
+alerts are resends of earlier alerts with the same id, which the async server
+must not place again; the Flask bot has no deduplication and places them all.
+
+Usage:
+    python -m aster.load_test [--alerts 2000] [--concurrency 100] [--symbols 20]
+                              [--duplicates 0.1] [--server both]
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import logging
+import os
+import random
+import statistics
+import threading
+import time
+import aiohttp
+from .bench import MockAsterHandler, start_mock_server
+
+
+def percentile(samples, fraction):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+def make_alerts(count, symbols, duplicates):
+    """Return (id, alert) pairs: unique alerts plus resends of random earlier ones."""
+    unique = max(1, int(count * (1 - duplicates)))
+    alerts = [(f'alert-{i}', {'id': f'alert-{i}', 'action': 'buy' if i % 2 else 'sell',
+                              'symbol': f'COIN{i % symbols}USDC', 'amount': 10})
+              for i in range(unique)]
+    alerts += [random.choice(alerts) for _ in range(count - unique)]
+    random.shuffle(alerts)
+    return alerts
+
+
+def start_async_server(workers, queue_size):
+    """Run the async server on its own event loop thread. Returns its base URL."""
+    from aiohttp import web
+    from . import async_server
+
+    ready = threading.Event()
+    url = {}
+
+    def run():
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        runner = web.AppRunner(async_server.create_app(workers=workers, queue_size=queue_size))
+        loop.run_until_complete(runner.setup())
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        loop.run_until_complete(site.start())
+        url['base'] = f"http://127.0.0.1:{runner.addresses[0][1]}"
+        ready.set()
+        loop.run_forever()
+
+    threading.Thread(target=run, daemon=True).start()
+    ready.wait()
+    return url['base']
+
+
+def start_flask_server():
+    """Run the Flask bot on werkzeug's threaded server. Returns its base URL."""
+    from werkzeug.serving import make_server
+    from . import aster_bot
+
+    app = aster_bot.configure()
+    aster_bot.load_markets()
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.port}"
+
+
+async def fire(base_url, alerts, concurrency):
+    """Send every alert with at most concurrency in flight. Returns (latencies, statuses, seconds)."""
+    latencies = []
+    statuses = []
+    semaphore = asyncio.Semaphore(concurrency)
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+
+        async def send(alert):
+            async with semaphore:
+                start = time.perf_counter()
+                async with session.post(f'{base_url}/webhook', json=alert) as response:
+                    await response.read()
+                latencies.append(time.perf_counter() - start)
+                statuses.append(response.status)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(send(alert) for _, alert in alerts))
+        return latencies, statuses, time.perf_counter() - start
+
+
+async def wait_for_queue(base_url, timeout=120):
+    """Poll the async server's health endpoint until no order is pending."""
+    async with aiohttp.ClientSession() as session:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            async with session.get(f'{base_url}/') as response:
+                if (await response.json())['pending'] == 0:
+                    return
+            await asyncio.sleep(0.01)
+
+
+def run(name, base_url, alerts, concurrency, drain):
+    """Fire the alerts at one server. Returns the report lines."""
+    del MockAsterHandler.received[:]
+    start = time.perf_counter()
+    latencies, statuses, seconds = asyncio.run(fire(base_url, alerts, concurrency))
+    if drain:
+        asyncio.run(wait_for_queue(base_url))
+    total = time.perf_counter() - start
+
+    accepted = sum(status in (200, 202) for status in statuses)
+    received = [client_id for _, client_id in MockAsterHandler.received]
+    unique = len({key for key, _ in alerts})
+    lines = [
+        f"{name}: {len(alerts)} alerts ({unique} unique) at concurrency {concurrency}",
+        f"  {accepted / seconds:.0f} alerts/s accepted, {len(alerts) - accepted} refused",
+        f"  webhook latency: median {statistics.median(latencies) * 1000:.1f} ms, "
+        f"p99 {percentile(latencies, 0.99) * 1000:.1f} ms",
+        f"  all orders at the exchange after {total:.2f} s ({len(received) / total:.0f} orders/s)",
+    ]
+    if drain:
+        repeated = len(received) - len(set(received))
+        lines.append(f"  exchange received {len(received)} orders, {len(set(received))} distinct ids, "
+                     f"{repeated} repeated")
+    else:
+        lines.append(f"  exchange received {len(received)} orders (no deduplication)")
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--alerts', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=100)
+    parser.add_argument('--symbols', type=int, default=20)
+    parser.add_argument('--duplicates', type=float, default=0.1, help="Share of alerts that resend an earlier id")
+    parser.add_argument('--workers', type=int, default=8, help="Async server order workers")
+    parser.add_argument('--queue-size', type=int, default=10000, help="Async server queue bound")
+    parser.add_argument('--handshake-ms', type=float, default=30.0)
+    parser.add_argument('--latency-ms', type=float, default=5.0)
+    parser.add_argument('--server', choices=('async', 'flask', 'both'), default='both')
+    args = parser.parse_args()
+
+    mock = start_mock_server(args.handshake_ms, args.latency_ms)
+    os.environ['ASTER_BASE_URL'] = mock.base_url
+    os.environ.setdefault('ASTER_API_KEY', 'benchmark')
+    os.environ.setdefault('ASTER_API_SECRET', 'benchmark')
+    # The mock has no rate limit; measure the servers, not the governor's pacing
+    os.environ.setdefault('ASTER_RATE_LIMIT', '100000')
+    # Overflowing the Flask bot's connection pool and werkzeug's request log would flood the report
+    logging.getLogger('urllib3').setLevel(logging.ERROR)
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+
+    alerts = make_alerts(args.alerts, args.symbols, args.duplicates)
+    servers = []
+    if args.server in ('async', 'both'):
+        servers.append(('async server', start_async_server(args.workers, args.queue_size), True))
+    if args.server in ('flask', 'both'):
+        servers.append(('flask server', start_flask_server(), False))
+
+    for name, base_url, drain in servers:
+        # The bots log every order; keep the report readable
+        with contextlib.redirect_stdout(io.StringIO()):
+            # Warm up imports and pooled connections with alerts that are not part of the run
+            warmup = make_alerts(args.concurrency, args.symbols, 0)
+            run(name, base_url, [(f'warmup-{key}', dict(alert, id=f'warmup-{key}')) for key, alert in warmup],
+                args.concurrency, drain)
+            lines = run(name, base_url, alerts, args.concurrency, drain)
+        print("\n".join(lines))
+    mock.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+import hashlib
+import hmac
+import threading
+import time
+import requests
+
+# Error code of a request whose timestamp falls outside recvWindow
+TIMESTAMP_ERROR = -1021
+
+# Seconds between retries while the clock has never synced
+RETRY_INTERVAL = 30
+
+
+class RequestSigner:
+    """
+    HMAC-SHA256 request signer with the keyed state computed once.
+
+    Keying an HMAC hashes the secret into the inner and outer pads. That is
+    done once here; each signature copies the keyed state and hashes only the
+    query string.
+    """
+
+    def __init__(self, secret):
+        """
+        Args:
+            secret (str): API secret.
+        """
+        self._keyed = hmac.new(secret.encode('utf-8'), digestmod=hashlib.sha256)
+
+    def sign(self, query_string):
+        """Return the hex HMAC-SHA256 signature of a query string."""
+        mac = self._keyed.copy()
+        mac.update(query_string.encode('utf-8'))
+        return mac.hexdigest()
+
+
+class ServerClock:
+    """
+    Local clock corrected by the offset to the exchange's clock.
+
+    The offset is measured against /time at startup and then periodically in
+    a background thread. Each sync takes a few samples and keeps the one with
+    the shortest round trip, whose midpoint best matches the moment the
+    server read its clock.
+    """
+
+    def __init__(self, session, base_url, interval=60, samples=3, timeout=None):
+        """
+        Args:
+            session (requests.Session): Session the server time is fetched with.
+            base_url (str): API base URL, e.g. https://sapi.asterdex.com/v1.
+            interval (float): Seconds between syncs.
+            samples (int): Requests per sync.
+            timeout (tuple, optional): requests (connect, read) timeout.
+        """
+        self.session = session
+        self.base_url = base_url
+        self.interval = interval
+        self.samples = samples
+        self.timeout = timeout
+        self.offset = 0
+        self.synced_at = None
+        self._sync_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def now(self):
+        """Current server time in milliseconds."""
+        return int(time.time() * 1000) + self.offset
+
+    def sync(self):
+        """
+        Measure the offset to the server clock. On failure the previous offset is kept.
+
+        Returns:
+            bool: Whether the offset was updated.
+        """
+        with self._sync_lock:
+            best = None
+            for _ in range(self.samples):
+                try:
+                    sent = time.time() * 1000
+                    response = self.session.get(f'{self.base_url}/time', timeout=self.timeout)
+                    received = time.time() * 1000
+                    response.raise_for_status()
+                    server_time = response.json()['serverTime']
+                except (requests.RequestException, ValueError, KeyError) as e:
+                    print(f"Server time fetch failed: {e}")
+                    continue
+                round_trip = received - sent
+                if best is None or round_trip < best[0]:
+                    best = (round_trip, int(server_time - (sent + received) / 2))
+            if best is None:
+                return False
+            self.offset = best[1]
+            self.synced_at = time.monotonic()
+            return True
+
+    def start(self):
+        """Sync now, then every interval seconds in the background."""
+        self.sync()
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._sync_loop, name="ServerClockSync", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread = None
+
+    def _sync_loop(self):
+        while not self._stop.wait(self.interval if self.synced_at is not None else RETRY_INTERVAL):
+            self.sync()
+
+
+def is_timestamp_error(body):
+    """Whether an error response body is a recvWindow/timestamp rejection."""
+    return isinstance(body, dict) and body.get('code') == TIMESTAMP_ERROR
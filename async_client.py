@@ -0,0 +1,437 @@
+import asyncio
+import json
+import time
+import traceback
+import aiohttp
+import ccxt.async_support as ccxt_async
+from market_cache import MarketCache
+from order_submitter import RETRYABLE_ORDER_ERRORS
+from rate_limiter import CRITICAL, NORMAL, RateLimitGovernor
+from valuation import ValuationEngine
+
+_shared_session = None
+
+
+def get_shared_session():
+    """
+    Return the aiohttp session shared by every AsyncExchangeClient.
+
+    Must be called from inside the running event loop.
+    """
+    global _shared_session
+    if _shared_session is None or _shared_session.closed:
+        _shared_session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=100, ttl_dns_cache=300, enable_cleanup_closed=True),
+            trust_env=True,
+        )
+    return _shared_session
+
+
+async def close_shared_session():
+    """Close the shared aiohttp session."""
+    global _shared_session
+    if _shared_session is not None and not _shared_session.closed:
+        await _shared_session.close()
+    _shared_session = None
+
+
+def install_qt_event_loop(app):
+    """
+    Make a qasync event loop driven by the Qt event loop the current asyncio loop.
+
+    Coroutines scheduled on it run on the GUI thread between Qt events, so their
+    results can update widgets directly.
+
+    Library use only: main.run() does not call it, because the desktop app runs
+    Qt's own event loop and does its background work through TaskRunner. An
+    application embedding AsyncExchangeClient calls it once after creating its
+    QApplication and runs the returned loop in place of app.exec_().
+
+    Args:
+        app (QApplication): The running Qt application.
+
+    Returns:
+        qasync.QEventLoop: The installed event loop.
+    """
+    try:
+        import qasync
+    except ImportError:
+        raise RuntimeError("The async client needs qasync: pip install field-orders[async]")
+
+    loop = qasync.QEventLoop(app)
+    asyncio.set_event_loop(loop)
+    return loop
+
+
+def schedule(coro, on_result=None, on_error=None):
+    """
+    Run a coroutine on the current event loop and deliver its outcome to callbacks.
+
+    Mirrors TaskRunner.submit: a failure's traceback is printed and its
+    message is passed to on_error.
+
+    Args:
+        coro (coroutine): Coroutine to run, e.g. a call on AsyncExchangeClient.
+        on_result (callable, optional): Called with the coroutine's return value.
+        on_error (callable, optional): Called with the error message if it raises.
+
+    Returns:
+        asyncio.Task: The scheduled task. Call cancel() on it to cancel.
+    """
+    task = asyncio.ensure_future(coro)
+
+    def done(task):
+        if task.cancelled():
+            return
+        error = task.exception()
+        if error is not None:
+            traceback.print_exception(type(error), error, error.__traceback__)
+            if on_error:
+                on_error(str(error))
+        elif on_result:
+            on_result(task.result())
+
+    task.add_done_callback(done)
+    return task
+
+
+class AsyncExchangeClient:
+    """Asynchronous counterpart of ExchangeClient built on ccxt.async_support."""
+
+    def __init__(self, config_file, max_concurrency=16, on_error=None):
+        """
+        Initialize the async exchange client using a configuration file.
+
+        Args:
+            config_file (str): Path to the JSON file containing API credentials and exchange name.
+            max_concurrency (int): Maximum requests this client keeps in flight at once.
+            on_error (callable, optional): Called with the message of each failure the client
+                absorbs by returning empty or partial results, as TaskRunner's on_error is.
+                Failures are printed either way; those listed in a result's 'failed' entries
+                are only printed.
+        """
+        with open(config_file, 'r') as file:
+            config = json.load(file)
+
+        self.exchange_name = config['exchange'].lower()
+        self.api_key = config['api_key']
+        self.api_secret = config['api_secret']
+
+        self.exchange = getattr(ccxt_async, self.exchange_name)({
+            'apiKey': self.api_key,
+            'secret': self.api_secret,
+            # Requests are paced by the RateLimitGovernor instead
+            'enableRateLimit': False,
+        })
+
+        if not self.exchange.has.get('fetchBalance', False):
+            raise ValueError(f"{self.exchange_name} does not support fetching balances.")
+
+        self.on_error = on_error
+        self.max_concurrency = config.get('max_workers', max_concurrency)
+        self.max_retries = config.get('order_retries', 3)
+        self.rate_limiter = RateLimitGovernor.from_exchange(
+            self.exchange, capacity=config.get('rate_limit_burst'), weights=config.get('rate_limit_weights'),
+            weight_limit=config.get('rate_limit_weight_per_minute'),
+            window=config.get('rate_limit_window', 60))
+        self.market_cache = MarketCache(self.exchange, self.exchange_name,
+                                        ttl=config.get('market_cache_ttl', 3600))
+        self._markets_task = None
+        self._semaphore = None
+
+        # Cached data
+        self.balances = {}
+        self.open_orders = []
+        self.tickers = {}
+        self.total_potential_gain = 0
+        self.valuation_engine = ValuationEngine(quote=config.get('valuation_currency', 'USD'))
+
+    def _report_error(self, message):
+        print(message)
+        if self.on_error:
+            self.on_error(message)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def _attach_session(self):
+        """Point ccxt at the shared aiohttp session on first use inside the event loop."""
+        if self.exchange.session is None or self.exchange.session.closed:
+            self.exchange.session = get_shared_session()
+            # The session is shared, so ccxt must not close it with the exchange
+            self.exchange.own_session = False
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    async def _call(self, method, *args, priority=NORMAL):
+        """
+        Call a ccxt coroutine method with bounded concurrency, paced by the rate limit governor.
+
+        The call first takes its weight from the governor at the given priority.
+        Afterwards the governor reads the rate limit headers, and a rate limit
+        rejection makes it back off before the error is passed on.
+        """
+        self._attach_session()
+        async with self._semaphore:
+            symbol = args[0] if args else None
+            if isinstance(symbol, (list, tuple, set)):
+                weight = self.rate_limiter.weight(method, symbol_given=bool(symbol), symbol_count=len(symbol))
+            else:
+                weight = self.rate_limiter.weight(method, symbol_given=symbol is not None)
+            await self.rate_limiter.acquire_async(weight, priority)
+            try:
+                result = await getattr(self.exchange, method)(*args)
+            except (ccxt_async.RateLimitExceeded, ccxt_async.DDoSProtection):
+                self.rate_limiter.throttled(self.exchange.last_response_headers)
+                raise
+            self.rate_limiter.observe(self.exchange.last_response_headers)
+            return result
+
+    async def close(self):
+        """Close the exchange. The shared session stays open for other clients."""
+        if self._markets_task is not None:
+            self._markets_task.cancel()
+        await self.exchange.close()
+
+    async def load_markets(self):
+        """Return markets from the on-disk cache, downloading them only when missing or stale."""
+        if not self.exchange.markets:
+            self.market_cache.load_cached()
+        if not self.exchange.markets:
+            await self._download_markets()
+        elif self.market_cache.is_stale() and (self._markets_task is None or self._markets_task.done()):
+            self._markets_task = asyncio.ensure_future(self._download_markets())
+        return self.exchange.markets
+
+    async def _download_markets(self):
+        await self._call('load_markets', True)
+        self.market_cache.store()
+
+    async def fetch_balances(self):
+        """Fetch account balances from the exchange."""
+        try:
+            balance_data = await self._call('fetch_balance')
+            self.balances = balance_data['total']
+        except Exception as e:
+            self._report_error(f"Error fetching balances: {e}")
+            self.balances = {}
+
+    async def fetch_open_orders(self, symbol=None):
+        """
+        Fetch open orders from the exchange.
+
+        Args:
+            symbol (str, optional): Market symbol (e.g., 'BTC/USDT'). Fetches all orders if None.
+        """
+        try:
+            self.open_orders = await self._call('fetch_open_orders', symbol)
+        except Exception as e:
+            self._report_error(f"Error fetching open orders: {e}")
+            self.open_orders = []
+
+    def calculate_potential_account_value(self):
+        """
+        Calculate the potential account value if all open limit sell orders were filled.
+
+        Orders quoted in other currencies are converted through the tickers fetched so far.
+
+        Returns:
+            dict: Potential value by currency.
+        """
+        valuation = self.valuation_engine.value(self.balances, self.open_orders, self.tickers)
+        self.total_potential_gain = valuation.total_potential_gain
+        return {
+            currency: float(gain) for currency, gain in zip(valuation.currencies, valuation.potential_gain)
+        }
+
+    async def cancel_all_orders(self, symbol=None, currency=None):
+        """
+        Cancel all open orders for a specific symbol, base currency, or all symbols.
+
+        Args:
+            symbol (str, optional): Market symbol (e.g., 'BTC/USDT').
+            currency (str, optional): Base currency (e.g., 'BTC').
+
+        Returns:
+            dict: Results with 'success' and 'failed' lists of per-order entries.
+        """
+        orders_by_symbol = {}
+        for order in self.open_orders:
+            if symbol is not None and order['symbol'] != symbol:
+                continue
+            if currency is not None and order['symbol'].split('/')[0] != currency:
+                continue
+            orders_by_symbol.setdefault(order['symbol'], []).append(order)
+
+        results = {'success': [], 'failed': []}
+        symbol_results = await asyncio.gather(*[
+            self._cancel_symbol_orders(market_symbol, orders)
+            for market_symbol, orders in orders_by_symbol.items()
+        ])
+        for symbol_result in symbol_results:
+            results['success'].extend(symbol_result['success'])
+            results['failed'].extend(symbol_result['failed'])
+
+        canceled_ids = {entry['order_id'] for entry in results['success']}
+        self.open_orders = [order for order in self.open_orders if order['id'] not in canceled_ids]
+        return results
+
+    async def _cancel_symbol_orders(self, symbol, orders):
+        try:
+            if self.exchange.has.get('cancelAllOrders', False):
+                await self._call('cancel_all_orders', symbol, priority=CRITICAL)
+                return {'success': [{'symbol': symbol, 'order_id': order['id']} for order in orders], 'failed': []}
+            if self.exchange.has.get('cancelOrders', False):
+                await self._call('cancel_orders', [order['id'] for order in orders], symbol, priority=CRITICAL)
+                return {'success': [{'symbol': symbol, 'order_id': order['id']} for order in orders], 'failed': []}
+        except Exception as e:
+            print(f"Error batch canceling orders for {symbol}, canceling individually: {e}")
+
+        outcomes = await asyncio.gather(*[
+            self._call('cancel_order', order['id'], symbol, priority=CRITICAL) for order in orders
+        ], return_exceptions=True)
+
+        results = {'success': [], 'failed': []}
+        for order, outcome in zip(orders, outcomes):
+            if isinstance(outcome, Exception):
+                print(f"Error canceling order {order['id']} for {symbol}: {outcome}")
+                results['failed'].append({'symbol': symbol, 'order_id': order['id'], 'error': str(outcome)})
+            else:
+                results['success'].append({'symbol': symbol, 'order_id': order['id']})
+        return results
+
+    async def market_sell_entire_position(self, symbol):
+        """
+        Market sell the entire position for a specific symbol.
+
+        Args:
+            symbol (str): Market symbol (e.g., 'BTC/USDT').
+        """
+        base_currency = symbol.split('/')[0]
+        if base_currency in self.balances and self.balances[base_currency] > 0:
+            try:
+                await self._call('create_market_sell_order', symbol, self.balances[base_currency], priority=CRITICAL)
+            except Exception as e:
+                self._report_error(f"Error placing market sell order: {e}")
+
+    async def fetch_tickers(self, symbols):
+        """Fetch tickers in one call when supported, otherwise concurrently per symbol."""
+        if self.exchange.has.get('fetchTickers', False):
+            try:
+                wanted = set(symbols)
+                tickers = await self._call('fetch_tickers', symbols)
+                tickers = {symbol: ticker for symbol, ticker in tickers.items() if symbol in wanted}
+                self.tickers.update(tickers)
+                return tickers
+            except Exception as e:
+                print(f"Error fetching tickers in batch, falling back to per-symbol fetch: {e}")
+
+        outcomes = await asyncio.gather(*[self._call('fetch_ticker', symbol) for symbol in symbols],
+                                        return_exceptions=True)
+        tickers = {}
+        for symbol, outcome in zip(symbols, outcomes):
+            if isinstance(outcome, Exception):
+                self._report_error(f"Error fetching ticker for {symbol}: {outcome}")
+            else:
+                tickers[symbol] = outcome
+        self.tickers.update(tickers)
+        return tickers
+
+    async def get_usd_pairs_under_threshold(self, threshold=20.0):
+        """
+        Get all USD trading pairs where current balance is under threshold.
+
+        Args:
+            threshold (float): Minimum USD value threshold
+
+        Returns:
+            list: List of dicts with currency, balance, and symbol info
+        """
+        try:
+            markets = await self.load_markets()
+            usd_markets = [
+                market for market in markets.values()
+                if market['quote'] == 'USD' and market['active']
+            ]
+            tickers = await self.fetch_tickers([market['symbol'] for market in usd_markets])
+
+            usd_pairs = []
+            for market in usd_markets:
+                ticker = tickers.get(market['symbol'])
+                if ticker is None or ticker.get('last') is None:
+                    continue
+                usd_value = self.balances.get(market['base'], 0) * ticker['last']
+                if usd_value < threshold:
+                    usd_pairs.append({
+                        'currency': market['base'],
+                        'balance': usd_value,
+                        'symbol': market['symbol']
+                    })
+
+            usd_pairs.sort(key=lambda x: x['currency'])
+            return usd_pairs
+
+        except Exception as e:
+            self._report_error(f"Error getting USD pairs: {e}")
+            return []
+
+    async def market_buy_multiple(self, symbols, usd_amount_per_coin):
+        """
+        Execute market buy orders for multiple symbols concurrently.
+
+        Args:
+            symbols (list): List of trading pair symbols (e.g., ['BTC/USD', 'ETH/USD'])
+            usd_amount_per_coin (float): USD amount to spend on each coin
+
+        Returns:
+            dict: Results with success/failure info and latency for each symbol
+        """
+        results = {'success': [], 'failed': []}
+        tickers = await self.fetch_tickers(list(symbols))
+        outcomes = await asyncio.gather(*[
+            self._buy(symbol, usd_amount_per_coin, (tickers.get(symbol) or {}).get('last'))
+            for symbol in symbols
+        ])
+        for status, entry in outcomes:
+            results[status].append(entry)
+        return results
+
+    async def _buy(self, symbol, usd_amount, price):
+        """Place one market buy, retrying only errors that guarantee no order was placed."""
+        start = time.monotonic()
+        attempt = 0
+        while True:
+            placing = False
+            try:
+                if not price:
+                    price = (await self._call('fetch_ticker', symbol))['last']
+                amount = usd_amount / price
+                placing = True
+                order_start = time.monotonic()
+                order = await self._call('create_market_buy_order', symbol, amount)
+                return 'success', {
+                    'symbol': symbol,
+                    'amount': amount,
+                    'order_id': order['id'],
+                    'latency': time.monotonic() - order_start,
+                    'attempts': attempt + 1,
+                }
+            except ccxt_async.NetworkError as e:
+                if (not placing or isinstance(e, RETRYABLE_ORDER_ERRORS)) and attempt < self.max_retries:
+                    await asyncio.sleep(0.5 * (2 ** attempt))
+                    attempt += 1
+                    continue
+                error = e
+            except Exception as e:
+                error = e
+
+            print(f"Error buying {symbol}: {error}")
+            return 'failed', {
+                'symbol': symbol,
+                'error': str(error),
+                'latency': time.monotonic() - start,
+                'attempts': attempt + 1,
+            }
@@ -0,0 +1,492 @@
+from decimal import Decimal, ROUND_HALF_UP
+import ccxt
+import requests
+from aster.client import DEFAULT_BASE_URL, AsterClient
+from aster.exchange_info import parse_symbol
+from rate_limiter import CRITICAL, NORMAL
+
+
+def create_exchange(config):
+    """
+    Create the exchange backend an ExchangeClient talks to.
+
+    Every backend exposes the ccxt Exchange interface, so the caches, the
+    order sync, the submitters and the rate limit governor work unchanged on
+    top of any of them. Venues with a native backend use it unless the config
+    asks for ccxt with "backend": "ccxt"; every other venue goes through ccxt.
+
+    Args:
+        config (dict): Exchange entry of the configuration file.
+
+    Returns:
+        ccxt.Exchange or a native backend.
+    """
+    name = config['exchange'].lower()
+    backend = config.get('backend', 'native' if name in NATIVE_BACKENDS else 'ccxt')
+    if backend == 'native':
+        if name not in NATIVE_BACKENDS:
+            raise ValueError(f"No native backend for {name}; use \"backend\": \"ccxt\".")
+        return NATIVE_BACKENDS[name](config)
+    return getattr(ccxt, name)({
+        'apiKey': config['api_key'],
+        'secret': config['api_secret'],
+        # Requests are paced by the shared RateLimitGovernor instead
+        'enableRateLimit': False,
+    })
+
+
+def _decimal_string(value):
+    """Format a Decimal without exponent or trailing zeros."""
+    text = format(value, 'f')
+    return text.rstrip('0').rstrip('.') if '.' in text else text
+
+
+def _float(value):
+    return float(value) if value not in (None, '') else None
+
+
+# Aster order statuses in ccxt terms
+ORDER_STATUSES = {
+    'NEW': 'open',
+    'PARTIALLY_FILLED': 'open',
+    'FILLED': 'closed',
+    'CANCELED': 'canceled',
+    'PENDING_CANCEL': 'canceled',
+    'REJECTED': 'rejected',
+    'EXPIRED': 'expired',
+}
+
+
+class AsterBackend:
+    """
+    Native Aster spot backend with the ccxt Exchange interface.
+
+    Built on AsterClient, which implements connection pooling, precomputed
+    signing, server clock tracking and timestamp-reject recovery. The desktop
+    app and the webhook bot both trade through this backend. Only the part of
+    the ccxt interface they use is provided; responses are returned as ccxt
+    structures and errors raised as ccxt exceptions.
+    """
+
+    id = 'aster'
+    # Milliseconds between requests, read by RateLimitGovernor.from_exchange
+    rateLimit = 50
+    has = {
+        'fetchBalance': True,
+        'fetchTicker': True,
+        'fetchTickers': True,
+        'fetchOHLCV': True,
+        'fetchOpenOrders': True,
+        # fetch_orders returns orders of every status, which is what the incremental order sync uses
+        'fetchOrders': True,
+        'fetchClosedOrders': False,
+        'createOrder': True,
+        'createMarketBuyOrderWithCost': True,
+        'createOrders': False,
+        'cancelOrder': True,
+        'cancelOrders': False,
+        'cancelAllOrders': True,
+    }
+
+    def __init__(self, config, client=None):
+        """
+        Args:
+            config (dict): Exchange entry with api_key and api_secret, and optionally base_url,
+                pool_size, timeout, recv_window, time_sync_interval and exchange_info_ttl
+                (see AsterClient).
+            client (AsterClient, optional): Client to use. Created from config if None.
+        """
+        self.client = client or AsterClient(config['api_key'], config['api_secret'],
+                                            base_url=config.get('base_url', DEFAULT_BASE_URL),
+                                            pool_size=config.get('pool_size', 10),
+                                            timeout=config.get('timeout', (3.05, 10)),
+                                            recv_window=config.get('recv_window', 5000),
+                                            time_sync_interval=config.get('time_sync_interval', 60),
+                                            exchange_info_ttl=config.get('exchange_info_ttl', 3600))
+        self.options = {}
+        self.markets = {}
+        self.markets_by_id = {}
+        self.currencies = {}
+        self._clock_started = False
+
+    # Plumbing
+
+    def _request(self, method, path, params=None, signed=False):
+        """Send a request through the client, translating failures into ccxt exceptions."""
+        if signed and not self._clock_started:
+            # Sync the clock once before the first signed request, then keep it synced
+            self.client.clock.start()
+            self._clock_started = True
+        try:
+            return self.client.request(method, path, params, signed)
+        except requests.HTTPError as e:
+            raise self._http_error(e.response) from e
+        except requests.Timeout as e:
+            raise ccxt.RequestTimeout(f"aster {method} {path}: {e}") from e
+        except (requests.RequestException, ValueError) as e:
+            raise ccxt.NetworkError(f"aster {method} {path}: {e}") from e
+
+    @staticmethod
+    def _http_error(response):
+        try:
+            body = response.json()
+        except ValueError:
+            body = {}
+        message = f"aster {response.status_code} {body.get('code')}: {body.get('msg') or response.text}"
+        code = body.get('code')
+        if response.status_code == 429:
+            return ccxt.RateLimitExceeded(message)
+        if response.status_code == 418:
+            return ccxt.DDoSProtection(message)
+        if response.status_code >= 500:
+            return ccxt.ExchangeNotAvailable(message)
+        if code == -2010:
+            return ccxt.InsufficientFunds(message)
+        if code in (-2011, -2013):
+            return ccxt.OrderNotFound(message)
+        if code == -1121:
+            return ccxt.BadSymbol(message)
+        if response.status_code in (401, 403) or code in (-2014, -2015, -1022):
+            return ccxt.AuthenticationError(message)
+        return ccxt.ExchangeError(message)
+
+    def milliseconds(self):
+        return self.client.clock.now()
+
+    @property
+    def last_response_headers(self):
+        return self.client.last_response_headers
+
+    @staticmethod
+    def parse_timeframe(timeframe):
+        """Return the length of a ccxt timeframe such as '15m' or '1d' in seconds."""
+        units = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400, 'w': 604800, 'M': 2592000, 'y': 31536000}
+        return int(timeframe[:-1]) * units[timeframe[-1]]
+
+    def close(self):
+        self.client.close()
+
+    # Markets
+
+    def load_markets(self, reload=False):
+        if self.markets and not reload:
+            return self.markets
+        if not self.client.exchange_info.load():
+            raise ccxt.ExchangeNotAvailable("aster exchangeInfo could not be fetched")
+        markets = {}
+        for info in self.client.exchange_info.info.get('symbols', []):
+            market = self._parse_market(info)
+            markets[market['symbol']] = market
+        currencies = {}
+        for market in markets.values():
+            for code in (market['base'], market['quote']):
+                currencies.setdefault(code, {'id': code, 'code': code})
+        self.set_markets(markets, currencies)
+        return self.markets
+
+    def set_markets(self, markets, currencies=None):
+        self.markets = markets
+        # Lists, as in ccxt, where several markets may share an id
+        self.markets_by_id = {market['id']: [market] for market in markets.values()}
+        self.currencies = currencies or {}
+        return self.markets
+
+    @staticmethod
+    def _parse_market(info):
+        rules = parse_symbol(info)
+        base = info['baseAsset']
+        quote = info['quoteAsset']
+        return {
+            'id': info['symbol'],
+            'symbol': f'{base}/{quote}',
+            'base': base,
+            'quote': quote,
+            'baseId': base,
+            'quoteId': quote,
+            'type': 'spot',
+            'spot': True,
+            'active': rules['status'] == 'TRADING',
+            'precision': {'amount': float(rules['step']) or None, 'price': float(rules['tick']) or None,
+                          'cost': float(rules['quote_step']) or None},
+            'limits': {
+                'amount': {'min': float(rules['min_qty']) or None, 'max': float(rules['max_qty']) or None},
+                'price': {'min': None, 'max': None},
+                'cost': {'min': float(rules['min_notional']) or None, 'max': None},
+            },
+            'info': info,
+        }
+
+    def market(self, symbol):
+        if not self.markets:
+            self.load_markets()
+        try:
+            return self.markets[symbol]
+        except KeyError:
+            raise ccxt.BadSymbol(f"aster does not have market symbol {symbol}")
+
+    def _symbol(self, market_id):
+        markets = self.markets_by_id.get(market_id)
+        return markets[0]['symbol'] if markets else market_id
+
+    def amount_to_precision(self, symbol, amount):
+        """Round an amount down to the market's step size."""
+        step = self.market(symbol)['precision']['amount']
+        value = Decimal(str(amount))
+        if step:
+            step = Decimal(str(step))
+            value = (value // step) * step
+        return _decimal_string(value)
+
+    def cost_to_precision(self, symbol, cost):
+        """Round a quote amount down to the market's quote step."""
+        step = self.market(symbol)['precision']['cost']
+        value = Decimal(str(cost))
+        if step:
+            step = Decimal(str(step))
+            value = (value // step) * step
+        return _decimal_string(value)
+
+    def price_to_precision(self, symbol, price):
+        """Round a price to the nearest multiple of the market's tick size."""
+        tick = self.market(symbol)['precision']['price']
+        value = Decimal(str(price))
+        if tick:
+            tick = Decimal(str(tick))
+            value = (value / tick).quantize(Decimal(1), rounding=ROUND_HALF_UP) * tick
+        return _decimal_string(value)
+
+    # Account and market data
+
+    def fetch_balance(self):
+        account = self._request('GET', '/account', signed=True)
+        balance = {'info': account, 'free': {}, 'used': {}, 'total': {}}
+        for entry in account.get('balances', []):
+            free = float(entry.get('free') or 0)
+            used = float(entry.get('locked') or 0)
+            code = entry['asset']
+            balance[code] = {'free': free, 'used': used, 'total': free + used}
+            balance['free'][code] = free
+            balance['used'][code] = used
+            balance['total'][code] = free + used
+        return balance
+
+    def _parse_ticker(self, ticker):
+        last = _float(ticker.get('lastPrice'))
+        return {
+            'symbol': self._symbol(ticker['symbol']),
+            'timestamp': ticker.get('closeTime'),
+            'open': _float(ticker.get('openPrice')),
+            'high': _float(ticker.get('highPrice')),
+            'low': _float(ticker.get('lowPrice')),
+            'last': last,
+            'close': last,
+            'bid': _float(ticker.get('bidPrice')),
+            'ask': _float(ticker.get('askPrice')),
+            'percentage': _float(ticker.get('priceChangePercent')),
+            'baseVolume': _float(ticker.get('volume')),
+            'quoteVolume': _float(ticker.get('quoteVolume')),
+            'info': ticker,
+        }
+
+    def fetch_ticker(self, symbol):
+        return self._parse_ticker(self._request('GET', '/ticker/24hr', {'symbol': self.market(symbol)['id']}))
+
+    def fetch_tickers(self, symbols=None):
+        """Fetch every market's ticker in one request, keeping only symbols if given."""
+        if not self.markets:
+            self.load_markets()
+        wanted = set(symbols) if symbols else None
+        tickers = {}
+        for entry in self._request('GET', '/ticker/24hr'):
+            if entry.get('symbol') not in self.markets_by_id:
+                continue
+            ticker = self._parse_ticker(entry)
+            if wanted is None or ticker['symbol'] in wanted:
+                tickers[ticker['symbol']] = ticker
+        return tickers
+
+    def fetch_ohlcv(self, symbol, timeframe='1m', since=None, limit=None):
+        params = {'symbol': self.market(symbol)['id'], 'interval': timeframe}
+        if since is not None:
+            params['startTime'] = since
+        if limit is not None:
+            params['limit'] = limit
+        return [[int(row[0])] + [float(value) for value in row[1:6]]
+                for row in self._request('GET', '/klines', params)]
+
+    # Orders
+
+    def _parse_order(self, order):
+        amount = _float(order.get('origQty'))
+        filled = _float(order.get('executedQty')) or 0.0
+        cost = _float(order.get('cummulativeQuoteQty'))
+        timestamp = order.get('time') or order.get('transactTime') or order.get('updateTime')
+        return {
+            'id': str(order['orderId']),
+            'clientOrderId': order.get('clientOrderId'),
+            'timestamp': timestamp,
+            'lastTradeTimestamp': order.get('updateTime') if filled else None,
+            'symbol': self._symbol(order['symbol']),
+            'type': (order.get('type') or '').lower(),
+            'side': (order.get('side') or '').lower(),
+            'price': _float(order.get('price')) or None,
+            'amount': amount,
+            'filled': filled,
+            'remaining': amount - filled if amount is not None else None,
+            'cost': cost,
+            'average': cost / filled if cost and filled else None,
+            'status': ORDER_STATUSES.get(order.get('status'), 'open'),
+            'info': order,
+        }
+
+    @staticmethod
+    def _page(orders, since, limit):
+        """Apply ccxt since/limit semantics: oldest first from since, at most limit orders."""
+        orders = sorted(orders, key=lambda order: order['timestamp'] or 0)
+        if since is not None:
+            orders = [order for order in orders if (order['timestamp'] or 0) >= since]
+        return orders[:limit] if limit else orders
+
+    def fetch_open_orders(self, symbol=None, since=None, limit=None, params=None):
+        if not self.markets:
+            self.load_markets()
+        query = {'symbol': self.market(symbol)['id']} if symbol else {}
+        orders = [self._parse_order(order) for order in self._request('GET', '/openOrders', query, signed=True)]
+        return self._page(orders, since, limit)
+
+    def fetch_orders(self, symbol=None, since=None, limit=None, params=None):
+        if symbol is None:
+            raise ccxt.ArgumentsRequired("aster fetch_orders() requires a symbol argument")
+        query = {'symbol': self.market(symbol)['id']}
+        if since is not None:
+            query['startTime'] = since
+        if limit is not None:
+            query['limit'] = limit
+        orders = [self._parse_order(order) for order in self._request('GET', '/allOrders', query, signed=True)]
+        return self._page(orders, since, limit)
+
+    def create_order(self, symbol, type, side, amount, price=None, params=None):
+        """
+        Place an order. params may carry clientOrderId, sent as newClientOrderId, or
+        Aster fields such as quoteOrderQty; a market order with quoteOrderQty ignores amount.
+        """
+        params = dict(params or {})
+        if 'clientOrderId' in params:
+            params['newClientOrderId'] = params.pop('clientOrderId')
+        fields = {'symbol': self.market(symbol)['id'], 'side': side.upper(), 'type': type.upper()}
+        if 'quoteOrderQty' not in params:
+            fields['quantity'] = self.amount_to_precision(symbol, amount)
+        if type.lower() == 'limit':
+            fields['price'] = self.price_to_precision(symbol, price)
+            fields['timeInForce'] = params.pop('timeInForce', 'GTC')
+        fields.update(params)
+        return self._parse_order(self._request('POST', '/order', fields, signed=True))
+
+    def create_limit_buy_order(self, symbol, amount, price, params=None):
+        return self.create_order(symbol, 'limit', 'buy', amount, price, params)
+
+    def create_limit_sell_order(self, symbol, amount, price, params=None):
+        return self.create_order(symbol, 'limit', 'sell', amount, price, params)
+
+    def create_market_buy_order(self, symbol, amount, params=None):
+        return self.create_order(symbol, 'market', 'buy', amount, None, params)
+
+    def create_market_sell_order(self, symbol, amount, params=None):
+        return self.create_order(symbol, 'market', 'sell', amount, None, params)
+
+    def create_market_buy_order_with_cost(self, symbol, cost, params=None):
+        """Market buy for a quote amount, e.g. 10 USDC of ETH."""
+        params = dict(params or {}, quoteOrderQty=self.cost_to_precision(symbol, cost))
+        return self.create_order(symbol, 'market', 'buy', None, None, params)
+
+    def cancel_order(self, id, symbol=None, params=None):
+        if symbol is None:
+            raise ccxt.ArgumentsRequired("aster cancel_order() requires a symbol argument")
+        order = self._request('DELETE', '/order', {'symbol': self.market(symbol)['id'], 'orderId': id}, signed=True)
+        return self._parse_order(order)
+
+    def cancel_all_orders(self, symbol=None, params=None):
+        """Cancel every open order on a market and return the canceled orders, as ccxt does."""
+        if symbol is None:
+            raise ccxt.ArgumentsRequired("aster cancel_all_orders() requires a symbol argument")
+        response = self._request('DELETE', '/openOrders', {'symbol': self.market(symbol)['id']}, signed=True)
+        # The canceled orders, or a status message when the market had none
+        if not isinstance(response, list):
+            return []
+        return [self._parse_order(order) for order in response]
+
+
+NATIVE_BACKENDS = {
+    'aster': AsterBackend,
+}
+
+
+# Calls that take requests from the rate limit budget
+GOVERNED_PREFIXES = ('fetch_', 'create_', 'cancel_', 'load_markets')
+# Calls that reduce exposure and go ahead of everything else
+CRITICAL_CALLS = ('cancel_order', 'cancel_orders', 'cancel_all_orders', 'create_market_sell_order')
+
+
+class GovernedExchange:
+    """
+    Exchange proxy that routes every request through a shared RateLimitGovernor.
+
+    Each fetch, create and cancel call first takes its endpoint's weight from
+    the governor at this view's priority; cancels and market sells are always
+    critical. Afterwards the governor reads the exchange's rate limit headers,
+    and a rate limit rejection makes it back off before the error is passed
+    on. Everything else, attributes included, goes straight to the exchange.
+    """
+
+    def __init__(self, exchange, governor, priority=NORMAL):
+        """
+        Args:
+            exchange: ccxt exchange or native backend.
+            governor (RateLimitGovernor): Budget shared by every view of the exchange.
+            priority (int): CRITICAL, NORMAL or BULK for calls made through this view.
+        """
+        object.__setattr__(self, 'exchange', exchange)
+        object.__setattr__(self, 'governor', governor)
+        object.__setattr__(self, 'priority', priority)
+
+    def with_priority(self, priority):
+        """Return a view of the same exchange and governor that calls at another priority."""
+        return GovernedExchange(self.exchange, self.governor, priority)
+
+    def __getattr__(self, name):
+        attribute = getattr(self.exchange, name)
+        if not callable(attribute) or not name.startswith(GOVERNED_PREFIXES):
+            return attribute
+
+        def governed(*args, **kwargs):
+            self.governor.acquire(self._weight(name, args, kwargs), self._priority(name, args, kwargs))
+            try:
+                result = attribute(*args, **kwargs)
+            except (ccxt.RateLimitExceeded, ccxt.DDoSProtection):
+                self.governor.throttled(getattr(self.exchange, 'last_response_headers', None))
+                raise
+            # Concurrent calls share the headers attribute; the latest response is close enough
+            self.governor.observe(getattr(self.exchange, 'last_response_headers', None))
+            return result
+
+        return governed
+
+    def __setattr__(self, name, value):
+        setattr(self.exchange, name, value)
+
+    def _weight(self, name, args, kwargs):
+        symbol = args[0] if args else kwargs.get('symbol', kwargs.get('symbols'))
+        if isinstance(symbol, (list, tuple, set)):
+            # An empty list asks ccxt for every market
+            return self.governor.weight(name, symbol_given=bool(symbol), symbol_count=len(symbol))
+        return self.governor.weight(name, symbol_given=symbol is not None)
+
+    def _priority(self, name, args, kwargs):
+        if name in CRITICAL_CALLS:
+            return CRITICAL
+        if name == 'create_order':
+            order_type = args[1] if len(args) > 1 else kwargs.get('type')
+            side = args[2] if len(args) > 2 else kwargs.get('side')
+            if order_type == 'market' and side == 'sell':
+                return CRITICAL
+        return self.priority
@@ -0,0 +1,96 @@
+"""
+Startup benchmark: import time of main and time to the main window's first paint.
+
+Each measurement runs in a fresh interpreter so module caches do not hide
+regressions. No API keys or network are needed: clients are created with dummy
+credentials and the process exits as soon as the window has painted, before
+the first refresh reaches the exchange.
+
+Usage:
+    python benchmarks/startup.py [--runs 5] [--exchange coinbase]
+    QT_QPA_PLATFORM=offscreen python benchmarks/startup.py   # headless
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_SNIPPET = "import time; start = time.perf_counter(); import main; print(time.perf_counter() - start)"
+
+
+def measure_import():
+    """Return seconds taken by `import main` in a fresh interpreter."""
+    output = subprocess.check_output([sys.executable, "-c", IMPORT_SNIPPET], cwd=REPO_DIR)
+    return float(output)
+
+
+def measure_first_paint(exchange):
+    """Return seconds from interpreter start to the main window's first paint, in a fresh interpreter."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        config_file = os.path.join(temp_dir, "config.json")
+        with open(config_file, "w") as file:
+            json.dump({
+                "exchange": exchange,
+                "api_key": "benchmark",
+                "api_secret": "benchmark",
+                "history_db": os.path.join(temp_dir, "history.db"),
+            }, file)
+        output = subprocess.check_output([sys.executable, os.path.abspath(__file__), "--paint-child", config_file],
+                                         cwd=REPO_DIR)
+    return float(output)
+
+
+def paint_child(config_file):
+    """Run in the child process: start the app like main.run() and exit on the first paint."""
+    start = time.perf_counter()
+    sys.path.insert(0, REPO_DIR)
+
+    from PyQt5.QtCore import QEvent, QObject
+    from PyQt5.QtWidgets import QApplication
+    from aggregator import ExchangeAggregator
+    from ui import UI
+
+    class FirstPaint(QObject):
+        def eventFilter(self, watched, event):
+            if event.type() == QEvent.Paint:
+                print(time.perf_counter() - start, flush=True)
+                # Skip shutdown so pending refresh workers do not delay the exit
+                os._exit(0)
+            return False
+
+    app = QApplication(sys.argv)
+    main_window = UI(ExchangeAggregator.from_config_file(config_file))
+    first_paint = FirstPaint()
+    main_window.installEventFilter(first_paint)
+    main_window.show()
+    app.exec_()
+
+
+def report(name, samples):
+    print(f"{name}: median {statistics.median(samples) * 1000:.0f} ms, "
+          f"min {min(samples) * 1000:.0f} ms, max {max(samples) * 1000:.0f} ms ({len(samples)} runs)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--exchange", default="coinbase")
+    parser.add_argument("--paint-child", metavar="CONFIG", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.paint_child:
+        paint_child(args.paint_child)
+        return
+
+    report("import main", [measure_import() for _ in range(args.runs)])
+    report("first paint", [measure_first_paint(args.exchange) for _ in range(args.runs)])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+from PyQt5.QtCore import Qt, QLineF, QRectF, QPointF
+from PyQt5.QtGui import QColor, QOpenGLContext, QPainter, QPen
+from PyQt5.QtWidgets import QOpenGLWidget, QWidget
+import numpy as np
+from ohlcv_cache import OPEN, HIGH, LOW, CLOSE
+
+BACKGROUND_COLOR = QColor(24, 26, 31)
+GRID_COLOR = QColor(60, 63, 70)
+TEXT_COLOR = QColor(200, 200, 200)
+UP_COLOR = QColor(76, 175, 80)
+DOWN_COLOR = QColor(244, 67, 54)
+BUY_ORDER_COLOR = QColor(33, 150, 243)
+SELL_ORDER_COLOR = QColor(255, 165, 0)
+
+# Horizontal pixels per candle when fully zoomed in, and the fewest candles that can be shown
+MAX_CANDLE_WIDTH = 24
+MIN_VISIBLE_BARS = 10
+PRICE_AXIS_WIDTH = 80
+
+
+def decimate(candles, buckets):
+    """
+    Merge consecutive candles so at most `buckets` remain, one per pixel column.
+
+    Each merged candle opens at its first candle's open, closes at its last
+    candle's close and spans the group's highest high and lowest low, so the
+    chart's outline is exact at any zoom level.
+
+    Args:
+        candles (np.ndarray): (n, 6) OHLCV array.
+        buckets (int): Maximum number of candles to return.
+
+    Returns:
+        np.ndarray: (m, 4) array of open, high, low, close with m <= buckets.
+    """
+    count = len(candles)
+    if count <= buckets:
+        return np.asarray(candles[:, OPEN:CLOSE + 1])
+    starts = (np.arange(buckets) * count) // buckets
+    ends = np.append(starts[1:], count) - 1
+    return np.column_stack([
+        candles[starts, OPEN],
+        np.maximum.reduceat(candles[:, HIGH], starts),
+        np.minimum.reduceat(candles[:, LOW], starts),
+        candles[ends, CLOSE],
+    ])
+
+
+class CandlestickPainter:
+    """
+    Candlestick drawing, panning and zooming shared by the OpenGL and raster charts.
+
+    Candles are held as the (n, 6) OHLCV array they are given, never as
+    per-bar objects. Each paint slices out the visible range and decimates it
+    to the plot's pixel width, so drawing cost depends on the widget size
+    rather than the length of the history.
+    """
+
+    def _init_chart(self):
+        self.candles = np.empty((0, 6))
+        self.buy_prices = np.empty(0)
+        self.sell_prices = np.empty(0)
+        self.first_bar = 0
+        self.visible_bars = 200
+        self._drag_x = None
+        self.setMinimumHeight(200)
+        self.setFocusPolicy(Qt.WheelFocus)
+
+    def set_candles(self, candles):
+        """
+        Show a new candle history, scrolled to the most recent bars.
+
+        Args:
+            candles (np.ndarray): (n, 6) OHLCV array, oldest first. Not copied.
+        """
+        self.candles = candles
+        self.visible_bars = max(MIN_VISIBLE_BARS, min(len(candles), self.visible_bars))
+        self.first_bar = max(0, len(candles) - self.visible_bars)
+        self.update()
+
+    def set_order_lines(self, buy_prices, sell_prices):
+        """Draw horizontal lines at the prices of open buy and sell orders."""
+        self.buy_prices = np.asarray(buy_prices, dtype=np.float64)
+        self.sell_prices = np.asarray(sell_prices, dtype=np.float64)
+        self.update()
+
+    # Navigation
+
+    def _plot_width(self):
+        return max(1, self.width() - PRICE_AXIS_WIDTH)
+
+    def _clamp(self):
+        count = len(self.candles)
+        self.visible_bars = int(min(max(self.visible_bars, MIN_VISIBLE_BARS), max(count, MIN_VISIBLE_BARS)))
+        self.first_bar = int(min(max(self.first_bar, 0), max(count - self.visible_bars, 0)))
+
+    def wheelEvent(self, event):
+        """Zoom around the bar under the cursor."""
+        factor = 0.8 if event.angleDelta().y() > 0 else 1.25
+        anchor = min(max(event.pos().x() / self._plot_width(), 0.0), 1.0)
+        anchor_bar = self.first_bar + anchor * self.visible_bars
+
+        minimum = max(MIN_VISIBLE_BARS, self._plot_width() // MAX_CANDLE_WIDTH)
+        self.visible_bars = max(int(self.visible_bars * factor), minimum)
+        self.first_bar = int(round(anchor_bar - anchor * self.visible_bars))
+        self._clamp()
+        self.update()
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.LeftButton:
+            self._drag_x = event.pos().x()
+
+    def mouseMoveEvent(self, event):
+        """Pan by dragging."""
+        if self._drag_x is None:
+            return
+        bars = int((self._drag_x - event.pos().x()) * self.visible_bars / self._plot_width())
+        if bars:
+            self.first_bar += bars
+            self._drag_x = event.pos().x()
+            self._clamp()
+            self.update()
+
+    def mouseReleaseEvent(self, event):
+        self._drag_x = None
+
+    def keyPressEvent(self, event):
+        """Home and End jump to the oldest and newest bars."""
+        if event.key() == Qt.Key_Home:
+            self.first_bar = 0
+        elif event.key() == Qt.Key_End:
+            self.first_bar = len(self.candles)
+        else:
+            return super().keyPressEvent(event)
+        self._clamp()
+        self.update()
+
+    # Rendering
+
+    def _paint(self, painter):
+        painter.fillRect(self.rect(), BACKGROUND_COLOR)
+        self._clamp()
+        visible = self.candles[self.first_bar:self.first_bar + self.visible_bars]
+        if not len(visible):
+            painter.setPen(TEXT_COLOR)
+            painter.drawText(self.rect(), Qt.AlignCenter, "No candles")
+            return
+
+        plot_width = self._plot_width()
+        height = self.height()
+        bars = decimate(visible, plot_width)
+        low = float(bars[:, 2].min())
+        high = float(bars[:, 1].max())
+        if high <= low:
+            high, low = high * 1.01 + 1e-12, low * 0.99
+        padding = (high - low) * 0.05
+        low -= padding
+        high += padding
+        scale = height / (high - low)
+
+        def to_y(prices):
+            return height - (prices - low) * scale
+
+        self._paint_grid(painter, low, high, to_y, plot_width)
+
+        # Each drawn candle covers len(visible) / len(bars) bars, each plot_width / visible_bars wide
+        slot = plot_width / self.visible_bars * len(visible) / len(bars)
+        x = (np.arange(len(bars)) + 0.5) * slot
+        opens, highs, lows, closes = (to_y(bars[:, column]) for column in range(4))
+        rising = bars[:, 3] >= bars[:, 0]
+        body_width = max(1.0, slot * 0.7)
+
+        painter.setRenderHint(QPainter.Antialiasing, False)
+        for mask, color in ((rising, UP_COLOR), (~rising, DOWN_COLOR)):
+            indexes = np.flatnonzero(mask)
+            if not len(indexes):
+                continue
+            painter.setPen(QPen(color, 1))
+            painter.drawLines([QLineF(x[i], highs[i], x[i], lows[i]) for i in indexes])
+            if body_width > 2:
+                tops = np.minimum(opens[indexes], closes[indexes])
+                heights = np.maximum(np.abs(opens[indexes] - closes[indexes]), 1.0)
+                painter.setBrush(color)
+                painter.drawRects([QRectF(x[i] - body_width / 2, top, body_width, size)
+                                   for i, top, size in zip(indexes, tops, heights)])
+
+        self._paint_order_lines(painter, low, high, to_y, plot_width)
+
+    def _paint_grid(self, painter, low, high, to_y, plot_width):
+        steps = 6
+        prices = np.linspace(low, high, steps + 2)[1:-1]
+        painter.setPen(QPen(GRID_COLOR, 1, Qt.DotLine))
+        painter.drawLines([QLineF(0, y, plot_width, y) for y in to_y(prices)])
+        painter.setPen(TEXT_COLOR)
+        for price, y in zip(prices, to_y(prices)):
+            painter.drawText(QPointF(plot_width + 6, y + 4), f"{price:.6g}")
+
+    def _paint_order_lines(self, painter, low, high, to_y, plot_width):
+        for prices, color in ((self.buy_prices, BUY_ORDER_COLOR), (self.sell_prices, SELL_ORDER_COLOR)):
+            shown = prices[(prices >= low) & (prices <= high)]
+            if not len(shown):
+                continue
+            painter.setPen(QPen(color, 1, Qt.DashLine))
+            painter.drawLines([QLineF(0, y, plot_width, y) for y in to_y(shown)])
+            painter.setPen(color)
+            for price, y in zip(shown, to_y(shown)):
+                painter.drawText(QPointF(plot_width + 6, y - 2), f"{price:.6g}")
+
+
+class CandlestickChart(CandlestickPainter, QOpenGLWidget):
+    """Candlestick chart rendered through OpenGL by QPainter's GL paint engine."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._init_chart()
+
+    def paintGL(self):
+        painter = QPainter(self)
+        self._paint(painter)
+        painter.end()
+
+
+class RasterCandlestickChart(CandlestickPainter, QWidget):
+    """Candlestick chart rendered in software, for systems without OpenGL."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._init_chart()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        self._paint(painter)
+        painter.end()
+
+
+def create_candlestick_chart(parent=None):
+    """Return an OpenGL chart if an OpenGL context can be created, otherwise a raster one."""
+    context = QOpenGLContext()
+    if context.create():
+        return CandlestickChart(parent)
+    return RasterCandlestickChart(parent)
@@ -0,0 +1,12 @@
+from pairs_model import LEFT_ALIGNMENT, RIGHT_ALIGNMENT, PairsTableModel
+import sys
+
+class CoinPairsTableModel(PairsTableModel):
+    """Table model for the Fat Finger Catcher's pairs and their moving averages."""
+
+    def __init__(self):
+        super().__init__([
+            ("Symbol", 'symbol', sys.intern, LEFT_ALIGNMENT),
+            ("Moving Average", 'moving_average', lambda average: f"{float(average):.8g}", RIGHT_ALIGNMENT),
+            ("Open Buys", 'open_buys', lambda open_buys: str(int(open_buys)), RIGHT_ALIGNMENT),
+        ])
@@ -0,0 +1,638 @@
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from market_cache import MarketCache
+from ohlcv_cache import OhlcvCache
+from order_index import OrderIndex
+from rate_limiter import BULK, RateLimitGovernor
+from signals import TickerVolumes, VolumeSpikeScanner
+from ticker_snapshot import TickerSnapshot
+from valuation import ValuationEngine
+
+# Attributes built by connect(). Importing ccxt takes most of a second, so it is
+# deferred until one of these is first used, normally on a worker thread.
+CONNECTED_ATTRIBUTES = ('exchange', 'bulk_exchange', 'ticker_snapshot', 'rate_limiter', 'order_submitter',
+                        'order_sync', 'market_cache', 'ohlcv_cache', 'ohlcv_caches', 'fat_finger')
+
+
+class CoinInfo:
+    def __init__(self):
+        self.available_coins = 0.0
+        self.current_value = 0.0
+        self.potential_gain = 0.0
+        self.percentage_gain = 0.0
+
+    def __eq__(self, other):
+        return isinstance(other, CoinInfo) and vars(self) == vars(other)
+
+
+class ExchangeClient:
+    """Client for interacting with cryptocurrency exchanges through ccxt or a native backend (see backends)."""
+
+    def __init__(self, config_file=None, config=None, store=None):
+        """
+        Initialize the exchange client using a configuration file.
+
+        Args:
+            config_file (str): Path to the JSON file containing API credentials and exchange name.
+            config (dict, optional): Already-loaded configuration, used instead of config_file.
+            store (LocalStore, optional): History store that receives snapshots and fills.
+        """
+        # Load API credentials from the configuration file
+        if config is None:
+            with open(config_file, 'r') as file:
+                config = json.load(file)
+
+        self.exchange_name = config['exchange'].lower()
+        self.name = config.get('name', self.exchange_name)
+        self.api_key = config['api_key']
+        self.api_secret = config['api_secret']
+
+        # Cached data
+        self.balances = {}
+        self.order_index = OrderIndex()
+        self.account_values = {}
+        self.valuation = None
+        self.total_potential_gain = 0
+        self.total_current_value = 0
+        self.valuation_engine = ValuationEngine(quote=config.get('valuation_currency', 'USD'))
+        self.max_workers = config.get('max_workers', 8)
+        self.store = store
+        self.config = config
+
+        # Volume spike signals and their paper trades
+        self.volume_scanner = VolumeSpikeScanner(window=config.get('signal_window', 60),
+                                                 threshold=config.get('signal_zscore', 4.0))
+        self.ticker_volumes = TickerVolumes()
+        self._connect_lock = threading.Lock()
+
+    def __getattr__(self, name):
+        # Only called for missing attributes, i.e. the ones connect() has not built yet
+        if name in CONNECTED_ATTRIBUTES:
+            self.connect()
+            return self.__dict__[name]
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+
+    def connect(self):
+        """
+        Import ccxt, create the exchange backend and the helpers that use it.
+
+        Called automatically the first time the exchange is needed, so creating a
+        client and showing cached data never waits on the ccxt import.
+        """
+        with self._connect_lock:
+            if 'exchange' in self.__dict__:
+                return
+
+            # ccxt-dependent modules are imported here rather than at module load
+            from backends import GovernedExchange, create_exchange
+            from fat_finger import FatFingerEngine
+            from order_submitter import OrderSubmitter
+            from order_sync import OrderSync
+
+            config = self.config
+            backend = create_exchange(config)
+
+            # Check if the exchange supports fetching balances
+            if not backend.has.get('fetchBalance', False):
+                raise ValueError(f"{self.exchange_name} does not support fetching balances.")
+
+            # Every request goes through one governor paced to the exchange's rate limit and
+            # weights; bulk scans use a lower-priority view so cancels and sells are not starved
+            rate_limiter = RateLimitGovernor.from_exchange(
+                backend, capacity=config.get('rate_limit_burst'), weights=config.get('rate_limit_weights'),
+                weight_limit=config.get('rate_limit_weight_per_minute'),
+                window=config.get('rate_limit_window', 60))
+            exchange = GovernedExchange(backend, rate_limiter)
+            self.rate_limiter = rate_limiter
+            self.bulk_exchange = exchange.with_priority(BULK)
+
+            ticker_snapshot = TickerSnapshot(exchange, max_workers=self.max_workers)
+            self.ticker_snapshot = ticker_snapshot
+            self.order_submitter = OrderSubmitter(exchange,
+                                                  ticker_snapshot=ticker_snapshot,
+                                                  max_workers=self.max_workers,
+                                                  max_retries=config.get('order_retries', 3))
+
+            # Incremental open-order sync into the order index
+            self.order_sync = OrderSync(exchange, self.order_index,
+                                        max_workers=self.max_workers,
+                                        page_limit=config.get('order_page_limit', 100),
+                                        full_sync_interval=config.get('order_full_sync_interval', 900),
+                                        on_closed=self._record_fills)
+
+            # Stink-bid ladders below each pair's moving average, from candles cached on disk
+            self.ohlcv_cache = OhlcvCache(exchange, self.exchange_name,
+                                          timeframe=config.get('fat_finger_timeframe', '1d'),
+                                          max_workers=self.max_workers)
+            self.fat_finger = FatFingerEngine(exchange, self.order_index, self.ohlcv_cache,
+                                              quote=self.valuation_engine.quote,
+                                              ma_period=config.get('fat_finger_ma_period', 20),
+                                              max_workers=self.max_workers,
+                                              batch_size=config.get('order_batch_size', 5))
+
+            # Candle caches of other timeframes, created on demand for charts
+            self.ohlcv_caches = {self.ohlcv_cache.timeframe: self.ohlcv_cache}
+
+            # Serve market metadata from disk and revalidate it in the background
+            self.market_cache = MarketCache(exchange, self.exchange_name,
+                                            ttl=config.get('market_cache_ttl', 3600))
+            self.market_cache.prime()
+
+            # Set last: its presence marks the client as connected
+            self.exchange = exchange
+
+    def fetch_balances(self):
+        """Fetch account balances from the exchange."""
+        try:
+            balance_data = self.exchange.fetch_balance()
+            self.balances = balance_data['total']
+        except Exception as e:
+            print(f"Error fetching balances: {e}")
+            self.balances = {}
+
+    def fetch_open_orders(self, symbol=None):
+        """
+        Sync open orders from the exchange into the order index.
+
+        After the first full sync only orders changed since the last sync are
+        fetched, page by page; see OrderSync.
+
+        Args:
+            symbol (str, optional): Market symbol (e.g., 'BTC/USDT'). Syncs all orders if None.
+
+        Returns:
+            set: Base currencies whose orders changed.
+        """
+        try:
+            if symbol is not None:
+                changed = self.order_sync.sync_symbol(symbol)
+            else:
+                changed = self.order_sync.sync(self._held_symbols())
+            for order in self.order_index:
+                order['exchange'] = self.name
+            return changed
+        except Exception as e:
+            print(f"Error fetching open orders: {e}")
+            return set()
+
+    def _held_symbols(self):
+        """Markets of currencies with a balance, used when orders must be synced per symbol."""
+        if not self.order_sync.per_symbol:
+            return []
+        markets = self.market_cache.load()
+        held = {currency for currency, amount in self.balances.items() if amount}
+        return [symbol for symbol, market in markets.items() if market['base'] in held]
+
+    @property
+    def open_orders(self):
+        """Cached open orders, each tagged with this client's 'exchange' name."""
+        return self.order_index.orders()
+
+    @open_orders.setter
+    def open_orders(self, orders):
+        for order in orders:
+            order['exchange'] = self.name
+        self.order_index.replace(orders)
+
+    def get_open_orders(self):
+        """Return the cached list of open orders."""
+        return self.open_orders
+
+    def get_open_orders_for_currency(self, currency):
+        """Return the cached open orders whose base currency is currency."""
+        return self.order_index.for_currency(currency)
+
+    def refresh_data(self):
+        """
+        Fetch balances, open orders and prices and rebuild the per-currency account values.
+
+        Returns:
+            dict: CoinInfo objects keyed by currency.
+        """
+        self.fetch_balances()
+        self.fetch_open_orders()
+        self.fetch_valuation_tickers()
+        self._revalue()
+        if self.store is not None:
+            self.store.record_snapshot(self.name, self.account_values, self.open_orders,
+                                       self.total_current_value, self.total_potential_gain)
+        return self.account_values
+
+    def restore_last_state(self):
+        """
+        Load the last recorded snapshot from the history store into the cached data.
+
+        Lets the UI show the previous session's state before the first refresh completes.
+
+        Returns:
+            int or None: Snapshot time in milliseconds, or None if there is no snapshot.
+        """
+        if self.store is None:
+            return None
+        state = self.store.load_last_state(self.name)
+        if state is None:
+            return None
+
+        account_values = {}
+        for currency, available_coins, current_value, potential_gain, percentage_gain in state['balances']:
+            coin_info = CoinInfo()
+            coin_info.available_coins = available_coins
+            coin_info.current_value = current_value
+            coin_info.potential_gain = potential_gain
+            coin_info.percentage_gain = percentage_gain
+            account_values[currency] = coin_info
+
+        self.balances = {currency: info.available_coins for currency, info in account_values.items()}
+        self.open_orders = state['open_orders']
+        self.account_values = account_values
+        self.total_current_value = state['total_current_value']
+        self.total_potential_gain = state['total_potential_gain']
+        return state['timestamp']
+
+    def _record_fills(self, orders):
+        if self.store is not None:
+            self.store.record_fills(self.name, orders)
+
+    def fetch_valuation_tickers(self):
+        """Fetch the tickers needed to value every held or ordered currency in one snapshot."""
+        try:
+            markets = self.market_cache.load()
+            currencies = {currency for currency, amount in self.balances.items() if amount}
+            currencies |= self.order_index.currencies()
+            self.ticker_snapshot.refresh(self.valuation_engine.symbols_for(markets, currencies))
+        except Exception as e:
+            print(f"Error fetching tickers for valuation: {e}")
+
+    def _revalue(self):
+        """
+        Re-run the valuation engine over the cached balances, orders and tickers.
+
+        Returns:
+            set: Currencies whose CoinInfo changed.
+        """
+        valuation = self.valuation_engine.value(self.balances, self.open_orders, self.ticker_snapshot.tickers)
+        self.valuation = valuation
+
+        account_values = {}
+        for i, currency in enumerate(valuation.currencies):
+            coin_info = CoinInfo()
+            coin_info.available_coins = float(valuation.balances[i])
+            coin_info.current_value = float(valuation.current_value[i])
+            coin_info.potential_gain = float(valuation.potential_gain[i])
+            coin_info.percentage_gain = float(valuation.percentage_gain[i])
+            account_values[currency] = coin_info
+
+        changed = {
+            currency for currency in set(account_values) | set(self.account_values)
+            if account_values.get(currency) != self.account_values.get(currency)
+        }
+        self.account_values = account_values
+        self.total_potential_gain = valuation.total_potential_gain
+        self.total_current_value = valuation.total_current_value
+        return changed
+
+    def apply_balance_update(self, balance_data):
+        """
+        Merge a streamed balance update into the cached balances.
+
+        Args:
+            balance_data (dict): ccxt balance structure, e.g. from watch_balance.
+
+        Returns:
+            set: Currencies whose account values changed.
+        """
+        totals = balance_data.get('total') or {}
+        if all(self.balances.get(currency) == amount for currency, amount in totals.items()):
+            return set()
+        self.balances = {**self.balances, **totals}
+        return self._revalue()
+
+    def apply_order_updates(self, orders):
+        """
+        Merge streamed order updates into the cached open orders.
+
+        Open orders are inserted or replaced by id; filled or canceled orders are removed.
+
+        Args:
+            orders (list): ccxt order structures, e.g. from watch_orders.
+
+        Returns:
+            set: Currencies whose account values or open orders changed.
+        """
+        if not orders:
+            return set()
+
+        currencies = set()
+        for order in orders:
+            order['exchange'] = self.name
+            currencies.add(self.order_index.apply(order))
+        self._record_fills([order for order in orders if order.get('status') == 'closed'])
+
+        # Open order counts change even when the valuation does not, e.g. for buy orders
+        return self._revalue() | currencies
+
+    def apply_polled_update(self, update):
+        """
+        Merge a REST poll of an exchange that cannot stream into the cached data.
+
+        Open orders and tickers were already synced by the poll; see StreamingSession.
+
+        Args:
+            update (dict): 'total' balances and 'currencies' whose open orders changed.
+
+        Returns:
+            set: Currencies whose account values or open orders changed.
+        """
+        self.balances = {**self.balances, **update['total']}
+        return self._revalue() | update['currencies']
+
+    def apply_ticker_update(self, tickers):
+        """
+        Merge streamed tickers into the ticker snapshot and re-value the account.
+
+        Args:
+            tickers (dict): ccxt tickers keyed by symbol, e.g. from watch_tickers.
+
+        Returns:
+            set: Currencies whose account values changed.
+        """
+        self.ticker_snapshot.tickers.update(tickers)
+        return self._revalue()
+
+    def calculate_potential_account_value(self):
+        """
+        Calculate the potential account value if all open limit sell orders were filled.
+
+        Proceeds of orders quoted in other currencies are converted to the
+        valuation currency through the ticker snapshot.
+
+        Returns:
+            dict: Potential value by currency.
+        """
+        self._revalue()
+        return {currency: info.potential_gain for currency, info in self.account_values.items()}
+
+    def cancel_all_orders(self, symbol=None, currency=None):
+        """
+        Cancel all open orders for a specific symbol, base currency, or all symbols.
+
+        Uses the exchange's batch cancel endpoints when available and otherwise
+        cancels orders concurrently, all on one pool of max_workers threads. A
+        failed batch falls back to single cancels, and a failed cancel does not
+        stop the others.
+
+        Args:
+            symbol (str, optional): Market symbol (e.g., 'BTC/USDT').
+            currency (str, optional): Base currency (e.g., 'BTC'). Cancels orders on every market for it.
+
+        Returns:
+            dict: Results with 'success' and 'failed' lists of per-order entries.
+        """
+        if symbol is not None:
+            orders_to_cancel = self.order_index.for_symbol(symbol)
+        elif currency is not None:
+            orders_to_cancel = self.order_index.for_currency(currency)
+        else:
+            orders_to_cancel = self.open_orders
+
+        results = {'success': [], 'failed': []}
+        if not orders_to_cancel:
+            return results
+
+        # One pool carries every request: batch cancels per market first, then single cancels
+        # for exchanges without a batch endpoint and for any batch that failed
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            singles = {}
+            if self.exchange.has.get('cancelAllOrders', False) or self.exchange.has.get('cancelOrders', False):
+                orders_by_symbol = {}
+                for order in orders_to_cancel:
+                    orders_by_symbol.setdefault(order['symbol'], []).append(order)
+                batches = {
+                    executor.submit(self._cancel_symbol_orders, market_symbol, orders): (market_symbol, orders)
+                    for market_symbol, orders in orders_by_symbol.items()
+                }
+                for future in as_completed(batches):
+                    market_symbol, orders = batches[future]
+                    try:
+                        future.result()
+                        results['success'].extend({'symbol': market_symbol, 'order_id': order['id']}
+                                                  for order in orders)
+                    except Exception as e:
+                        print(f"Error batch canceling orders for {market_symbol}, canceling individually: {e}")
+                        singles.update({executor.submit(self._cancel_order, order): order for order in orders})
+            else:
+                singles = {executor.submit(self._cancel_order, order): order for order in orders_to_cancel}
+
+            for future in as_completed(singles):
+                order = singles[future]
+                try:
+                    future.result()
+                    results['success'].append({'symbol': order['symbol'], 'order_id': order['id']})
+                except Exception as e:
+                    print(f"Error canceling order {order['id']} for {order['symbol']}: {e}")
+                    results['failed'].append({'symbol': order['symbol'], 'order_id': order['id'], 'error': str(e)})
+
+        for entry in results['success']:
+            self.order_index.remove(entry['order_id'])
+        return results
+
+    def _cancel_symbol_orders(self, symbol, orders):
+        """Cancel the given orders on one market with the exchange's batch endpoint."""
+        if self.exchange.has.get('cancelAllOrders', False):
+            return self.exchange.cancel_all_orders(symbol)
+        return self.exchange.cancel_orders([order['id'] for order in orders], symbol)
+
+    def _cancel_order(self, order):
+        return self.exchange.cancel_order(order['id'], order['symbol'])
+
+    def market_sell_entire_position(self, symbol):
+        """
+        Market sell the entire position for a specific symbol.
+
+        Args:
+            symbol (str): Market symbol (e.g., 'BTC/USDT').
+        """
+        base_currency = symbol.split('/')[0]
+        if base_currency in self.balances and self.balances[base_currency] > 0:
+            try:
+                self.exchange.create_market_sell_order(symbol, self.balances[base_currency])
+            except Exception as e:
+                print(f"Error placing market sell order: {e}")
+    
+    def get_usd_pairs_under_threshold(self, threshold=20.0, progress=None, cancel_event=None):
+        """
+        Get all USD trading pairs where current balance is under threshold.
+        
+        Args:
+            threshold (float): Minimum USD value threshold
+            progress (callable, optional): Called with (done, total) while tickers are fetched
+            cancel_event (threading.Event, optional): Stops the ticker fetch when set
+            
+        Returns:
+            list: List of dicts with currency, balance, and symbol info
+        """
+        try:
+            markets = self.market_cache.load()
+            usd_markets = [
+                market for market in markets.values()
+                if market['quote'] == 'USD' and market['active']
+            ]
+
+            # Fetch every ticker up front at bulk priority, then scan the in-memory snapshot
+            snapshot = TickerSnapshot(self.bulk_exchange, max_workers=self.max_workers)
+            tickers = snapshot.refresh([market['symbol'] for market in usd_markets],
+                                       progress=progress, cancel_event=cancel_event)
+            self.ticker_snapshot.tickers.update(tickers)
+
+            usd_pairs = []
+            for market in usd_markets:
+                symbol = market['symbol']
+                ticker = tickers.get(symbol)
+                if ticker is None or ticker.get('last') is None:
+                    continue
+
+                # Get current balance in USD
+                balance = self.balances.get(market['base'], 0)
+                usd_value = balance * ticker['last']
+
+                if usd_value < threshold:
+                    usd_pairs.append({
+                        'currency': market['base'],
+                        'balance': usd_value,
+                        'symbol': symbol
+                    })
+
+            # Sort by currency name
+            usd_pairs.sort(key=lambda x: x['currency'])
+            return usd_pairs
+
+        except Exception as e:
+            print(f"Error getting USD pairs: {e}")
+            return []
+    
+    def market_buy_multiple(self, symbols, usd_amount_per_coin, progress=None, on_result=None,
+                            cancel_event=None):
+        """
+        Execute market buy orders for multiple symbols.
+        
+        Args:
+            symbols (list): List of trading pair symbols (e.g., ['BTC/USD', 'ETH/USD'])
+            usd_amount_per_coin (float): USD amount to spend on each coin
+            progress (callable, optional): Called with (done, total) after each order
+            on_result (callable, optional): Called with ('success' | 'failed', entry) after each order
+            cancel_event (threading.Event, optional): Stops placing further orders when set
+            
+        Returns:
+            dict: Results with success/failure info and latency for each symbol
+        """
+        return self.order_submitter.market_buy_multiple(symbols, usd_amount_per_coin, progress=progress,
+                                                        on_result=on_result, cancel_event=cancel_event)
+
+    def get_fat_finger_pairs(self, progress=None, cancel_event=None):
+        """
+        Get the pairs the Fat Finger Catcher can ladder, with their moving averages.
+
+        Args:
+            progress (callable, optional): Called with (done, total) while candles are fetched
+            cancel_event (threading.Event, optional): Stops the candle fetch when set
+
+        Returns:
+            list: List of dicts with symbol, moving_average and open_buys, sorted by symbol
+        """
+        try:
+            markets = self.market_cache.load()
+            moving_averages = self.fat_finger.moving_averages(self.fat_finger.pairs(markets), progress=progress,
+                                                              cancel_event=cancel_event)
+            return [
+                {
+                    'symbol': symbol,
+                    'moving_average': moving_average,
+                    'open_buys': sum(order['side'] == 'buy' for order in self.order_index.for_symbol(symbol)),
+                }
+                for symbol, moving_average in sorted(moving_averages.items())
+            ]
+        except Exception as e:
+            print(f"Error getting fat finger pairs: {e}")
+            return []
+
+    def place_fat_finger_orders(self, symbols, num_orders, percentage, usd_per_order, progress=None,
+                                on_result=None, cancel_event=None):
+        """
+        Place or replenish ladders of limit buys below each symbol's moving average.
+
+        Only rungs without an open buy order near their price are placed, and
+        never more than num_orders open buys per symbol, so calling this again
+        tops up ladders whose orders were filled or canceled.
+
+        Args:
+            symbols (list): Trading pair symbols (e.g., ['BTC/USD', 'ETH/USD'])
+            num_orders (int): Limit buys per ladder
+            percentage (float): Distance between rungs, in percent below the moving average
+            usd_per_order (float): USD amount spent by each limit buy
+            progress (callable, optional): Called with (done, total) after each order request
+            on_result (callable, optional): Called with ('success' | 'failed', entry) after each order
+            cancel_event (threading.Event, optional): Stops placing further orders when set
+
+        Returns:
+            dict: {'success': [...], 'failed': [...]}
+        """
+        self.market_cache.load()
+        moving_averages = self.fat_finger.moving_averages(symbols, cancel_event=cancel_event)
+        orders = self.fat_finger.plan(moving_averages, num_orders, percentage, usd_per_order)
+        results = self.fat_finger.place(orders, progress=progress, on_result=on_result, cancel_event=cancel_event)
+
+        # Index new orders right away so a replenish before the next refresh does not duplicate them
+        for entry in results['success']:
+            entry['order']['exchange'] = self.name
+            self.order_index.apply(entry['order'])
+        return results
+
+    def get_chart_data(self, symbol, timeframe='1h', limit=1000):
+        """
+        Get candles and open order prices for a candlestick chart.
+
+        Only candles closed since the last call are fetched; see OhlcvCache.
+
+        Args:
+            symbol (str): Market symbol (e.g., 'BTC/USD').
+            timeframe (str): ccxt timeframe.
+            limit (int): Minimum number of candles of history to fetch.
+
+        Returns:
+            tuple: ((n, 6) OHLCV array, buy order prices, sell order prices).
+        """
+        cache = self.ohlcv_caches.get(timeframe)
+        if cache is None:
+            cache = OhlcvCache(self.exchange, self.exchange_name, timeframe=timeframe,
+                               max_workers=self.max_workers)
+            self.ohlcv_caches[timeframe] = cache
+        cache.refresh([symbol], limit)
+
+        orders = self.order_index.for_symbol(symbol)
+        buy_prices = [float(order['price']) for order in orders if order['side'] == 'buy' and order.get('price')]
+        sell_prices = [float(order['price']) for order in orders if order['side'] == 'sell' and order.get('price')]
+        return cache.candles(symbol), buy_prices, sell_prices
+
+    def scan_volume_spikes(self):
+        """
+        Run one tick of the volume spike scanner over every market.
+
+        All tickers are fetched in a single request; the volume traded since the
+        previous scan is scored against each market's rolling volume statistics.
+        Paper trades closed on this tick are recorded in the history store.
+
+        Returns:
+            dict: 'signals' (spikes found on this tick), 'closed' (paper trades closed
+            on this tick) and 'open' (paper trades still open). See VolumeSpikeScanner.
+        """
+        if not self.exchange.has.get('fetchTickers', False):
+            raise ValueError(f"{self.exchange_name} cannot fetch all tickers in one request, "
+                             "which scanning every market needs.")
+
+        tickers = self.bulk_exchange.fetch_tickers()
+        volumes, prices = self.ticker_volumes.update(tickers)
+        signals, closed = self.volume_scanner.on_tick(self.exchange.milliseconds(), volumes, prices)
+        if closed and self.store is not None:
+            self.store.record_paper_trades(self.name, closed)
+        return {'signals': signals, 'closed': closed, 'open': self.volume_scanner.open_trades()}
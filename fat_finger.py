@@ -0,0 +1,194 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import numpy as np
+from ohlcv_cache import CLOSE
+
+
+class FatFingerEngine:
+    """
+    Keeps ladders of stink-bid limit buys below each pair's moving average.
+
+    Every pair gets N limit buys at X%, 2X%, ... NX% below the simple moving
+    average of its closes. Placing a ladder again only submits the rungs that
+    have no open buy order near their price, and never more than N open buys
+    per pair, so re-running it replenishes filled or canceled rungs without
+    duplicating the others, even after the moving average has moved.
+    """
+
+    def __init__(self, exchange, order_index, ohlcv_cache, quote='USD', ma_period=20,
+                 max_workers=8, batch_size=5):
+        """
+        Initialize the engine.
+
+        Args:
+            exchange (ccxt.Exchange): Exchange instance used to place orders.
+            order_index (OrderIndex): Open orders, used to skip rungs that are already placed.
+            ohlcv_cache (OhlcvCache): Candle cache the moving averages are computed from.
+            quote (str): Quote currency of the pairs laddered.
+            ma_period (int): Number of closed candles in the moving average.
+            max_workers (int): Maximum order requests in flight at once.
+            batch_size (int): Orders per create_orders request on exchanges that support it.
+        """
+        self.exchange = exchange
+        self.order_index = order_index
+        self.ohlcv_cache = ohlcv_cache
+        self.quote = quote
+        self.ma_period = ma_period
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+
+    def pairs(self, markets):
+        """Return the active spot symbols quoted in the engine's quote currency, sorted."""
+        return sorted(
+            market['symbol'] for market in markets.values()
+            if market['quote'] == self.quote and market.get('spot', True) and market['active'] is not False
+        )
+
+    def moving_averages(self, symbols, progress=None, cancel_event=None):
+        """
+        Return the simple moving average of closes for every symbol with enough history.
+
+        Args:
+            symbols (list): Market symbols.
+            progress (callable, optional): Called with (done, total) as candles are fetched.
+            cancel_event (threading.Event, optional): Stops pending candle fetches when set.
+
+        Returns:
+            dict: Moving average keyed by symbol.
+        """
+        candles = self.ohlcv_cache.refresh(symbols, self.ma_period, progress=progress, cancel_event=cancel_event)
+        return {
+            symbol: float(bars[:, CLOSE].mean())
+            for symbol, bars in candles.items() if len(bars) == self.ma_period
+        }
+
+    @staticmethod
+    def ladder(moving_average, num_orders, percentage):
+        """Return the ladder's prices: percentage, 2 * percentage, ... percent below the moving average."""
+        steps = np.arange(1, num_orders + 1) * (percentage / 100.0)
+        prices = moving_average * (1.0 - steps)
+        return prices[prices > 0]
+
+    def plan(self, moving_averages, num_orders, percentage, usd_per_order):
+        """
+        Build the limit buys needed to complete every ladder.
+
+        Rungs with an open buy order within half a step of their price are
+        skipped, as are orders below the market's minimum amount or cost.
+        Every open buy on a symbol counts against num_orders, wherever its
+        price is, so a ladder placed from an older moving average is not
+        duplicated at the new prices: only the highest missing rungs are
+        planned, up to num_orders open buys in total.
+
+        Args:
+            moving_averages (dict): Moving average keyed by symbol.
+            num_orders (int): Rungs per ladder.
+            percentage (float): Distance between rungs, in percent of the moving average.
+            usd_per_order (float): Quote amount spent by each rung.
+
+        Returns:
+            list: Order requests as dicts with symbol, type, side, amount and price.
+        """
+        orders = []
+        for symbol, moving_average in moving_averages.items():
+            market = self.exchange.markets[symbol]
+            tolerance = moving_average * percentage / 200.0
+            open_buys = [order for order in self.order_index.for_symbol(symbol) if order['side'] == 'buy']
+            open_prices = np.array([float(order['price']) for order in open_buys if order.get('price')])
+            missing = num_orders - len(open_buys)
+
+            for price in self.ladder(moving_average, num_orders, percentage):
+                if missing <= 0:
+                    break
+                if len(open_prices) and np.abs(open_prices - price).min() <= tolerance:
+                    continue
+                try:
+                    amount = float(self.exchange.amount_to_precision(symbol, usd_per_order / price))
+                    price = float(self.exchange.price_to_precision(symbol, price))
+                except Exception as e:
+                    # ccxt raises when the rounded amount falls below the market's minimum
+                    print(f"Skipping {symbol} rung at {price}: {e}")
+                    continue
+                if not self._within_limits(market, amount, price):
+                    continue
+                orders.append({'symbol': symbol, 'type': 'limit', 'side': 'buy', 'amount': amount, 'price': price})
+                missing -= 1
+        return orders
+
+    @staticmethod
+    def _within_limits(market, amount, price):
+        limits = market.get('limits') or {}
+        min_amount = (limits.get('amount') or {}).get('min')
+        min_cost = (limits.get('cost') or {}).get('min')
+        return amount > 0 and not (min_amount and amount < min_amount) and not (min_cost and amount * price < min_cost)
+
+    def place(self, orders, progress=None, on_result=None, cancel_event=None):
+        """
+        Submit limit buys, in create_orders batches where the exchange supports it.
+
+        Args:
+            orders (list): Order requests from plan().
+            progress (callable, optional): Called with (done, total) after each request.
+            on_result (callable, optional): Called with ('success' | 'failed', entry) for each order.
+            cancel_event (threading.Event, optional): Skips requests not yet started when set.
+
+        Returns:
+            dict: {'success': [...], 'failed': [...]}. Successes carry the symbol, price
+            and the created 'order'; failures carry the symbol, price and error.
+        """
+        results = {'success': [], 'failed': []}
+        if self.exchange.has.get('createOrders') and self.batch_size > 1:
+            requests = [orders[i:i + self.batch_size] for i in range(0, len(orders), self.batch_size)]
+            submit = self._submit_batch
+        else:
+            requests = [[order] for order in orders]
+            submit = self._submit_one
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(submit, batch, cancel_event) for batch in requests]
+            for done, future in enumerate(as_completed(futures), start=1):
+                for status, entry in future.result():
+                    results[status].append(entry)
+                    if on_result:
+                        on_result(status, entry)
+                if progress:
+                    progress(done, len(requests))
+        return results
+
+    def _submit_batch(self, batch, cancel_event):
+        if cancel_event is not None and cancel_event.is_set():
+            return []
+        try:
+            created = self.exchange.create_orders(batch)
+        except Exception as e:
+            print(f"Error placing {len(batch)} ladder orders: {e}")
+            return [self._failed(request, e) for request in batch]
+
+        # create_orders returns one structure per request, in order; rejected ones have no id
+        entries = []
+        for request, order in zip(batch, created):
+            if order.get('id') is None:
+                entries.append(self._failed(request, order.get('info') or 'rejected'))
+            else:
+                entries.append(self._succeeded(request, order))
+        return entries
+
+    def _submit_one(self, batch, cancel_event):
+        request = batch[0]
+        if cancel_event is not None and cancel_event.is_set():
+            return []
+        try:
+            order = self.exchange.create_limit_buy_order(request['symbol'], request['amount'], request['price'])
+        except Exception as e:
+            print(f"Error placing ladder order on {request['symbol']}: {e}")
+            return [self._failed(request, e)]
+        return [self._succeeded(request, order)]
+
+    @staticmethod
+    def _succeeded(request, order):
+        # Exchanges often echo back only the id, so fill the rest in from the request
+        order = {**request, 'status': 'open', **{key: value for key, value in order.items() if value is not None}}
+        return 'success', {'symbol': request['symbol'], 'price': request['price'], 'order': order}
+
+    @staticmethod
+    def _failed(request, error):
+        return 'failed', {'symbol': request['symbol'], 'price': request['price'], 'error': str(error)}
@@ -0,0 +1,120 @@
+import json
+import os
+import threading
+import time
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".field_orders")
+
+
+class MarketCache:
+    """TTL cache of exchange market metadata, persisted to disk per exchange."""
+
+    def __init__(self, exchange, exchange_name, ttl=3600, cache_dir=DEFAULT_CACHE_DIR):
+        """
+        Initialize the market cache.
+
+        Args:
+            exchange (ccxt.Exchange): Exchange instance whose markets are cached.
+            exchange_name (str): Exchange id, used to key the cache file.
+            ttl (float): Seconds before cached markets are revalidated.
+            cache_dir (str): Directory holding the cache files.
+        """
+        self.exchange = exchange
+        self.ttl = ttl
+        self.path = os.path.join(cache_dir, f"markets_{exchange_name}.json")
+        self.fetched_at = 0.0
+        self._lock = threading.Lock()
+        self._revalidating = False
+
+    @property
+    def markets(self):
+        return self.exchange.markets or {}
+
+    def is_stale(self):
+        return time.time() - self.fetched_at >= self.ttl
+
+    def prime(self):
+        """
+        Load markets from disk without touching the network.
+
+        If the on-disk copy is older than the TTL a background revalidation
+        is started, so startup never waits on the market download.
+        """
+        if self._load_from_disk() and self.is_stale():
+            self.revalidate_in_background()
+
+    def load_cached(self):
+        """Populate the exchange from the cache file if it exists. Returns True on success."""
+        return self._load_from_disk()
+
+    def store(self):
+        """Record that the exchange's markets were just downloaded and persist them."""
+        self.fetched_at = time.time()
+        self._save_to_disk()
+
+    def load(self):
+        """
+        Return market metadata, downloading it only when nothing is cached.
+
+        Stale entries are served immediately and refreshed in the background.
+
+        Returns:
+            dict: Markets keyed by symbol, as returned by ccxt load_markets.
+        """
+        if not self.exchange.markets and not self._load_from_disk():
+            self._download()
+        elif self.is_stale():
+            self.revalidate_in_background()
+        return self.markets
+
+    def revalidate_in_background(self):
+        """Re-download markets on a daemon thread unless a download is already running."""
+        with self._lock:
+            if self._revalidating:
+                return
+            self._revalidating = True
+
+        def worker():
+            try:
+                self._download()
+            except Exception as e:
+                print(f"Error revalidating markets: {e}")
+            finally:
+                with self._lock:
+                    self._revalidating = False
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def _download(self):
+        """Download markets from the exchange and persist them."""
+        self.exchange.load_markets(reload=True)
+        self.store()
+
+    def _load_from_disk(self):
+        """Populate the exchange from the cache file. Returns True on success."""
+        try:
+            with open(self.path, 'r') as file:
+                cached = json.load(file)
+            self.exchange.set_markets(cached['markets'], cached.get('currencies') or None)
+            self.fetched_at = cached['fetched_at']
+            return True
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            print(f"Error loading cached markets from {self.path}: {e}")
+            return False
+
+    def _save_to_disk(self):
+        """Write markets to the cache file atomically."""
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w') as file:
+                json.dump({
+                    'fetched_at': self.fetched_at,
+                    'markets': self.exchange.markets,
+                    'currencies': self.exchange.currencies,
+                }, file, default=str)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"Error saving markets to {self.path}: {e}")
@@ -0,0 +1,188 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import os
+import threading
+import numpy as np
+from market_cache import DEFAULT_CACHE_DIR
+
+# Columns of a candle array, in ccxt's OHLCV order
+TIMESTAMP, OPEN, HIGH, LOW, CLOSE, VOLUME = range(6)
+
+# On-disk record: one candle as six little-endian float64 values
+CANDLE_DTYPE = np.dtype('<f8')
+RECORD_SIZE = 6 * CANDLE_DTYPE.itemsize
+
+
+class OhlcvCache:
+    """
+    Cache of closed OHLCV candles per symbol, extended incrementally.
+
+    Candles are kept in one append-only binary file per (exchange, symbol,
+    timeframe) and read through np.memmap, so loading history costs no parsing
+    or copying. A symbol is only fetched again once a new candle has closed,
+    and then only the candles after the last stored one are requested, so
+    keeping hundreds of pairs current costs one small request per pair per
+    timeframe. When the exchange returns less history than asked for, that
+    count is remembered as the most the symbol can hold, so a capped or young
+    pair is extended rather than fetched in full again every period.
+    """
+
+    def __init__(self, exchange, exchange_name=None, timeframe='1d', max_workers=8,
+                 cache_dir=DEFAULT_CACHE_DIR):
+        """
+        Initialize the OHLCV cache.
+
+        Args:
+            exchange (ccxt.Exchange): Exchange instance used to fetch candles.
+            exchange_name (str, optional): Exchange id, used to key the cache files. Defaults to exchange.id.
+            timeframe (str): ccxt timeframe, e.g. '1h' or '1d'.
+            max_workers (int): Maximum concurrent fetch_ohlcv calls.
+            cache_dir (str): Directory holding the cache files.
+        """
+        self.exchange = exchange
+        self.timeframe = timeframe
+        self.max_workers = max_workers
+        self.duration_ms = exchange.parse_timeframe(timeframe) * 1000
+        self.directory = os.path.join(cache_dir, "ohlcv", exchange_name or exchange.id, timeframe)
+        self._candles = {}
+        self._checked = {}
+        self._available = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def candles(self, symbol, limit=None):
+        """
+        Return the stored closed candles of a symbol as an (n, 6) array, oldest first.
+
+        The array is a read-only view of the memory-mapped cache file.
+
+        Args:
+            symbol (str): Market symbol.
+            limit (int, optional): Only the most recent limit candles.
+        """
+        candles = self._candles.get(symbol)
+        if candles is None:
+            candles = self._open(symbol)
+        return candles if limit is None else candles[-limit:]
+
+    def refresh(self, symbols, limit, progress=None, cancel_event=None):
+        """
+        Bring the stored candles of every symbol up to date.
+
+        Args:
+            symbols (list): Market symbols.
+            limit (int): Minimum number of closed candles of history to hold per symbol.
+            progress (callable, optional): Called with (done, total) as symbols complete.
+            cancel_event (threading.Event, optional): Stops pending fetches when set.
+
+        Returns:
+            dict: The most recent limit candles keyed by symbol, as (n, 6) arrays.
+            Symbols with no candles are omitted.
+        """
+        now = self.exchange.milliseconds()
+        stale = [symbol for symbol in symbols if self._needs_fetch(symbol, limit, now)]
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(self._fetch, symbol, limit, now): symbol for symbol in stale}
+            for done, future in enumerate(as_completed(futures), start=1):
+                symbol = futures[future]
+                try:
+                    future.result()
+                except Exception as e:
+                    print(f"Error fetching OHLCV for {symbol}: {e}")
+                if progress:
+                    progress(done, len(stale))
+                if cancel_event is not None and cancel_event.is_set():
+                    for pending in futures:
+                        pending.cancel()
+                    break
+
+        candles = {symbol: self.candles(symbol, limit) for symbol in symbols}
+        return {symbol: bars for symbol, bars in candles.items() if len(bars)}
+
+    def _needs_fetch(self, symbol, limit, now):
+        # Look at most once per candle: young or illiquid pairs may have no new candle to fetch
+        if self._checked.get(symbol, 0) + self.duration_ms > now:
+            return False
+        candles = self.candles(symbol)
+        # Nothing or too short a history stored, or the candle after the last stored one has closed
+        return (not len(candles) or len(candles) < self._wanted(symbol, limit)
+                or candles[-1, TIMESTAMP] + 2 * self.duration_ms <= now)
+
+    def _wanted(self, symbol, limit):
+        """Candles of history to hold: limit, or fewer if the exchange had fewer to give."""
+        return min(limit, self._available.get(symbol, limit))
+
+    def _fetch(self, symbol, limit, now):
+        """Fetch the candles after the last stored one and append them to the cache file."""
+        stored = self.candles(symbol)
+        since = None
+        if len(stored) and len(stored) >= self._wanted(symbol, limit):
+            since = int(stored[-1, TIMESTAMP]) + self.duration_ms
+
+        rows = self.exchange.fetch_ohlcv(symbol, self.timeframe, since, None if since else limit + 1)
+        fetched = np.array(rows, dtype=CANDLE_DTYPE).reshape(-1, 6)
+
+        # Keep closed candles only: the newest one is still forming
+        fetched = fetched[fetched[:, TIMESTAMP] + self.duration_ms <= now]
+        if since is None:
+            # Not enough history stored to extend: start the file over from a full fetch
+            if len(rows) < limit + 1:
+                # The exchange caps its bars, or the pair is younger than limit candles
+                self._available[symbol] = len(fetched)
+            self._rewrite(symbol, fetched)
+        else:
+            self._append(symbol, fetched[fetched[:, TIMESTAMP] >= since])
+        self._checked[symbol] = now
+
+    # File storage
+
+    def _path(self, symbol):
+        return os.path.join(self.directory, symbol.replace('/', '-').replace(':', '_') + ".bin")
+
+    def _symbol_lock(self, symbol):
+        """Return the lock serializing reads and writes of one symbol's cache file."""
+        with self._lock:
+            return self._locks.setdefault(symbol, threading.RLock())
+
+    def _open(self, symbol):
+        """Memory-map a symbol's cache file, dropping any torn record at its end."""
+        path = self._path(symbol)
+        # Held across the size check and truncation, so a concurrent append is never cut short
+        with self._symbol_lock(symbol):
+            try:
+                size = os.path.getsize(path)
+            except OSError:
+                return np.empty((0, 6), dtype=CANDLE_DTYPE)
+
+            count = size // RECORD_SIZE
+            if size % RECORD_SIZE:
+                # An interrupted append left a partial record
+                with open(path, 'r+b') as file:
+                    file.truncate(count * RECORD_SIZE)
+            if not count:
+                return np.empty((0, 6), dtype=CANDLE_DTYPE)
+
+            candles = np.memmap(path, dtype=CANDLE_DTYPE, mode='r', shape=(count, 6))
+            self._candles[symbol] = candles
+            return candles
+
+    def _append(self, symbol, candles):
+        if not len(candles):
+            return
+        with self._symbol_lock(symbol):
+            os.makedirs(self.directory, exist_ok=True)
+            with open(self._path(symbol), 'ab') as file:
+                file.write(np.ascontiguousarray(candles, dtype=CANDLE_DTYPE).tobytes())
+            self._open(symbol)
+
+    def _rewrite(self, symbol, candles):
+        path = self._path(symbol)
+        temp_path = f"{path}.tmp"
+        with self._symbol_lock(symbol):
+            os.makedirs(self.directory, exist_ok=True)
+            with open(temp_path, 'wb') as file:
+                file.write(np.ascontiguousarray(candles, dtype=CANDLE_DTYPE).tobytes())
+            # Release the old mapping before replacing the file it maps
+            self._candles.pop(symbol, None)
+            os.replace(temp_path, path)
+            self._open(symbol)
@@ -0,0 +1,129 @@
+import threading
+
+
+class OrderIndex:
+    """
+    Open orders indexed by id, market symbol and base currency, updated incrementally.
+
+    Worker threads update the index while the GUI thread reads it, so every
+    method holds the index's lock and returns copies rather than live views.
+    Hold lock across several calls that must apply together.
+    """
+
+    def __init__(self, orders=()):
+        # Reentrant, so a caller holding it can still call the methods
+        self.lock = threading.RLock()
+        self.by_id = {}
+        self.by_symbol = {}
+        self.by_currency = {}
+        self._list = None
+        self.replace(orders)
+
+    def __len__(self):
+        with self.lock:
+            return len(self.by_id)
+
+    def __iter__(self):
+        return iter(self.orders())
+
+    def __contains__(self, order_id):
+        with self.lock:
+            return order_id in self.by_id
+
+    def orders(self):
+        """Return all open orders as a list. The list is cached until the index changes."""
+        with self.lock:
+            if self._list is None:
+                self._list = list(self.by_id.values())
+            return self._list
+
+    def replace(self, orders):
+        """Rebuild the index from a full list of open orders."""
+        with self.lock:
+            self.by_id = {}
+            self.by_symbol = {}
+            self.by_currency = {}
+            self._list = None
+            for order in orders:
+                self._insert(order)
+
+    def apply(self, order):
+        """
+        Apply an order event.
+
+        Open orders are inserted or replaced; filled, canceled, expired or
+        rejected orders are removed.
+
+        Args:
+            order (dict): ccxt order structure.
+
+        Returns:
+            str: The order's base currency.
+        """
+        with self.lock:
+            self.remove(order['id'])
+            if (order.get('status') or 'open') == 'open':
+                self._insert(order)
+        return order['symbol'].split('/')[0]
+
+    def remove(self, order_id):
+        """Remove an order by id. Returns the removed order, or None if it was not indexed."""
+        with self.lock:
+            order = self.by_id.pop(order_id, None)
+            if order is None:
+                return None
+            self._list = None
+            symbol = order['symbol']
+            currency = symbol.split('/')[0]
+            self._discard(self.by_symbol, symbol, order_id)
+            self._discard(self.by_currency, currency, order_id)
+            return order
+
+    def get(self, order_id):
+        with self.lock:
+            return self.by_id.get(order_id)
+
+    def for_symbol(self, symbol):
+        """Return the open orders on a market symbol."""
+        with self.lock:
+            return list(self.by_symbol.get(symbol, {}).values())
+
+    def for_currency(self, currency):
+        """Return the open orders whose base currency is currency."""
+        with self.lock:
+            return list(self.by_currency.get(currency, {}).values())
+
+    def count_for_currency(self, currency):
+        with self.lock:
+            return len(self.by_currency.get(currency, ()))
+
+    def currency_counts(self):
+        """Return the number of open orders per base currency."""
+        with self.lock:
+            return {currency: len(orders) for currency, orders in self.by_currency.items()}
+
+    def symbols(self):
+        """Return the market symbols with open orders."""
+        with self.lock:
+            return set(self.by_symbol)
+
+    def currencies(self):
+        """Return the base currencies with open orders."""
+        with self.lock:
+            return set(self.by_currency)
+
+    def _insert(self, order):
+        self._list = None
+        order_id = order['id']
+        symbol = order['symbol']
+        self.by_id[order_id] = order
+        self.by_symbol.setdefault(symbol, {})[order_id] = order
+        self.by_currency.setdefault(symbol.split('/')[0], {})[order_id] = order
+
+    @staticmethod
+    def _discard(index, key, order_id):
+        orders = index.get(key)
+        if orders is not None:
+            orders.pop(order_id, None)
+            if not orders:
+                del index[key]
@@ -0,0 +1,115 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import time
+import ccxt
+
+# Errors after which an order request is known not to have reached the matching engine.
+# Timeouts are deliberately excluded: the order may have been placed, so retrying could double-buy.
+RETRYABLE_ORDER_ERRORS = (ccxt.RateLimitExceeded, ccxt.DDoSProtection, ccxt.ExchangeNotAvailable)
+
+
+class OrderSubmitter:
+    """Submits market orders in parallel, paced by the exchange's shared rate limit governor."""
+
+    def __init__(self, exchange, ticker_snapshot=None, max_workers=8, max_retries=3,
+                 backoff=0.5):
+        """
+        Initialize the order submitter.
+
+        Args:
+            exchange (ccxt.Exchange): Exchange instance used to place orders.
+            ticker_snapshot (TickerSnapshot, optional): Used to price all symbols in one batch.
+            max_workers (int): Maximum orders in flight at once.
+            max_retries (int): Retries per symbol after the first attempt.
+            backoff (float): Initial retry delay in seconds, doubled on each retry.
+        """
+        self.exchange = exchange
+        self.ticker_snapshot = ticker_snapshot
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.backoff = backoff
+
+    def market_buy_multiple(self, symbols, usd_amount_per_coin, progress=None, on_result=None,
+                            cancel_event=None):
+        """
+        Place a market buy worth usd_amount_per_coin for every symbol.
+
+        Args:
+            symbols (list): Trading pair symbols (e.g., ['BTC/USD', 'ETH/USD'])
+            usd_amount_per_coin (float): USD amount to spend on each coin
+            progress (callable, optional): Called with (done, total) after each order
+            on_result (callable, optional): Called with ('success' | 'failed', entry) after each order
+            cancel_event (threading.Event, optional): Skips orders not yet started when set
+
+        Returns:
+            dict: {'success': [...], 'failed': [...]}. Every entry carries the symbol
+            and the order's latency in seconds; successes also carry amount and order_id.
+        """
+        results = {'success': [], 'failed': []}
+        if not symbols:
+            return results
+
+        # Price every symbol up front so all orders are sized from the same moment
+        prices = {}
+        if self.ticker_snapshot is not None:
+            tickers = self.ticker_snapshot.refresh(symbols)
+            prices = {symbol: ticker.get('last') for symbol, ticker in tickers.items()}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                executor.submit(self._buy, symbol, usd_amount_per_coin, prices.get(symbol), cancel_event): symbol
+                for symbol in symbols
+            }
+            for done, future in enumerate(as_completed(futures), start=1):
+                status, entry = future.result()
+                if status is None:
+                    continue
+                results[status].append(entry)
+                if on_result:
+                    on_result(status, entry)
+                if progress:
+                    progress(done, len(symbols))
+
+        return results
+
+    def _buy(self, symbol, usd_amount, price, cancel_event):
+        """Place one market buy with retries. Returns (status, entry), or (None, None) if cancelled."""
+        start = time.monotonic()
+        attempt = 0
+        while True:
+            if cancel_event is not None and cancel_event.is_set():
+                return None, None
+            placing = False
+            try:
+                if not price:
+                    price = self.exchange.fetch_ticker(symbol)['last']
+
+                # Calculate amount to buy
+                amount = usd_amount / price
+
+                placing = True
+                order_start = time.monotonic()
+                order = self.exchange.create_market_buy_order(symbol, amount)
+                return 'success', {
+                    'symbol': symbol,
+                    'amount': amount,
+                    'order_id': order['id'],
+                    'latency': time.monotonic() - order_start,
+                    'attempts': attempt + 1,
+                }
+            except ccxt.NetworkError as e:
+                retryable = not placing or isinstance(e, RETRYABLE_ORDER_ERRORS)
+                if retryable and attempt < self.max_retries:
+                    time.sleep(self.backoff * (2 ** attempt))
+                    attempt += 1
+                    continue
+                error = e
+            except Exception as e:
+                error = e
+
+            print(f"Error buying {symbol}: {error}")
+            return 'failed', {
+                'symbol': symbol,
+                'error': str(error),
+                'latency': time.monotonic() - start,
+                'attempts': attempt + 1,
+            }
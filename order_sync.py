@@ -0,0 +1,242 @@
+from concurrent.futures import ThreadPoolExecutor
+import inspect
+import time
+import ccxt
+
+
+def _order_time(order):
+    """Most recent change time of an order in milliseconds, or 0 if unknown."""
+    return (order.get('lastUpdateTimestamp') or order.get('lastTradeTimestamp')
+            or order.get('timestamp') or 0)
+
+
+class OrderSync:
+    """
+    Keeps an OrderIndex in step with the exchange using paginated, cursor-based fetches.
+
+    The first sync, and a periodic resync, page through every open order. In
+    between, only orders changed since the cursor are fetched: new open orders
+    plus closed or canceled ones, which are removed from the index. Exchanges
+    that reject or heavily penalize fetching open orders without a symbol are
+    synced per symbol, concurrently.
+    """
+
+    def __init__(self, exchange, order_index, max_workers=8, page_limit=100,
+                 full_sync_interval=900, overlap_ms=5000, on_closed=None):
+        """
+        Initialize the order sync.
+
+        Args:
+            exchange (ccxt.Exchange): Exchange instance used to fetch orders.
+            order_index (OrderIndex): Index kept in sync.
+            max_workers (int): Maximum concurrent per-symbol fetches.
+            page_limit (int): Orders requested per page.
+            full_sync_interval (float): Seconds between full resyncs, which catch any
+                change the incremental fetches could not see.
+            overlap_ms (int): How far before the cursor incremental fetches start,
+                to absorb clock skew between updates.
+            on_closed (callable, optional): Called with the list of closed orders seen by
+                each incremental sync, e.g. to record fills.
+        """
+        self.exchange = exchange
+        self.order_index = order_index
+        self.max_workers = max_workers
+        self.page_limit = page_limit
+        self.full_sync_interval = full_sync_interval
+        self.overlap_ms = overlap_ms
+        self.on_closed = on_closed
+        self.cursor = None
+        self.last_full_sync = 0.0
+        self.per_symbol = bool(exchange.options.get('warnOnFetchOpenOrdersWithoutSymbol'))
+        self._paginated = {}
+
+    def sync(self, symbols=()):
+        """
+        Bring the order index up to date.
+
+        Args:
+            symbols (iterable): Markets to fetch when the exchange needs a symbol per
+                request. Symbols already in the index are always included.
+
+        Returns:
+            set: Base currencies whose orders changed.
+        """
+        if (self.cursor is None or not self._supports_incremental()
+                or time.time() - self.last_full_sync >= self.full_sync_interval):
+            return self.full_sync(symbols)
+        return self.incremental_sync(symbols)
+
+    def full_sync(self, symbols=()):
+        """
+        Page through every open order and replace the index.
+
+        Markets whose fetch failed keep the orders already indexed for them, and
+        the next sync is a full one again.
+        """
+        started = self._now()
+        orders, failed = self._fetch_open(symbols, since=None)
+        with self.order_index.lock:
+            for symbol in failed:
+                orders += self.order_index.for_symbol(symbol)
+            previous = self.order_index.currencies()
+            self.order_index.replace(orders)
+        self.cursor = max([started] + [_order_time(order) for order in orders])
+        # A partial resync is retried by the next sync
+        self.last_full_sync = 0.0 if failed else time.time()
+        return previous | self.order_index.currencies()
+
+    def incremental_sync(self, symbols=()):
+        """
+        Fetch only orders opened or closed since the cursor and apply them to the index.
+
+        If any market's fetch failed the cursor stays put, so the next sync fetches
+        that market's changes again.
+        """
+        started = self._now()
+        since = self.cursor - self.overlap_ms
+
+        changed_orders, failed = self._fetch_open(symbols, since)
+        for method in self._changed_order_methods():
+            orders, method_failed = self._fetch_for_symbols(method, symbols, since)
+            changed_orders += orders
+            failed |= method_failed
+
+        changed_orders.sort(key=_order_time)
+        closed = [order for order in changed_orders if order.get('status') == 'closed']
+        if closed and self.on_closed is not None:
+            self.on_closed(closed)
+        currencies = {self.order_index.apply(order) for order in changed_orders}
+        if not failed:
+            self.cursor = max([started] + [_order_time(order) for order in changed_orders])
+        return currencies
+
+    def sync_symbol(self, symbol):
+        """Replace the index entries of one market with a fresh fetch of its open orders."""
+        orders = self._fetch_paged('fetch_open_orders', symbol, None)
+        with self.order_index.lock:
+            for order in self.order_index.for_symbol(symbol):
+                self.order_index.remove(order['id'])
+            for order in orders:
+                self.order_index.apply(order)
+        return {symbol.split('/')[0]}
+
+    def _supports_incremental(self):
+        return bool(self._changed_order_methods())
+
+    def _changed_order_methods(self):
+        """
+        Return the methods that together fetch the orders filled or canceled since a time.
+
+        fetch_orders is preferred, as it returns every status. Closed orders alone
+        are not enough: ccxt often emulates fetch_closed_orders by filtering
+        fetch_orders down to status 'closed', which hides orders canceled
+        outside the app, so canceled orders are fetched alongside them.
+        """
+        has = self.exchange.has
+        if has.get('fetchOrders'):
+            return ('fetch_orders',)
+        if has.get('fetchCanceledAndClosedOrders'):
+            return ('fetch_canceled_and_closed_orders',)
+        return tuple(method for method, feature in (('fetch_closed_orders', 'fetchClosedOrders'),
+                                                    ('fetch_canceled_orders', 'fetchCanceledOrders'))
+                     if has.get(feature))
+
+    def _fetch_open(self, symbols, since):
+        return self._fetch_for_symbols('fetch_open_orders', symbols, since)
+
+    def _fetch_for_symbols(self, method, symbols, since):
+        """
+        Fetch across all markets in one paginated stream, or per symbol concurrently when required.
+
+        Returns:
+            tuple: (orders, failed) with the orders fetched and the set of symbols
+            whose per-symbol fetch failed.
+        """
+        if not self.per_symbol:
+            try:
+                return self._fetch_paged(method, None, since), set()
+            except ccxt.ArgumentsRequired:
+                print(f"{self.exchange.id} requires a symbol for {method}; syncing per symbol")
+                self.per_symbol = True
+
+        all_symbols = sorted(set(symbols) | self.order_index.symbols())
+        orders = []
+        failed = set()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(self._fetch_paged, method, symbol, since): symbol for symbol in all_symbols}
+            for future, symbol in futures.items():
+                try:
+                    orders.extend(future.result())
+                except Exception as e:
+                    print(f"Error syncing orders for {symbol}: {e}")
+                    failed.add(symbol)
+        return orders, failed
+
+    def _fetch_paged(self, method, symbol, since):
+        """
+        Fetch every order a since-based method returns, page by page.
+
+        Methods that implement ccxt's own pagination are called once with
+        params={'paginate': True}, and ccxt follows the exchange's cursor. Others
+        are paged by hand in whichever order the exchange returns them: oldest
+        first pages continue from the newest time seen, newest first pages
+        continue back through ccxt's unified 'until' param from the oldest. Pages
+        overlap at the boundary millisecond and repeated orders are dropped by
+        id. A since of None is left out rather than sent as 0, which some
+        exchanges reject.
+        """
+        if self._ccxt_paginates(method):
+            pages = [getattr(self.exchange, method)(symbol, since, None, {'paginate': True})]
+        else:
+            pages = self._pages(method, symbol, since)
+
+        orders = []
+        seen = set()
+        for page in pages:
+            for order in page:
+                if order['id'] not in seen:
+                    seen.add(order['id'])
+                    orders.append(order)
+        return orders
+
+    def _pages(self, method, symbol, since):
+        fetch = getattr(self.exchange, method)
+        seen = set()
+        params = {}
+        while True:
+            page = fetch(symbol, since, self.page_limit, params) if params else fetch(symbol, since, self.page_limit)
+            yield page
+            new_ids = {order['id'] for order in page} - seen
+            seen |= new_ids
+
+            if len(page) < self.page_limit or not new_ids:
+                return
+            timestamps = [order['timestamp'] for order in page if order.get('timestamp')]
+            if not timestamps:
+                return
+            if timestamps[0] > timestamps[-1]:
+                # Newest first: walk back from the oldest order on the page
+                params = {'until': min(timestamps)}
+                continue
+            next_since = max(timestamps)
+            if since is not None and next_since <= since:
+                # More orders share this millisecond than fit on a page, and since cannot tell them apart
+                print(f"Over {self.page_limit} orders at {since} on {symbol or 'all markets'} from {method}; "
+                      f"some may be missed until the next full sync")
+                next_since = since + 1
+            since = next_since
+
+    def _ccxt_paginates(self, method):
+        """Whether the exchange's ccxt implementation of method supports params={'paginate': True}."""
+        if method not in self._paginated:
+            # ccxt has no capability flag for this; methods that support it read the 'paginate' option.
+            # A GovernedExchange keeps the exchange it wraps in .exchange
+            exchange = getattr(self.exchange, 'exchange', self.exchange)
+            try:
+                self._paginated[method] = "'paginate'" in inspect.getsource(getattr(type(exchange), method))
+            except (AttributeError, TypeError, OSError):
+                self._paginated[method] = False
+        return self._paginated[method]
+
+    def _now(self):
+        return self.exchange.milliseconds()
@@ -0,0 +1,115 @@
+from PyQt5.QtCore import Qt, QAbstractTableModel
+import sys
+
+LEFT_ALIGNMENT = Qt.AlignLeft | Qt.AlignVCenter
+RIGHT_ALIGNMENT = Qt.AlignRight | Qt.AlignVCenter
+
+class PairsTableModel(QAbstractTableModel):
+    """
+    Table model for a list of pairs the user checks to act on.
+
+    The first column holds the selection checkboxes; the others are given as
+    (header, key, formatter, alignment) tuples, where formatter turns the pair's
+    value under key into its display string. Display strings are formatted
+    once in update_pairs, so data() is a plain list lookup.
+    """
+
+    # Whether update_pairs keeps the selection of pairs still listed
+    keep_selection = True
+
+    def __init__(self, columns):
+        """
+        Args:
+            columns (list): (header, key, formatter, alignment) of each column after the checkboxes.
+        """
+        super().__init__()
+        self._columns = columns
+        self._symbols = []
+        self._display = []
+        self._headers = ["Select"] + [header for header, _, _, _ in columns]
+        self._alignments = [RIGHT_ALIGNMENT] + [alignment for _, _, _, alignment in columns]
+        self._selected = set()
+
+    def rowCount(self, parent=None):
+        if parent is not None and parent.isValid():
+            return 0
+        return len(self._symbols)
+
+    def columnCount(self, parent=None):
+        return len(self._headers)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self._headers[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        row = index.row()
+        if not index.isValid() or not (0 <= row < len(self._symbols)):
+            return None
+
+        column = index.column()
+
+        if role == Qt.DisplayRole:
+            return self._display[row][column]
+
+        elif role == Qt.CheckStateRole and column == 0:  # Select checkbox
+            return Qt.Checked if row in self._selected else Qt.Unchecked
+
+        elif role == Qt.TextAlignmentRole:
+            return self._alignments[column]
+
+        return None
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if role == Qt.CheckStateRole and index.column() == 0:
+            if value == Qt.Checked:
+                self._selected.add(index.row())
+            else:
+                self._selected.discard(index.row())
+            self.dataChanged.emit(index, index, [Qt.CheckStateRole])
+            return True
+        return False
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        if index.column() == 0:
+            return Qt.ItemIsEnabled | Qt.ItemIsUserCheckable
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+
+    def update_pairs(self, pairs):
+        """
+        Update the model with new pairs.
+
+        Args:
+            pairs (list): List of dicts with a symbol key and the keys of the columns.
+        """
+        selected = set(self.get_selected_pairs()) if self.keep_selection else set()
+        self.beginResetModel()
+        self._symbols = [sys.intern(pair['symbol']) for pair in pairs]
+        self._display = [
+            (None,) + tuple(formatter(pair[key]) for _, key, formatter, _ in self._columns)
+            for pair in pairs
+        ]
+        self._selected = {row for row, symbol in enumerate(self._symbols) if symbol in selected}
+        self.endResetModel()
+
+    def get_selected_pairs(self):
+        """Get list of selected pair symbols."""
+        return [self._symbols[idx] for idx in sorted(self._selected)]
+
+    def select_all(self):
+        """Select all pairs."""
+        self._selected = set(range(len(self._symbols)))
+        self._emit_check_states_changed()
+
+    def deselect_all(self):
+        """Deselect all pairs."""
+        self._selected.clear()
+        self._emit_check_states_changed()
+
+    def _emit_check_states_changed(self):
+        """Repaint only the checkbox column instead of resetting the model."""
+        if self._symbols:
+            self.dataChanged.emit(self.index(0, 0), self.index(len(self._symbols) - 1, 0), [Qt.CheckStateRole])
@@ -0,0 +1,89 @@
+from PyQt5.QtCore import Qt, QAbstractTableModel
+from PyQt5.QtGui import QColor
+import time
+
+GAIN_COLOR = QColor(76, 175, 80)
+LOSS_COLOR = QColor(244, 67, 54)
+LEFT_ALIGNMENT = Qt.AlignLeft | Qt.AlignVCenter
+RIGHT_ALIGNMENT = Qt.AlignRight | Qt.AlignVCenter
+
+class PaperTradesTableModel(QAbstractTableModel):
+    """
+    Table model for the volume spike scanner's paper trades, open ones first.
+
+    Display strings are formatted once in update_trades, so data() is a plain
+    list lookup.
+    """
+
+    def __init__(self, max_closed=500):
+        super().__init__()
+        self._headers = ["Symbol", "Entry Time", "Z-Score", "Entry Price", "Exit Price", "P&L %", "Status"]
+        self._alignments = [LEFT_ALIGNMENT, LEFT_ALIGNMENT] + [RIGHT_ALIGNMENT] * 4 + [LEFT_ALIGNMENT]
+        self._max_closed = max_closed
+        self._closed = []
+        self._display = []
+        self._pnl = []
+
+    def rowCount(self, parent=None):
+        if parent is not None and parent.isValid():
+            return 0
+        return len(self._display)
+
+    def columnCount(self, parent=None):
+        return len(self._headers)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self._headers[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        row = index.row()
+        if not index.isValid() or not (0 <= row < len(self._display)):
+            return None
+
+        if role == Qt.DisplayRole:
+            return self._display[row][index.column()]
+
+        elif role == Qt.TextAlignmentRole:
+            return self._alignments[index.column()]
+
+        elif role == Qt.ForegroundRole and index.column() == 5 and self._pnl[row] is not None:
+            return GAIN_COLOR if self._pnl[row] >= 0 else LOSS_COLOR
+
+        return None
+
+    def update_trades(self, open_trades, closed_trades):
+        """
+        Show the currently open paper trades and add newly closed ones to the history.
+
+        Args:
+            open_trades (list): Open trade dicts from VolumeSpikeScanner.open_trades.
+            closed_trades (list): Trade dicts closed since the last update.
+        """
+        self._closed = (list(reversed(closed_trades)) + self._closed)[:self._max_closed]
+
+        self.beginResetModel()
+        self._display = []
+        self._pnl = []
+        for trade in open_trades:
+            self._display.append((trade['symbol'], self._format_time(trade['entry_time']), f"{trade['zscore']:.1f}",
+                                  f"{trade['entry_price']:.8g}", "", "", "Open"))
+            self._pnl.append(None)
+        for trade in self._closed:
+            self._display.append((trade['symbol'], self._format_time(trade['entry_time']), f"{trade['zscore']:.1f}",
+                                  f"{trade['entry_price']:.8g}", f"{trade['exit_price']:.8g}",
+                                  f"{trade['pnl_percent']:+.2f}", trade['reason'].replace('_', ' ').title()))
+            self._pnl.append(trade['pnl_percent'])
+        self.endResetModel()
+
+    def closed_summary(self):
+        """Return (closed trade count, win rate in percent, average P&L in percent) of the kept history."""
+        if not self._closed:
+            return 0, 0.0, 0.0
+        pnl = [trade['pnl_percent'] for trade in self._closed]
+        return len(pnl), 100.0 * sum(value > 0 for value in pnl) / len(pnl), sum(pnl) / len(pnl)
+
+    @staticmethod
+    def _format_time(timestamp):
+        return time.strftime('%m-%d %H:%M', time.localtime(timestamp / 1000))
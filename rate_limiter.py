@@ -0,0 +1,241 @@
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+
+
+# Request priorities, most urgent first
+CRITICAL, NORMAL, BULK = 0, 1, 2
+
+# Relative cost of each call in multiples of the exchange's cheapest request. Calls
+# over every market are charged their ":all" weight. Unlisted calls cost 1.
+# These are rough placeholders, not any exchange's published weights: they only
+# make heavy calls cost more than light ones. Set an exchange's real figures with
+# the "rate_limit_weights" config entry, which overrides them key by key.
+DEFAULT_WEIGHTS = {
+    'load_markets': 10,
+    'fetch_balance': 5,
+    'fetch_tickers': 1,
+    'fetch_tickers:all': 10,
+    'fetch_open_orders': 1,
+    'fetch_open_orders:all': 10,
+    'fetch_orders': 5,
+    'fetch_closed_orders': 5,
+    'create_orders': 5,
+    'cancel_all_orders': 1,
+    'cancel_all_orders:all': 10,
+}
+
+# Response headers reporting the remaining request budget, as (remaining, limit) pairs
+REMAINING_HEADERS = (
+    ('x-ratelimit-remaining', 'x-ratelimit-limit'),
+    ('x-bapi-limit-status', 'x-bapi-limit'),
+    ('gw-ratelimit-remaining', 'gw-ratelimit-limit'),
+)
+# Binance-style headers reporting the weight used in the current minute
+USED_WEIGHT_HEADERS = ('x-mbx-used-weight-1m', 'x-mbx-used-weight')
+
+
+class RateLimitGovernor:
+    """
+    Shared, weighted and adaptive request budget for one exchange.
+
+    Every request takes its endpoint's weight from one token bucket. Waiting
+    requests are served in priority order, and bulk requests may not dip into
+    a reserve kept for critical and normal ones, so cancels and market sells
+    go out promptly even while a scan is draining the budget.
+
+    The bucket follows the exchange's own accounting: remaining-budget or
+    used-weight headers lower the local balance when what is left of the
+    exchange's window would run out before the bucket does, and a rate limit
+    rejection halves the refill rate, drains the bucket and pauses requests
+    for Retry-After seconds. The rate then recovers linearly to its base
+    value (AIMD).
+    """
+
+    def __init__(self, rate, capacity, weights=None, reserve=0.2, weight_limit=None, recovery=0.05,
+                 min_rate_fraction=0.1, backoff=1.0, window=60.0):
+        """
+        Initialize the governor.
+
+        Args:
+            rate (float): Base tokens added per second.
+            capacity (float): Maximum tokens, i.e. the allowed burst.
+            weights (dict, optional): Endpoint weights overriding DEFAULT_WEIGHTS.
+            reserve (float): Fraction of capacity bulk requests must leave untouched.
+            weight_limit (float, optional): Per-minute weight limit, needed to read used-weight headers.
+            recovery (float): Fraction of the base rate regained per second after a rejection.
+            min_rate_fraction (float): Lowest fraction of the base rate backoff can reach.
+            backoff (float): Pause in seconds after a rejection without a Retry-After header.
+            window (float): Seconds the budget in rate limit headers covers, e.g. 60 for a per-minute limit.
+        """
+        self.base_rate = rate
+        self.rate = rate
+        self.capacity = capacity
+        self.weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+        self.reserve = reserve * capacity
+        self.weight_limit = weight_limit
+        self.recovery = recovery
+        self.min_rate = rate * min_rate_fraction
+        self.backoff = backoff
+        self.window = window
+        self.rejections = 0
+
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._waiting = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+
+    @classmethod
+    def from_exchange(cls, exchange, capacity=None, **kwargs):
+        """
+        Create a governor matching a ccxt exchange's rateLimit (milliseconds between
+        requests). capacity defaults to one second of requests.
+        """
+        rate_limit_ms = getattr(exchange, 'rateLimit', None) or 1000
+        rate = 1000.0 / rate_limit_ms
+        return cls(rate, capacity or max(rate, 1.0), **kwargs)
+
+    def weight(self, method, symbol_given=True, symbol_count=1):
+        """
+        Return the weight of an exchange method.
+
+        symbol_given=False selects its all-markets weight. A call over a list of
+        markets costs symbol_count times the single-market weight, but never more
+        than the all-markets weight.
+        """
+        all_markets = self.weights.get(f'{method}:all')
+        if not symbol_given and all_markets is not None:
+            return all_markets
+        weight = self.weights.get(method, 1) * max(symbol_count, 1)
+        return weight if all_markets is None else min(weight, all_markets)
+
+    def _refill(self, now):
+        elapsed = now - self._updated
+        self._updated = now
+        if self.rate < self.base_rate:
+            self.rate = min(self.base_rate, self.rate + self.base_rate * self.recovery * elapsed)
+        if now >= self._paused_until:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+
+    def _floor(self, weight, priority):
+        # Bulk requests leave the reserve, unless that would make them wait forever
+        return min(weight + self.reserve, self.capacity) if priority >= BULK else weight
+
+    def acquire(self, weight=1, priority=NORMAL):
+        """
+        Block until this request's turn comes and its weight is available, then take it.
+
+        Args:
+            weight (float): Tokens to take; clamped to the capacity.
+            priority (int): CRITICAL, NORMAL or BULK.
+        """
+        weight = min(weight, self.capacity)
+        with self._condition:
+            ticket = (priority, next(self._sequence))
+            heapq.heappush(self._waiting, ticket)
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    wait = None
+                    if self._waiting[0] == ticket:
+                        needed = self._floor(weight, priority)
+                        if now < self._paused_until:
+                            wait = self._paused_until - now
+                        elif self._tokens >= needed:
+                            self._tokens -= weight
+                            return
+                        else:
+                            wait = (needed - self._tokens) / self.rate
+                    # Requests behind the head wait to be notified when it leaves
+                    self._condition.wait(wait)
+            finally:
+                self._waiting.remove(ticket)
+                heapq.heapify(self._waiting)
+                self._condition.notify_all()
+
+    async def acquire_async(self, weight=1, priority=NORMAL):
+        """
+        Awaitable acquire() for event loop callers, sharing the same budget and queue.
+
+        Takes the weight at once when it is free; otherwise waits for it on an
+        executor thread so the event loop keeps running.
+        """
+        if not self.try_acquire(weight, priority):
+            await asyncio.get_running_loop().run_in_executor(None, self.acquire, weight, priority)
+
+    def try_acquire(self, weight=1, priority=NORMAL):
+        """Take the weight if it is available right now and nobody more urgent is waiting."""
+        weight = min(weight, self.capacity)
+        with self._condition:
+            now = time.monotonic()
+            self._refill(now)
+            if (now < self._paused_until or (self._waiting and self._waiting[0][0] <= priority)
+                    or self._tokens < self._floor(weight, priority)):
+                return False
+            self._tokens -= weight
+            return True
+
+    def observe(self, headers):
+        """
+        Lower the local balance to the remaining budget the exchange reports in response headers.
+
+        The reported fraction of the window's budget left is converted to tokens
+        at the base rate, i.e. against the weight this governor would spend over
+        a whole window, not against the burst capacity. The balance is lowered
+        only when that is less than it holds, so plenty of headroom changes
+        nothing and a nearly spent window stops the burst.
+
+        Args:
+            headers (Mapping): Response headers, e.g. exchange.last_response_headers.
+        """
+        if not headers:
+            return
+        headers = {str(key).lower(): value for key, value in headers.items()}
+        remaining = limit = None
+        for remaining_key, limit_key in REMAINING_HEADERS:
+            if remaining_key in headers and limit_key in headers:
+                remaining, limit = _number(headers[remaining_key]), _number(headers[limit_key])
+                break
+        if remaining is None and self.weight_limit:
+            for key in USED_WEIGHT_HEADERS:
+                if key in headers:
+                    used = _number(headers[key])
+                    remaining, limit = (None, None) if used is None else (self.weight_limit - used, self.weight_limit)
+                    break
+        if remaining is None or not limit:
+            return
+
+        with self._condition:
+            self._refill(time.monotonic())
+            self._tokens = min(self._tokens, max(remaining / limit, 0.0) * self.base_rate * self.window)
+
+    def throttled(self, headers=None):
+        """
+        Back off after the exchange rejected a request for exceeding its rate limit.
+
+        Args:
+            headers (Mapping, optional): Headers of the rejection, read for Retry-After.
+        """
+        retry_after = None
+        if headers:
+            retry_after = _number({str(key).lower(): value for key, value in headers.items()}.get('retry-after'))
+        with self._condition:
+            now = time.monotonic()
+            self._refill(now)
+            self.rejections += 1
+            self.rate = max(self.rate / 2, self.min_rate)
+            self._tokens = 0.0
+            self._paused_until = max(self._paused_until, now + (retry_after or self.backoff))
+            self._condition.notify_all()
+
+
+def _number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
@@ -7,10 +7,15 @@ setup(
     install_requires=[
         "PyQt5>=5.15.2",
         "ccxt>=3.0.0",
+        "numpy>=1.17",
+        "requests>=2.20",
     ],
+    extras_require={
+        "async": ["qasync>=0.23"],
+    },
     entry_points={
         "console_scripts": [
-            "field-orders=main:main",
+            "field-orders=main:run",
         ],
     },
     author="",
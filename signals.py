@@ -0,0 +1,243 @@
+import numpy as np
+
+
+class RollingStats:
+    """
+    Rolling mean and variance over the last `window` values of many series at once.
+
+    Each series keeps a ring buffer plus running sums of values and squares, so
+    adding a value is O(1) per series and one vectorized step for all of them.
+    The sums are rebuilt from the buffers once per full window to stop
+    floating-point drift.
+    """
+
+    def __init__(self, window, size=0):
+        """
+        Args:
+            window (int): Number of most recent values the statistics cover.
+            size (int): Initial number of series.
+        """
+        self.window = window
+        self.values = np.zeros((size, window))
+        self.sums = np.zeros(size)
+        self.squares = np.zeros(size)
+        self.counts = np.zeros(size, dtype=np.int64)
+        self.positions = np.zeros(size, dtype=np.int64)
+        self._updates = 0
+
+    def grow(self, size):
+        """Make room for at least size series. New series start empty."""
+        extra = size - len(self.sums)
+        if extra <= 0:
+            return
+        self.values = np.vstack([self.values, np.zeros((extra, self.window))])
+        self.sums = np.concatenate([self.sums, np.zeros(extra)])
+        self.squares = np.concatenate([self.squares, np.zeros(extra)])
+        self.counts = np.concatenate([self.counts, np.zeros(extra, dtype=np.int64)])
+        self.positions = np.concatenate([self.positions, np.zeros(extra, dtype=np.int64)])
+
+    def mean(self):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return self.sums / self.counts
+
+    def std(self):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = self.sums / self.counts
+            return np.sqrt(np.maximum(self.squares / self.counts - mean * mean, 0.0))
+
+    def push(self, indexes, values):
+        """
+        Add one value to each of the given series. Series without a value keep
+        their statistics unchanged.
+
+        Args:
+            indexes (np.ndarray): Series indexes, without duplicates.
+            values (np.ndarray): The new value of each indexed series.
+        """
+        positions = self.positions[indexes]
+        old = self.values[indexes, positions]
+        self.sums[indexes] += values - old
+        self.squares[indexes] += values * values - old * old
+        self.counts[indexes] = np.minimum(self.counts[indexes] + 1, self.window)
+        self.values[indexes, positions] = values
+        self.positions[indexes] = (positions + 1) % self.window
+
+        self._updates += 1
+        if self._updates % self.window == 0:
+            self.sums = self.values.sum(axis=1)
+            self.squares = (self.values * self.values).sum(axis=1)
+
+
+class VolumeSpikeScanner:
+    """
+    Flags abnormal volume across every market and paper-trades the spikes.
+
+    On each tick every symbol's volume is scored against the rolling mean and
+    standard deviation of its previous volumes. Symbols scoring above the
+    threshold open a paper long at the tick's price, which is closed at a take
+    profit, a stop loss or after a maximum holding time.
+    """
+
+    def __init__(self, window=60, threshold=4.0, min_periods=30, hold_ticks=15, take_profit=5.0, stop_loss=3.0):
+        """
+        Initialize the scanner.
+
+        Args:
+            window (int): Ticks of volume history in the rolling statistics.
+            threshold (float): Z-score above which a volume is a spike.
+            min_periods (int): Ticks of history a symbol needs before it can be flagged. Clamped
+                to window, since no more history than that is ever held.
+            hold_ticks (int): Ticks after which an open paper trade is closed.
+            take_profit (float): Percent gain at which a paper trade is closed.
+            stop_loss (float): Percent loss at which a paper trade is closed.
+        """
+        self.threshold = threshold
+        self.min_periods = min(min_periods, window)
+        self.hold_ticks = hold_ticks
+        self.take_profit = take_profit
+        self.stop_loss = stop_loss
+
+        self.symbols = []
+        self.index = {}
+        self.stats = RollingStats(window)
+        self.tick = 0
+
+        # Open paper trade per symbol; NaN entry price means none is open
+        self.entry_prices = np.empty(0)
+        self.entry_ticks = np.zeros(0, dtype=np.int64)
+        self.entry_times = np.zeros(0, dtype=np.int64)
+        self.entry_scores = np.zeros(0)
+
+    def _indexes(self, symbols):
+        """Map symbols to series indexes, registering new symbols."""
+        for symbol in symbols:
+            if symbol not in self.index:
+                self.index[symbol] = len(self.symbols)
+                self.symbols.append(symbol)
+        size = len(self.symbols)
+        if size > len(self.entry_prices):
+            extra = size - len(self.entry_prices)
+            self.stats.grow(size)
+            self.entry_prices = np.concatenate([self.entry_prices, np.full(extra, np.nan)])
+            self.entry_ticks = np.concatenate([self.entry_ticks, np.zeros(extra, dtype=np.int64)])
+            self.entry_times = np.concatenate([self.entry_times, np.zeros(extra, dtype=np.int64)])
+            self.entry_scores = np.concatenate([self.entry_scores, np.zeros(extra)])
+        return np.fromiter((self.index[symbol] for symbol in symbols), dtype=np.intp, count=len(symbols))
+
+    def on_tick(self, timestamp, volumes, prices):
+        """
+        Score one tick of volumes and advance the paper trades.
+
+        Args:
+            timestamp (int): Tick time in milliseconds.
+            volumes (dict): Volume traded during the tick, keyed by symbol.
+            prices (dict): Last price keyed by symbol.
+
+        Returns:
+            tuple: (signals, closed). signals lists the spikes as dicts with symbol,
+            timestamp, volume, zscore and price; closed lists the paper trades
+            closed on this tick as dicts with symbol, entry_time, exit_time,
+            entry_price, exit_price, zscore, pnl_percent and reason.
+        """
+        self.tick += 1
+        symbols = [symbol for symbol in volumes if prices.get(symbol)]
+        indexes = self._indexes(symbols)
+        volume = np.fromiter((volumes[symbol] for symbol in symbols), dtype=np.float64, count=len(symbols))
+        price = np.fromiter((prices[symbol] for symbol in symbols), dtype=np.float64, count=len(symbols))
+
+        closed = self._close_trades(timestamp, indexes, price)
+
+        # Score against the history before this tick, then add the tick to it
+        mean = self.stats.mean()[indexes]
+        std = self.stats.std()[indexes]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            zscores = (volume - mean) / std
+        spiking = ((self.stats.counts[indexes] >= self.min_periods) & (std > 0)
+                   & (zscores > self.threshold) & (volume > 0))
+        self.stats.push(indexes, volume)
+
+        signals = []
+        for i in np.flatnonzero(spiking):
+            symbol_index = indexes[i]
+            signals.append({'symbol': symbols[i], 'timestamp': timestamp, 'volume': float(volume[i]),
+                            'zscore': float(zscores[i]), 'price': float(price[i])})
+            if np.isnan(self.entry_prices[symbol_index]):
+                self.entry_prices[symbol_index] = price[i]
+                self.entry_ticks[symbol_index] = self.tick
+                self.entry_times[symbol_index] = timestamp
+                self.entry_scores[symbol_index] = zscores[i]
+        return signals, closed
+
+    def _close_trades(self, timestamp, indexes, price):
+        entry = self.entry_prices[indexes]
+        with np.errstate(invalid='ignore'):
+            pnl = (price / entry - 1.0) * 100.0
+            take_profit = pnl >= self.take_profit
+            stop_loss = pnl <= -self.stop_loss
+        expired = self.tick - self.entry_ticks[indexes] >= self.hold_ticks
+        closing = ~np.isnan(entry) & (take_profit | stop_loss | expired)
+
+        closed = []
+        for i in np.flatnonzero(closing):
+            symbol_index = indexes[i]
+            reason = 'take_profit' if take_profit[i] else 'stop_loss' if stop_loss[i] else 'expired'
+            closed.append({
+                'symbol': self.symbols[symbol_index],
+                'entry_time': int(self.entry_times[symbol_index]),
+                'exit_time': timestamp,
+                'entry_price': float(entry[i]),
+                'exit_price': float(price[i]),
+                'zscore': float(self.entry_scores[symbol_index]),
+                'pnl_percent': float(pnl[i]),
+                'reason': reason,
+            })
+            self.entry_prices[symbol_index] = np.nan
+        return closed
+
+    def open_trades(self):
+        """Return the open paper trades as dicts with symbol, entry_time, entry_price and zscore."""
+        return [
+            {'symbol': self.symbols[i], 'entry_time': int(self.entry_times[i]),
+             'entry_price': float(self.entry_prices[i]), 'zscore': float(self.entry_scores[i])}
+            for i in np.flatnonzero(~np.isnan(self.entry_prices))
+        ]
+
+
+class TickerVolumes:
+    """
+    Turns successive all-market ticker snapshots into per-tick volumes.
+
+    Tickers report a rolling 24h volume, so the volume traded between two
+    snapshots is approximated by the increase of that figure. This needs a
+    single fetch_tickers request per tick for every market, where per-minute
+    candles would need one request per market.
+    """
+
+    def __init__(self):
+        self._previous = {}
+
+    def update(self, tickers):
+        """
+        Args:
+            tickers (dict): ccxt tickers keyed by symbol.
+
+        Returns:
+            tuple: (volumes, prices) dicts keyed by symbol. Symbols seen for the
+            first time have no volume yet.
+        """
+        volumes = {}
+        prices = {}
+        current = {}
+        for symbol, ticker in tickers.items():
+            volume = ticker.get('quoteVolume') or ticker.get('baseVolume')
+            last = ticker.get('last') or ticker.get('close')
+            if volume is None or not last:
+                continue
+            current[symbol] = volume
+            prices[symbol] = last
+            previous = self._previous.get(symbol)
+            if previous is not None:
+                # The window also drops the volume from 24h ago, which can outweigh new trades
+                volumes[symbol] = max(volume - previous, 0.0)
+        self._previous = current
+        return volumes, prices
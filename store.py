@@ -0,0 +1,405 @@
+import os
+import queue
+import sqlite3
+import threading
+import time
+from market_cache import DEFAULT_CACHE_DIR
+
+DEFAULT_DB_PATH = os.path.join(DEFAULT_CACHE_DIR, "history.db")
+
+# Seconds between prunes of snapshots older than the retention window
+PRUNE_INTERVAL = 3600
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY,
+    exchange TEXT NOT NULL,
+    timestamp INTEGER NOT NULL,
+    total_current_value REAL NOT NULL,
+    total_potential_gain REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS snapshots_exchange_time ON snapshots (exchange, timestamp);
+
+CREATE TABLE IF NOT EXISTS balances (
+    snapshot_id INTEGER NOT NULL REFERENCES snapshots (id),
+    exchange TEXT NOT NULL,
+    currency TEXT NOT NULL,
+    timestamp INTEGER NOT NULL,
+    available_coins REAL NOT NULL,
+    current_value REAL NOT NULL,
+    potential_gain REAL NOT NULL,
+    percentage_gain REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS balances_snapshot ON balances (snapshot_id);
+CREATE INDEX IF NOT EXISTS balances_currency_time ON balances (currency, timestamp);
+
+CREATE TABLE IF NOT EXISTS open_orders (
+    snapshot_id INTEGER NOT NULL REFERENCES snapshots (id),
+    exchange TEXT NOT NULL,
+    id TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    side TEXT,
+    price REAL,
+    amount REAL,
+    remaining REAL,
+    timestamp INTEGER
+);
+CREATE INDEX IF NOT EXISTS open_orders_snapshot ON open_orders (snapshot_id);
+CREATE INDEX IF NOT EXISTS open_orders_symbol_time ON open_orders (symbol, timestamp);
+
+CREATE TABLE IF NOT EXISTS fills (
+    exchange TEXT NOT NULL,
+    order_id TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    side TEXT,
+    price REAL,
+    amount REAL,
+    cost REAL,
+    timestamp INTEGER NOT NULL,
+    PRIMARY KEY (exchange, order_id)
+);
+CREATE INDEX IF NOT EXISTS fills_symbol_time ON fills (symbol, timestamp);
+CREATE INDEX IF NOT EXISTS fills_time ON fills (timestamp);
+
+CREATE TABLE IF NOT EXISTS paper_trades (
+    exchange TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    entry_time INTEGER NOT NULL,
+    exit_time INTEGER NOT NULL,
+    entry_price REAL NOT NULL,
+    exit_price REAL NOT NULL,
+    zscore REAL NOT NULL,
+    pnl_percent REAL NOT NULL,
+    reason TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS paper_trades_symbol_time ON paper_trades (symbol, exit_time);
+CREATE INDEX IF NOT EXISTS paper_trades_time ON paper_trades (exit_time);
+"""
+
+
+def _now_ms():
+    return int(time.time() * 1000)
+
+
+class LocalStore:
+    """
+    SQLite history of account snapshots, fills and paper trades.
+
+    Writes are queued and committed in batches by a background thread, so
+    recording a snapshot never waits on the disk. The database runs in WAL
+    mode, so reads from other threads are not blocked by the writer.
+
+    Snapshots older than the retention window are pruned by the writer, so
+    the database does not grow with every refresh; the latest snapshot of
+    each exchange is always kept. Fills and paper trades are kept for good.
+    """
+
+    def __init__(self, path=DEFAULT_DB_PATH, batch_size=500, retention_days=90):
+        """
+        Open (or create) the store.
+
+        Args:
+            path (str): Path of the SQLite database file.
+            batch_size (int): Maximum queued writes committed in one transaction.
+            retention_days (float, optional): Days snapshots are kept. None keeps them forever.
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self.retention_days = retention_days
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+        connection = self._connect()
+        connection.executescript(SCHEMA)
+        connection.close()
+
+        self._queue = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name="LocalStoreWriter", daemon=True)
+        self._writer.start()
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    # Writes
+
+    def record_snapshot(self, exchange, account_values, open_orders, total_current_value, total_potential_gain,
+                        timestamp=None):
+        """
+        Queue a snapshot of one exchange's account.
+
+        The rows are copied out of the live objects before returning, so the
+        caller may keep mutating them.
+
+        Args:
+            exchange (str): Exchange client name.
+            account_values (dict): CoinInfo objects keyed by currency.
+            open_orders (list): ccxt open orders.
+            total_current_value (float): Market value of all balances.
+            total_potential_gain (float): Proceeds of all open sell orders.
+            timestamp (int, optional): Snapshot time in milliseconds. Defaults to now.
+        """
+        timestamp = timestamp or _now_ms()
+        balances = [
+            (exchange, currency, timestamp, info.available_coins, info.current_value,
+             info.potential_gain, info.percentage_gain)
+            for currency, info in account_values.items()
+        ]
+        orders = [
+            (exchange, str(order['id']), order['symbol'], order.get('side'), order.get('price'),
+             order.get('amount'), order.get('remaining'), order.get('timestamp'))
+            for order in open_orders
+        ]
+        self._queue.put(('snapshot', (exchange, timestamp, total_current_value, total_potential_gain),
+                         balances, orders))
+
+    def record_fills(self, exchange, orders):
+        """
+        Queue filled orders. Orders without a filled amount are ignored.
+
+        Args:
+            exchange (str): Exchange client name.
+            orders (list): ccxt order structures, typically closed orders.
+        """
+        rows = [
+            (exchange, str(order['id']), order['symbol'], order.get('side'),
+             order.get('average') or order.get('price'), order['filled'], order.get('cost'),
+             order.get('lastTradeTimestamp') or order.get('timestamp') or _now_ms())
+            for order in orders if order.get('filled')
+        ]
+        if rows:
+            self._queue.put(('fills', rows))
+
+    def record_paper_trades(self, exchange, trades):
+        """
+        Queue closed paper trades from the volume spike scanner.
+
+        Args:
+            exchange (str): Exchange client name.
+            trades (list): Closed trade dicts from VolumeSpikeScanner.on_tick.
+        """
+        rows = [
+            (exchange, trade['symbol'], trade['entry_time'], trade['exit_time'], trade['entry_price'],
+             trade['exit_price'], trade['zscore'], trade['pnl_percent'], trade['reason'])
+            for trade in trades
+        ]
+        if rows:
+            self._queue.put(('paper_trades', rows))
+
+    def flush(self):
+        """Block until every queued write is committed."""
+        self._queue.join()
+
+    def close(self):
+        """Commit pending writes and stop the writer thread."""
+        self._queue.put(None)
+        self._writer.join()
+
+    def _write_loop(self):
+        connection = self._connect()
+        pruned_at = None
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = None in batch
+            try:
+                self._write_batch(connection, [item for item in batch if item is not None])
+                if pruned_at is None or time.monotonic() - pruned_at >= PRUNE_INTERVAL:
+                    pruned_at = time.monotonic()
+                    self.prune(connection)
+            except Exception as e:
+                print(f"Error writing history: {e}")
+            finally:
+                # flush() waits on these, so they are marked done whatever happened
+                for _ in batch:
+                    self._queue.task_done()
+            if stop:
+                connection.close()
+                return
+
+    def _write_batch(self, connection, items):
+        """Commit items in one transaction; if one fails, retry them one by one so only it is lost."""
+        try:
+            with connection:
+                for item in items:
+                    self._write(connection, item)
+            return
+        except Exception as e:
+            if len(items) <= 1:
+                raise
+            print(f"Error writing history batch, retrying writes one by one: {e}")
+        for item in items:
+            try:
+                with connection:
+                    self._write(connection, item)
+            except Exception as e:
+                print(f"Error writing history {item[0]}, dropped: {e}")
+
+    def prune(self, connection=None):
+        """
+        Delete snapshots older than the retention window, keeping each exchange's latest.
+
+        Args:
+            connection (sqlite3.Connection, optional): Connection to use; a new one if None.
+
+        Returns:
+            int: Number of snapshots deleted.
+        """
+        if self.retention_days is None:
+            return 0
+        cutoff = _now_ms() - int(self.retention_days * 86400 * 1000)
+        own_connection = connection is None
+        if own_connection:
+            connection = self._connect()
+        expired = ("SELECT id FROM snapshots WHERE timestamp < ? "
+                   "AND id NOT IN (SELECT MAX(id) FROM snapshots GROUP BY exchange)")
+        try:
+            with connection:
+                connection.execute(f"DELETE FROM balances WHERE snapshot_id IN ({expired})", (cutoff,))
+                connection.execute(f"DELETE FROM open_orders WHERE snapshot_id IN ({expired})", (cutoff,))
+                return connection.execute(f"DELETE FROM snapshots WHERE id IN ({expired})", (cutoff,)).rowcount
+        finally:
+            if own_connection:
+                connection.close()
+
+    @staticmethod
+    def _write(connection, item):
+        if item[0] == 'fills':
+            connection.executemany("INSERT OR REPLACE INTO fills VALUES (?, ?, ?, ?, ?, ?, ?, ?)", item[1])
+            return
+        if item[0] == 'paper_trades':
+            connection.executemany("INSERT INTO paper_trades VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", item[1])
+            return
+
+        _, snapshot, balances, orders = item
+        snapshot_id = connection.execute(
+            "INSERT INTO snapshots (exchange, timestamp, total_current_value, total_potential_gain) "
+            "VALUES (?, ?, ?, ?)", snapshot).lastrowid
+        connection.executemany("INSERT INTO balances VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                               [(snapshot_id,) + row for row in balances])
+        connection.executemany("INSERT INTO open_orders VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                               [(snapshot_id,) + row for row in orders])
+
+    # Reads
+
+    def load_last_state(self, exchange):
+        """
+        Return the most recent snapshot of an exchange.
+
+        Args:
+            exchange (str): Exchange client name.
+
+        Returns:
+            dict or None: timestamp, total_current_value, total_potential_gain, balances
+            (rows of currency, available_coins, current_value, potential_gain, percentage_gain)
+            and open_orders (ccxt-like order dicts), or None if nothing was recorded yet.
+        """
+        connection = self._connect()
+        try:
+            row = connection.execute(
+                "SELECT id, timestamp, total_current_value, total_potential_gain FROM snapshots "
+                "WHERE exchange = ? ORDER BY timestamp DESC LIMIT 1", (exchange,)).fetchone()
+            if row is None:
+                return None
+            snapshot_id, timestamp, total_current_value, total_potential_gain = row
+            balances = connection.execute(
+                "SELECT currency, available_coins, current_value, potential_gain, percentage_gain "
+                "FROM balances WHERE snapshot_id = ?", (snapshot_id,)).fetchall()
+            orders = [
+                {'id': order_id, 'symbol': symbol, 'side': side, 'price': price, 'amount': amount,
+                 'remaining': remaining, 'timestamp': order_time, 'status': 'open'}
+                for order_id, symbol, side, price, amount, remaining, order_time in connection.execute(
+                    "SELECT id, symbol, side, price, amount, remaining, timestamp "
+                    "FROM open_orders WHERE snapshot_id = ?", (snapshot_id,))
+            ]
+        finally:
+            connection.close()
+
+        return {
+            'timestamp': timestamp,
+            'total_current_value': total_current_value,
+            'total_potential_gain': total_potential_gain,
+            'balances': balances,
+            'open_orders': orders,
+        }
+
+    def pnl_history(self, exchange=None, start=None, end=None):
+        """
+        Return account totals over time.
+
+        Args:
+            exchange (str, optional): Only this exchange. All exchanges if None.
+            start (int, optional): First timestamp in milliseconds, inclusive.
+            end (int, optional): Last timestamp in milliseconds, inclusive.
+
+        Returns:
+            list: (exchange, timestamp, total_current_value, total_potential_gain) tuples in time order.
+        """
+        query, params = self._range_filter(
+            "SELECT exchange, timestamp, total_current_value, total_potential_gain FROM snapshots",
+            'exchange', exchange, start, end)
+        return self._query(query + " ORDER BY timestamp", params)
+
+    def currency_history(self, currency, start=None, end=None):
+        """
+        Return one currency's balance and value over time, across exchanges.
+
+        Returns:
+            list: (exchange, timestamp, available_coins, current_value, potential_gain) tuples in time order.
+        """
+        query, params = self._range_filter(
+            "SELECT exchange, timestamp, available_coins, current_value, potential_gain FROM balances",
+            'currency', currency, start, end)
+        return self._query(query + " ORDER BY timestamp", params)
+
+    def fills(self, symbol=None, start=None, end=None):
+        """
+        Return recorded fills.
+
+        Returns:
+            list: (exchange, order_id, symbol, side, price, amount, cost, timestamp) tuples in time order.
+        """
+        query, params = self._range_filter("SELECT * FROM fills", 'symbol', symbol, start, end)
+        return self._query(query + " ORDER BY timestamp", params)
+
+    def paper_trades(self, symbol=None, start=None, end=None):
+        """
+        Return closed paper trades by exit time.
+
+        Returns:
+            list: (exchange, symbol, entry_time, exit_time, entry_price, exit_price, zscore,
+            pnl_percent, reason) tuples in exit time order.
+        """
+        query, params = self._range_filter("SELECT * FROM paper_trades", 'symbol', symbol, start, end,
+                                           time_column='exit_time')
+        return self._query(query + " ORDER BY exit_time", params)
+
+    @staticmethod
+    def _range_filter(query, column, value, start, end, time_column='timestamp'):
+        conditions = []
+        params = []
+        if value is not None:
+            conditions.append(f"{column} = ?")
+            params.append(value)
+        if start is not None:
+            conditions.append(f"{time_column} >= ?")
+            params.append(start)
+        if end is not None:
+            conditions.append(f"{time_column} <= ?")
+            params.append(end)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        return query, params
+
+    def _query(self, query, params):
+        connection = self._connect()
+        try:
+            return connection.execute(query, params).fetchall()
+        finally:
+            connection.close()
@@ -0,0 +1,177 @@
+from PyQt5.QtCore import QObject, pyqtSignal
+import asyncio
+import threading
+from valuation import PEGGED
+
+
+class StreamingSession(QObject):
+    """
+    Streams balances, orders and tickers over WebSocket using ccxt.pro watch_* methods.
+
+    The event loop runs on a background thread. Every update is emitted through
+    the `update` signal, so it is applied to the clients on the GUI thread.
+    Exchanges ccxt.pro cannot stream are polled over REST instead, with the
+    result emitted as a 'refresh' update.
+    """
+
+    update = pyqtSignal(str, str, object)
+    status = pyqtSignal(str)
+
+    def __init__(self, clients, quote='USD', max_backoff=60, poll_interval=30):
+        """
+        Initialize the streaming session.
+
+        Args:
+            clients (dict): ExchangeClient instances keyed by name.
+            quote (str): Quote currency of the ticker markets watched for held coins. Coins
+                without such a market are watched against a currency pegged to it, e.g. USDT.
+            max_backoff (float): Maximum seconds to wait before reconnecting a failed stream.
+            poll_interval (float): Seconds between REST refreshes of exchanges that cannot stream.
+        """
+        super().__init__()
+        self.clients = clients
+        self.quote = quote
+        self.max_backoff = max_backoff
+        self.poll_interval = poll_interval
+        self._loop = None
+        self._task = None
+        self._thread = None
+        self._exchanges = []
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Start streaming on a background thread."""
+        if self.is_running():
+            return
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Cancel every stream and close the WebSocket connections."""
+        if self._task is not None and self.is_running():
+            self._loop.call_soon_threadsafe(self._task.cancel)
+
+    def _run(self):
+        asyncio.set_event_loop(self._loop)
+        self._task = self._loop.create_task(self._stream_all())
+        try:
+            self._loop.run_until_complete(self._task)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._loop.close()
+
+    async def _stream_all(self):
+        # Imported on the streaming thread: ccxt.pro is slow to import and only needed here
+        import ccxt.pro as ccxtpro
+
+        streams = []
+        for name, client in self.clients.items():
+            exchange = self.create_exchange(ccxtpro, client)
+            client_streams = []
+            if exchange is not None:
+                # Reuse the REST client's markets so the stream does not download them again
+                if client.exchange.markets:
+                    exchange.set_markets(client.exchange.markets, client.exchange.currencies)
+                # REST calls the stream makes, e.g. for listen keys or auth tokens, share the client's budget
+                governor = getattr(client.exchange, 'governor', None)
+                if governor is not None:
+                    exchange.throttle = lambda cost=None, governor=governor: governor.acquire_async(cost or 1)
+                self._exchanges.append(exchange)
+                client_streams = self._streams_for(name, client, exchange)
+            if not client_streams:
+                self.status.emit(f"{name} does not support streaming; polling every {self.poll_interval}s")
+                client_streams = [self._poll(name, client)]
+            streams.extend(client_streams)
+
+        try:
+            await asyncio.gather(*streams)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            for exchange in self._exchanges:
+                await exchange.close()
+            self._exchanges = []
+            self.status.emit("Live updates stopped")
+
+    @staticmethod
+    def create_exchange(ccxtpro, client):
+        """Create the ccxt.pro exchange streaming a client's account, or None if ccxt.pro has no such exchange."""
+        exchange_class = getattr(ccxtpro, client.exchange_name, None)
+        if exchange_class is None:
+            return None
+        return exchange_class({
+            'apiKey': client.api_key,
+            'secret': client.api_secret,
+        })
+
+    def _streams_for(self, name, client, exchange):
+        streams = []
+        if exchange.has.get('watchBalance'):
+            streams.append(self._watch(name, 'balance', exchange.watch_balance))
+        if exchange.has.get('watchOrders'):
+            streams.append(self._watch(name, 'orders', exchange.watch_orders))
+        if exchange.has.get('watchTickers'):
+            markets = client.exchange.markets or {}
+            quotes = (self.quote,) + PEGGED.get(self.quote, ())
+            symbols = [
+                next(f"{currency}/{quote}" for quote in quotes if f"{currency}/{quote}" in markets)
+                for currency in client.balances
+                if any(f"{currency}/{quote}" in markets for quote in quotes)
+            ]
+            if symbols:
+                streams.append(self._watch(name, 'tickers', exchange.watch_tickers, symbols))
+        return streams
+
+    @staticmethod
+    def _snapshot(kind, payload):
+        """Copy a ccxt.pro cache so the GUI thread never reads it while the stream mutates it."""
+        if kind == 'orders':
+            return [dict(order) for order in payload]
+        if kind == 'balance':
+            return {'total': dict(payload.get('total') or {})}
+        return {symbol: dict(ticker) for symbol, ticker in payload.items()}
+
+    async def _watch(self, name, kind, watch, *args):
+        """Call a watch_* method forever, emitting each update and reconnecting with backoff."""
+        backoff = 1
+        while True:
+            try:
+                payload = await watch(*args)
+                backoff = 1
+                self.update.emit(name, kind, self._snapshot(kind, payload))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.status.emit(f"{name} {kind} stream error, reconnecting in {backoff}s: {e}")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+
+    async def _poll(self, name, client):
+        """Refresh a client over REST every poll_interval seconds, emitting each result."""
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                self.update.emit(name, 'refresh', await loop.run_in_executor(None, self._fetch_rest, client))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.status.emit(f"{name} polling error: {e}")
+            await asyncio.sleep(self.poll_interval)
+
+    @staticmethod
+    def _fetch_rest(client):
+        """
+        Worker: sync a client's open orders and tickers and fetch its balance.
+
+        Returns:
+            dict: 'total' balances and 'currencies' whose open orders changed, applied by
+            ExchangeClient.apply_polled_update on the GUI thread.
+        """
+        balance = client.exchange.fetch_balance()
+        currencies = client.fetch_open_orders()
+        client.fetch_valuation_tickers()
+        return {'total': dict(balance.get('total') or {}), 'currencies': currencies}
@@ -0,0 +1,127 @@
+import random
+from PyQt5.QtCore import Qt
+from account_value_model import AccountValueTableModel, POTENTIAL_GAIN
+from exchange_client import CoinInfo
+
+
+def coin_info(potential_gain, available_coins=1.0):
+    info = CoinInfo()
+    info.potential_gain = potential_gain
+    info.available_coins = available_coins
+    return info
+
+
+def assert_consistent(model, account_values, order=Qt.DescendingOrder):
+    keys = [model.row_key(row) for row in range(model.rowCount())]
+    assert set(keys) == set(account_values)
+    assert model._rows == {key: row for row, key in enumerate(keys)}
+    gains = [(account_values[key].potential_gain, key) for key in keys]
+    assert gains == sorted(gains, reverse=order == Qt.DescendingOrder)
+
+
+def test_incremental_updates_keep_rows_sorted_and_indexed():
+    rng = random.Random(7)
+    account_values = {('kraken', f'C{i:03}'): coin_info(rng.randint(0, 20)) for i in range(200)}
+    model = AccountValueTableModel(account_values, {})
+    assert_consistent(model, account_values)
+
+    for step in range(300):
+        keys = set(rng.sample(sorted(account_values), 3))
+        for key in list(keys):
+            action = rng.random()
+            if action < 0.1:
+                del account_values[key]
+            else:
+                account_values[key] = coin_info(rng.randint(0, 20))
+        if rng.random() < 0.2:
+            key = ('binance', f'N{step:03}')
+            account_values[key] = coin_info(rng.randint(0, 20))
+            keys.add(key)
+        model.update_rows(account_values, {}, keys)
+        assert_consistent(model, account_values)
+
+
+def test_sorting_by_another_column_keeps_the_index():
+    account_values = {('kraken', currency): coin_info(gain) for currency, gain in [('BTC', 3), ('ETH', 1), ('SOL', 2)]}
+    model = AccountValueTableModel(account_values, {})
+
+    model.sort(POTENTIAL_GAIN, Qt.AscendingOrder)
+    assert_consistent(model, account_values, Qt.AscendingOrder)
+
+    account_values[('kraken', 'ETH')] = coin_info(5)
+    model.update_rows(account_values, {}, {('kraken', 'ETH')})
+    assert [model.row_key(row)[1] for row in range(3)] == ['SOL', 'BTC', 'ETH']
+    assert model._find_row(('kraken', 'ETH')) == 2
+
+
+class SignalMirror:
+    """Follows the model's row signals the way a view does, to check they describe every change."""
+
+    def __init__(self, model):
+        self.model = model
+        self.keys = self.model_keys()
+        self.resets = 0
+        model.rowsInserted.connect(self.inserted)
+        model.rowsRemoved.connect(self.removed)
+        model.rowsMoved.connect(self.moved)
+        model.modelReset.connect(self.reset)
+
+    def model_keys(self):
+        return [self.model.row_key(row) for row in range(self.model.rowCount())]
+
+    def inserted(self, parent, first, last):
+        self.keys[first:first] = [self.model.row_key(row) for row in range(first, last + 1)]
+
+    def removed(self, parent, first, last):
+        del self.keys[first:last + 1]
+
+    def moved(self, parent, start, end, destination_parent, destination):
+        rows = self.keys[start:end + 1]
+        del self.keys[start:end + 1]
+        if destination > start:
+            destination -= len(rows)
+        self.keys[destination:destination] = rows
+
+    def reset(self):
+        self.resets += 1
+        self.keys = self.model_keys()
+
+
+def test_row_signals_track_incremental_inserts_removals_and_moves():
+    rng = random.Random(11)
+    account_values = {('kraken', f'C{i:02}'): coin_info(rng.randint(0, 20)) for i in range(40)}
+    model = AccountValueTableModel(account_values, {})
+    mirror = SignalMirror(model)
+
+    for step in range(200):
+        keys = set(rng.sample(sorted(account_values), 2))
+        for key in list(keys):
+            if rng.random() < 0.1:
+                del account_values[key]
+            else:
+                account_values[key] = coin_info(rng.randint(0, 20))
+        if rng.random() < 0.2:
+            key = ('okx', f'N{step:03}')
+            account_values[key] = coin_info(rng.randint(0, 20))
+            keys.add(key)
+        model.update_rows(account_values, {}, keys)
+        assert mirror.keys == mirror.model_keys()
+
+    assert mirror.resets == 0
+
+
+def test_a_changed_row_moves_and_repaints_in_place():
+    account_values = {('kraken', currency): coin_info(gain) for currency, gain in [('BTC', 3), ('ETH', 2), ('SOL', 1)]}
+    model = AccountValueTableModel(account_values, {})
+    mirror = SignalMirror(model)
+    moves, changes = [], []
+    model.rowsMoved.connect(lambda parent, start, end, destination_parent, destination:
+                            moves.append((start, destination)))
+    model.dataChanged.connect(lambda top_left, bottom_right, roles=(): changes.append(top_left.row()))
+
+    account_values[('kraken', 'SOL')] = coin_info(9)
+    model.update_rows(account_values, {}, {('kraken', 'SOL')})
+
+    assert [key[1] for key in mirror.keys] == ['SOL', 'BTC', 'ETH']
+    assert moves == [(2, 0)] and changes
+    assert mirror.resets == 0
@@ -0,0 +1,12 @@
+from types import SimpleNamespace
+import pytest
+from aggregator import ExchangeAggregator
+
+
+def test_clients_are_keyed_by_name_and_must_not_share_one():
+    kraken, main = SimpleNamespace(name='kraken'), SimpleNamespace(name='kraken-main')
+    aggregator = ExchangeAggregator([kraken, main])
+    assert aggregator.clients == {'kraken': kraken, 'kraken-main': main} and aggregator.primary is kraken
+
+    with pytest.raises(ValueError, match='kraken'):
+        ExchangeAggregator([kraken, SimpleNamespace(name='kraken')])
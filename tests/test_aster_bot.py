@@ -0,0 +1,31 @@
+import os
+import subprocess
+import sys
+from aster import aster_bot
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class StubExchange:
+    markets = {'ETH/USDC': {}}
+    markets_by_id = {'ETHUSDC': [{'id': 'ETHUSDC', 'symbol': 'ETH/USDC', 'active': True,
+                                  'limits': {'cost': {'min': 5}}}]}
+
+    def cost_to_precision(self, symbol, cost):
+        return f'{cost:.2f}'
+
+
+def test_importing_the_bot_builds_no_exchange():
+    # A fresh interpreter, as other tests configure the module
+    code = 'from aster import aster_bot; assert aster_bot.exchange is None'
+    subprocess.run([sys.executable, '-c', code], cwd=ROOT, env={**os.environ, 'ASTER_API_KEY': ''}, check=True)
+
+
+def test_configure_sets_the_exchange_alerts_are_checked_against():
+    app = aster_bot.configure(StubExchange())
+    assert app is aster_bot.app
+    assert aster_bot.parse_alert({'action': 'BUY', 'symbol': 'ETHUSDC', 'amount': '10.129'}) == (
+        ('buy', 'ETH/USDC', 10.13), None)
+    assert aster_bot.parse_alert({'action': 'buy', 'symbol': 'ETHUSDC', 'amount': 1})[1].startswith('Amount 1')
+    assert aster_bot.parse_alert({'action': 'buy', 'symbol': 'BTCUSDC', 'amount': 10}) == (
+        None, 'Unknown symbol BTCUSDC')
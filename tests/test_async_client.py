@@ -0,0 +1,43 @@
+import asyncio
+import json
+from async_client import AsyncExchangeClient, close_shared_session, schedule
+
+
+def test_schedule_prints_failures_and_passes_the_message_to_on_error(capsys):
+    async def fail():
+        raise RuntimeError("exchange down")
+
+    async def main():
+        errors, results = [], []
+        task = schedule(fail(), on_result=results.append, on_error=errors.append)
+        await asyncio.wait([task])
+        await asyncio.sleep(0)
+        return errors, results
+
+    errors, results = asyncio.run(main())
+
+    assert errors == ["exchange down"] and results == []
+    assert "RuntimeError: exchange down" in capsys.readouterr().err
+
+
+def test_absorbed_failures_reach_the_error_callback(tmp_path, capsys):
+    config_file = tmp_path / 'config.json'
+    config_file.write_text(json.dumps({'exchange': 'kraken', 'api_key': 'key', 'api_secret': 'secret'}))
+    errors = []
+    client = AsyncExchangeClient(str(config_file), on_error=errors.append)
+
+    async def rejected(*args):
+        raise RuntimeError("invalid key")
+
+    client.exchange.fetch_balance = rejected
+
+    async def main():
+        await client.fetch_balances()
+        await client.close()
+        await close_shared_session()
+
+    asyncio.run(main())
+
+    assert client.balances == {}
+    assert errors == ["Error fetching balances: invalid key"]
+    assert "Error fetching balances: invalid key" in capsys.readouterr().out
@@ -0,0 +1,130 @@
+import asyncio
+import threading
+import time
+import zlib
+from types import SimpleNamespace
+import pytest
+from aster import async_server
+from aster.async_server import OrderQueue, client_order_id
+
+
+class Exchange:
+    """place_spot_order stand-in recording each placement, slow for the given symbol and amount."""
+
+    def __init__(self, slow=None, fail=()):
+        self.slow = slow
+        self.fail = set(fail)
+        self.placed = []
+        self.lock = threading.Lock()
+
+    def place(self, action, symbol, amount, client_order_id=None):
+        if (symbol, amount) == self.slow:
+            time.sleep(0.1)
+        with self.lock:
+            self.placed.append((symbol, amount, client_order_id))
+        if (symbol, amount) in self.fail:
+            return {'error': 'Insufficient balance'}
+        return {'id': len(self.placed)}
+
+
+async def drain(queue):
+    while queue.pending:
+        await asyncio.sleep(0.005)
+
+
+def run(queue_args, scenario):
+    async def main():
+        queue = OrderQueue(**queue_args)
+        queue.start()
+        try:
+            return await scenario(queue)
+        finally:
+            await queue.stop()
+    return asyncio.run(main())
+
+
+def test_a_resent_alert_is_placed_once():
+    exchange = Exchange()
+
+    async def scenario(queue):
+        first = queue.submit(('buy', 'ETH/USDC', 10), 'alert-1')
+        second = queue.submit(('buy', 'ETH/USDC', 10), 'alert-1')
+        await drain(queue)
+        third = queue.submit(('buy', 'ETH/USDC', 10), 'alert-1')
+        return first, second, third
+
+    first, second, third = run({'place': exchange.place, 'workers': 2}, scenario)
+    assert first[2] and not second[2] and not third[2]
+    assert third[1]['state'] == 'placed'
+    assert exchange.placed == [('ETH/USDC', 10, 'alert-1')]
+
+
+def test_a_failed_alert_may_be_resent_with_its_key():
+    exchange = Exchange(fail=[('ETH/USDC', 10)])
+
+    async def scenario(queue):
+        queue.submit(('buy', 'ETH/USDC', 10), 'alert-1')
+        await drain(queue)
+        resent = queue.submit(('buy', 'ETH/USDC', 10), 'alert-1')
+        await drain(queue)
+        return resent
+
+    _, entry, queued = run({'place': exchange.place, 'workers': 2}, scenario)
+    assert queued and entry['state'] == 'failed' and len(exchange.placed) == 2
+
+
+def test_keys_are_forgotten_after_the_dedup_ttl(monkeypatch):
+    now = [1000.0]
+    # Only the queue's clock; the event loop keeps the real one
+    monkeypatch.setattr(async_server, 'time', SimpleNamespace(monotonic=lambda: now[0]))
+    exchange = Exchange()
+
+    async def scenario(queue):
+        queue.submit(('buy', 'ETH/USDC', 10), 'alert-1')
+        await drain(queue)
+        now[0] += 59
+        within_ttl = queue.submit(('buy', 'ETH/USDC', 10), 'alert-1')[2]
+        now[0] += 2
+        after_ttl = queue.submit(('buy', 'ETH/USDC', 10), 'alert-1')[2]
+        await drain(queue)
+        return within_ttl, after_ttl
+
+    within_ttl, after_ttl = run({'place': exchange.place, 'workers': 2, 'dedup_ttl': 60}, scenario)
+    assert not within_ttl and after_ttl
+    assert len(exchange.placed) == 2
+
+
+def test_orders_for_one_symbol_keep_their_alert_order():
+    # The first ETH order is slow; later ETH orders wait for it, other symbols do not
+    exchange = Exchange(slow=('ETH/USDC', 1))
+    symbols = ['ETH/USDC', 'BTC/USDC', 'SOL/USDC', 'XRP/USDC']
+    workers = 4
+    assert len({zlib.crc32(symbol.encode('utf-8')) % workers for symbol in symbols}) > 1
+
+    async def scenario(queue):
+        for amount in (1, 2, 3):
+            for symbol in symbols:
+                queue.submit(('buy', symbol, amount))
+        await drain(queue)
+
+    run({'place': exchange.place, 'workers': workers}, scenario)
+    for symbol in symbols:
+        assert [amount for placed, amount, _ in exchange.placed if placed == symbol] == [1, 2, 3]
+    # Other shards did not wait for the slow order
+    assert exchange.placed[0][0] != 'ETH/USDC'
+
+
+def test_submit_refuses_orders_beyond_maxsize():
+    async def scenario(queue):
+        queue.submit(('buy', 'ETH/USDC', 1))
+        with pytest.raises(asyncio.QueueFull):
+            queue.submit(('buy', 'ETH/USDC', 2))
+
+    # Not started: nothing drains the queue
+    asyncio.run(scenario(OrderQueue(place=Exchange().place, workers=1, maxsize=1)))
+
+
+def test_client_order_ids_are_valid_for_any_key():
+    assert client_order_id('tv-alert_1') == 'tv-alert_1'
+    hashed = client_order_id('a key with spaces that is also far too long to send')
+    assert len(hashed) == 32 and hashed == client_order_id('a key with spaces that is also far too long to send')
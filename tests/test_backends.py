@@ -0,0 +1,152 @@
+import ccxt
+import pytest
+import requests
+from backends import AsterBackend, GovernedExchange, create_exchange
+from rate_limiter import CRITICAL, NORMAL, RateLimitGovernor
+
+EXCHANGE_INFO = {'symbols': [{
+    'symbol': 'ETHUSDT',
+    'baseAsset': 'ETH',
+    'quoteAsset': 'USDT',
+    'status': 'TRADING',
+    'quoteAssetPrecision': 2,
+    'filters': [
+        {'filterType': 'LOT_SIZE', 'stepSize': '0.001', 'minQty': '0.001', 'maxQty': '1000'},
+        {'filterType': 'PRICE_FILTER', 'tickSize': '0.01'},
+        {'filterType': 'MIN_NOTIONAL', 'minNotional': '5'},
+    ],
+}]}
+
+
+class StubClock:
+    def start(self):
+        pass
+
+    def now(self):
+        return 1700000000000
+
+
+class StubExchangeInfo:
+    info = EXCHANGE_INFO
+
+    def load(self):
+        return True
+
+
+class StubClient:
+    """AsterClient answering from canned responses keyed by (method, path)."""
+
+    def __init__(self, responses):
+        self.responses = responses
+        self.requests = []
+        self.clock = StubClock()
+        self.exchange_info = StubExchangeInfo()
+        self.last_response_headers = {}
+
+    def request(self, method, path, params=None, signed=False):
+        self.requests.append((method, path, params, signed))
+        response = self.responses[(method, path)]
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+def http_error(status, body):
+    response = requests.Response()
+    response.status_code = status
+    response._content = body.encode()
+    return requests.HTTPError(response=response)
+
+
+def backend(responses):
+    return AsterBackend({}, client=StubClient(responses))
+
+
+def test_create_exchange_routes_aster_to_the_native_backend_unless_ccxt_is_asked_for():
+    config = {'exchange': 'Aster', 'api_key': 'key', 'api_secret': 'secret'}
+    exchange = create_exchange(config)
+    try:
+        assert isinstance(exchange, AsterBackend)
+    finally:
+        exchange.close()
+    assert isinstance(create_exchange(dict(config, backend='ccxt')), ccxt.aster)
+
+    binance = create_exchange({'exchange': 'binance', 'api_key': 'key', 'api_secret': 'secret'})
+    assert isinstance(binance, ccxt.binance) and not binance.enableRateLimit
+    with pytest.raises(ValueError):
+        create_exchange({'exchange': 'binance', 'api_key': 'key', 'api_secret': 'secret', 'backend': 'native'})
+
+
+def test_fetch_balance_returns_a_ccxt_balance():
+    exchange = backend({('GET', '/account'): {'balances': [
+        {'asset': 'USDT', 'free': '100.5', 'locked': '20'},
+        {'asset': 'ETH', 'free': '0', 'locked': ''},
+    ]}})
+    balance = exchange.fetch_balance()
+    assert balance['USDT'] == {'free': 100.5, 'used': 20.0, 'total': 120.5}
+    assert balance['total'] == {'USDT': 120.5, 'ETH': 0.0}
+    assert exchange.client.requests == [('GET', '/account', None, True)]
+
+
+def test_fetch_tickers_parses_known_markets_and_filters_symbols():
+    exchange = backend({('GET', '/ticker/24hr'): [
+        {'symbol': 'ETHUSDT', 'lastPrice': '2000.5', 'bidPrice': '2000', 'askPrice': '2001', 'volume': '10',
+         'quoteVolume': '20005', 'priceChangePercent': '1.5', 'closeTime': 1700000000000},
+        {'symbol': 'UNLISTED', 'lastPrice': '1'},
+    ]})
+    tickers = exchange.fetch_tickers()
+    assert list(tickers) == ['ETH/USDT']
+    ticker = tickers['ETH/USDT']
+    assert (ticker['last'], ticker['close'], ticker['bid'], ticker['ask']) == (2000.5, 2000.5, 2000.0, 2001.0)
+    assert ticker['quoteVolume'] == 20005.0 and ticker['percentage'] == 1.5
+    assert exchange.fetch_tickers(['BTC/USDT']) == {}
+
+
+def test_orders_are_parsed_into_ccxt_orders():
+    exchange = backend({('GET', '/allOrders'): [
+        {'orderId': 2, 'symbol': 'ETHUSDT', 'status': 'FILLED', 'type': 'MARKET', 'side': 'SELL', 'price': '0',
+         'origQty': '2', 'executedQty': '2', 'cummulativeQuoteQty': '4000', 'time': 20, 'updateTime': 25},
+        {'orderId': 1, 'symbol': 'ETHUSDT', 'status': 'PARTIALLY_FILLED', 'type': 'LIMIT', 'side': 'BUY',
+         'price': '1900', 'origQty': '1', 'executedQty': '0.25', 'cummulativeQuoteQty': '475', 'time': 10},
+    ]})
+    opened, filled = exchange.fetch_orders('ETH/USDT')
+    assert (opened['id'], opened['symbol'], opened['side'], opened['type']) == ('1', 'ETH/USDT', 'buy', 'limit')
+    assert (opened['status'], opened['price'], opened['remaining']) == ('open', 1900.0, 0.75)
+    assert (filled['status'], filled['price'], filled['average']) == ('closed', None, 2000.0)
+    assert filled['lastTradeTimestamp'] == 25
+
+
+def test_cancel_all_orders_returns_the_canceled_orders():
+    exchange = backend({('DELETE', '/openOrders'): [
+        {'orderId': 7, 'symbol': 'ETHUSDT', 'status': 'CANCELED', 'type': 'LIMIT', 'side': 'BUY',
+         'price': '1900', 'origQty': '1', 'executedQty': '0', 'time': 10},
+    ]})
+    canceled = exchange.cancel_all_orders('ETH/USDT')
+    assert [(order['id'], order['status'], order['symbol']) for order in canceled] == [('7', 'canceled', 'ETH/USDT')]
+
+    exchange.client.responses[('DELETE', '/openOrders')] = {'code': 200, 'msg': 'No open orders'}
+    assert exchange.cancel_all_orders('ETH/USDT') == []
+
+
+def test_http_errors_become_ccxt_exceptions():
+    exchange = backend({('GET', '/account'): http_error(400, '{"code": -2015, "msg": "Invalid API-key"}')})
+    with pytest.raises(ccxt.AuthenticationError):
+        exchange.fetch_balance()
+
+
+def test_governed_backend_takes_weight_and_throttles_on_rejection():
+    exchange = backend({('GET', '/account'): {'balances': []},
+                        ('DELETE', '/openOrders'): http_error(429, '{"code": -1003, "msg": "Too many requests"}')})
+    exchange.client.last_response_headers = {'Retry-After': '0'}
+    governor = RateLimitGovernor(rate=100, capacity=100)
+    taken = []
+    acquire = governor.acquire
+    governor.acquire = lambda weight, priority: taken.append((weight, priority)) or acquire(weight, priority)
+    governed = GovernedExchange(exchange, governor)
+
+    governed.fetch_balance()
+    with pytest.raises(ccxt.RateLimitExceeded):
+        governed.cancel_all_orders('ETH/USDT')
+
+    assert taken == [(governor.weight('fetch_balance'), NORMAL), (governor.weight('cancel_all_orders'), CRITICAL)]
+    assert governor.rejections == 1 and governor.rate == 50
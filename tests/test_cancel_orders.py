@@ -0,0 +1,84 @@
+import threading
+import time
+from exchange_client import ExchangeClient
+
+
+class CancelExchange:
+    """Exchange recording cancels and the most requests it ever had in flight at once."""
+
+    id = 'fake'
+
+    def __init__(self, has=None, fail_batches=(), fail_orders=()):
+        self.has = dict(has or {})
+        self.fail_batches = set(fail_batches)
+        self.fail_orders = set(fail_orders)
+        self.batches = []
+        self.canceled = []
+        self.in_flight = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def _request(self):
+        with self._lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        time.sleep(0.01)
+        with self._lock:
+            self.in_flight -= 1
+
+    def cancel_orders(self, ids, symbol):
+        self._request()
+        if symbol in self.fail_batches:
+            raise RuntimeError("batch rejected")
+        self.batches.append(symbol)
+
+    def cancel_order(self, order_id, symbol):
+        self._request()
+        if order_id in self.fail_orders:
+            raise RuntimeError("unknown order")
+        self.canceled.append(order_id)
+
+
+def make_client(exchange, max_workers=4):
+    client = ExchangeClient(config={'exchange': 'fake', 'api_key': 'key', 'api_secret': 'secret',
+                                    'max_workers': max_workers})
+    client.exchange = exchange
+    orders = [{'id': f'{base}{i}', 'symbol': f'{base}/USD', 'side': 'sell', 'price': 1.0, 'amount': 1.0,
+               'remaining': 1.0, 'status': 'open', 'timestamp': i}
+              for base in ('BTC', 'ETH', 'SOL') for i in range(6)]
+    client.order_index.replace(orders)
+    return client
+
+
+def test_single_cancels_share_one_pool():
+    exchange = CancelExchange(fail_orders={'ETH0'})
+    client = make_client(exchange, max_workers=4)
+
+    results = client.cancel_all_orders()
+
+    assert len(results['success']) == 17
+    assert [entry['order_id'] for entry in results['failed']] == ['ETH0']
+    assert exchange.peak <= 4
+    assert [order['id'] for order in client.open_orders] == ['ETH0']
+
+
+def test_a_failed_batch_falls_back_to_single_cancels_on_the_same_pool():
+    exchange = CancelExchange(has={'cancelOrders': True}, fail_batches={'ETH/USD'})
+    client = make_client(exchange, max_workers=3)
+
+    results = client.cancel_all_orders()
+
+    assert sorted(exchange.batches) == ['BTC/USD', 'SOL/USD']
+    assert sorted(exchange.canceled) == [f'ETH{i}' for i in range(6)]
+    assert len(results['success']) == 18 and not results['failed']
+    assert exchange.peak <= 3
+
+
+def test_cancel_by_currency():
+    exchange = CancelExchange()
+    client = make_client(exchange)
+
+    results = client.cancel_all_orders(currency='SOL')
+
+    assert sorted(entry['order_id'] for entry in results['success']) == [f'SOL{i}' for i in range(6)]
+    assert sorted(exchange.canceled) == [f'SOL{i}' for i in range(6)]
@@ -0,0 +1,42 @@
+import numpy as np
+from candlestick_chart import decimate
+
+
+def candles(count, seed=3):
+    rng = np.random.default_rng(seed)
+    opens = rng.uniform(90, 110, count)
+    closes = rng.uniform(90, 110, count)
+    highs = np.maximum(opens, closes) + rng.uniform(0, 5, count)
+    lows = np.minimum(opens, closes) - rng.uniform(0, 5, count)
+    times = np.arange(count) * 60000.0
+    return np.column_stack([times, opens, highs, lows, closes, rng.uniform(0, 10, count)])
+
+
+def test_few_candles_are_returned_as_open_high_low_close():
+    data = candles(5)
+    assert np.array_equal(decimate(data, 10), data[:, 1:5])
+    assert np.array_equal(decimate(data, 5), data[:, 1:5])
+
+
+def test_merged_candles_keep_the_outline_of_their_group():
+    data = candles(1000)
+    merged = decimate(data, 7)
+
+    assert merged.shape == (7, 4)
+    starts = (np.arange(7) * 1000) // 7
+    groups = np.split(data, starts[1:])
+    for row, group in zip(merged, groups):
+        assert row[0] == group[0, 1] and row[3] == group[-1, 4]
+        assert row[1] == group[:, 2].max() and row[2] == group[:, 3].min()
+    # Every candle belongs to exactly one group
+    assert sum(len(group) for group in groups) == 1000
+    assert merged[:, 1].max() == data[:, 2].max() and merged[:, 2].min() == data[:, 3].min()
+
+
+def test_uneven_groups_cover_every_candle():
+    data = candles(10)
+    merged = decimate(data, 3)
+    assert merged.shape == (3, 4)
+    # Groups of 3, 3 and 4 candles
+    assert list(merged[:, 0]) == [data[0, 1], data[3, 1], data[6, 1]]
+    assert list(merged[:, 3]) == [data[2, 4], data[5, 4], data[9, 4]]
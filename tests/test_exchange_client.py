@@ -0,0 +1,47 @@
+import os
+import subprocess
+import sys
+import threading
+import pytest
+import backends
+from exchange_client import ExchangeClient
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONFIG = {'exchange': 'kraken', 'api_key': 'key', 'api_secret': 'secret'}
+
+
+def test_creating_a_client_does_not_import_ccxt():
+    # A fresh interpreter, as other tests have imported ccxt already
+    code = ("import sys; from exchange_client import ExchangeClient; "
+            "client = ExchangeClient(config={'exchange': 'kraken', 'api_key': 'k', 'api_secret': 's'}); "
+            "assert 'ccxt' not in sys.modules, 'imported on creation'; "
+            "client.exchange; assert 'ccxt' in sys.modules")
+    subprocess.run([sys.executable, '-c', code], cwd=ROOT, check=True)
+
+
+def test_the_first_use_of_a_connected_attribute_connects_once(monkeypatch):
+    created = []
+    create_exchange = backends.create_exchange
+    monkeypatch.setattr(backends, 'create_exchange',
+                        lambda config: created.append(config) or create_exchange(config))
+    client = ExchangeClient(config=dict(CONFIG))
+    assert 'exchange' not in vars(client) and created == []
+
+    seen = []
+    threads = [threading.Thread(target=lambda: seen.append(client.ticker_snapshot)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(created) == 1
+    assert all(snapshot is seen[0] for snapshot in seen)
+    assert client.ticker_snapshot.exchange is client.exchange
+    assert client.exchange.exchange.id == 'kraken'
+
+
+def test_unknown_attributes_raise_without_connecting():
+    client = ExchangeClient(config=dict(CONFIG))
+    with pytest.raises(AttributeError, match='no_such_attribute'):
+        client.no_such_attribute
+    assert 'exchange' not in vars(client)
@@ -0,0 +1,100 @@
+import json
+import threading
+import time
+from decimal import Decimal
+import requests
+from aster import exchange_info
+from aster.exchange_info import ExchangeInfoCache, parse_symbol
+
+ETH = {
+    'symbol': 'ETHUSDC',
+    'status': 'TRADING',
+    'quoteAssetPrecision': 2,
+    'filters': [
+        {'filterType': 'LOT_SIZE', 'stepSize': '0.0010', 'minQty': '0.001', 'maxQty': '1000'},
+        {'filterType': 'MARKET_LOT_SIZE', 'stepSize': '0', 'minQty': '0.01', 'maxQty': '50'},
+        {'filterType': 'PRICE_FILTER', 'tickSize': '0.01'},
+        {'filterType': 'NOTIONAL', 'notional': '5'},
+    ],
+}
+
+
+class InfoSession:
+    """Session answering /exchangeInfo with the queued bodies, or raising the queued exceptions."""
+
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.calls = 0
+        self.called = threading.Event()
+
+    def get(self, url, timeout=None):
+        self.calls += 1
+        self.called.set()
+        reply = self.replies.pop(0) if len(self.replies) > 1 else self.replies[0]
+        if isinstance(reply, Exception):
+            raise reply
+        response = requests.Response()
+        response.status_code = 200
+        response._content = json.dumps(reply).encode()
+        return response
+
+
+def test_parse_symbol_prefers_the_market_lot_size_and_reads_either_notional_filter():
+    rules = parse_symbol(ETH)
+    assert rules == {
+        'status': 'TRADING',
+        # MARKET_LOT_SIZE's step of 0 defers to LOT_SIZE's
+        'step': Decimal('0.0010'),
+        'min_qty': Decimal('0.01'),
+        'max_qty': Decimal('50'),
+        'min_notional': Decimal('5'),
+        'quote_step': Decimal('0.01'),
+        'tick': Decimal('0.01'),
+    }
+    legacy = dict(ETH, filters=[{'filterType': 'MIN_NOTIONAL', 'minNotional': '10'}])
+    assert parse_symbol(legacy)['min_notional'] == Decimal('10')
+
+
+def test_parse_symbol_reads_missing_limits_as_zero():
+    rules = parse_symbol({'symbol': 'NEWUSDC', 'filters': [{'filterType': 'LOT_SIZE', 'stepSize': 'bad'}]})
+    assert rules['status'] == 'TRADING'
+    assert rules['step'] == rules['min_notional'] == rules['quote_step'] == rules['tick'] == 0
+
+
+def test_load_keeps_the_previous_rules_when_a_refresh_fails():
+    cache = ExchangeInfoCache(InfoSession([{'symbols': [ETH]}, requests.ConnectionError('down')]),
+                              'https://example.invalid')
+    assert cache.load() and cache.loaded
+    loaded_at = cache.loaded_at
+    assert not cache.load()
+    assert list(cache.symbols) == ['ETHUSDC'] and cache.loaded_at == loaded_at
+
+
+def test_rules_are_refreshed_every_ttl():
+    session = InfoSession([{'symbols': [ETH]}])
+    cache = ExchangeInfoCache(session, 'https://example.invalid', ttl=0.02)
+    cache.start()
+    try:
+        session.called.clear()
+        assert session.called.wait(2)
+        session.called.clear()
+        assert session.called.wait(2)
+    finally:
+        cache.stop()
+    assert session.calls >= 3
+
+
+def test_an_unloaded_cache_retries_at_the_retry_interval(monkeypatch):
+    monkeypatch.setattr(exchange_info, 'RETRY_INTERVAL', 0.02)
+    session = InfoSession([requests.ConnectionError('down'), {'symbols': [ETH]}])
+    # A ttl this long would never refresh within the test
+    cache = ExchangeInfoCache(session, 'https://example.invalid', ttl=3600)
+    cache.start()
+    try:
+        assert not cache.loaded
+        deadline = time.monotonic() + 2
+        while not cache.loaded and time.monotonic() < deadline:
+            time.sleep(0.005)
+    finally:
+        cache.stop()
+    assert cache.loaded and 'ETHUSDC' in cache.symbols
@@ -0,0 +1,70 @@
+import itertools
+import pytest
+from fat_finger import FatFingerEngine
+from order_index import OrderIndex
+
+SYMBOLS = ('BTC/USD', 'ETH/USD')
+
+
+class FakeExchange:
+    has = {'createOrders': False}
+
+    def __init__(self):
+        self.markets = {symbol: {'symbol': symbol, 'limits': {}} for symbol in SYMBOLS}
+        self.ids = itertools.count(1)
+
+    def amount_to_precision(self, symbol, amount):
+        return f'{amount:.8f}'
+
+    def price_to_precision(self, symbol, price):
+        return f'{price:.2f}'
+
+    def create_limit_buy_order(self, symbol, amount, price):
+        return {'id': str(next(self.ids))}
+
+
+@pytest.fixture
+def engine():
+    return FatFingerEngine(FakeExchange(), OrderIndex(), ohlcv_cache=None, max_workers=2)
+
+
+def place(engine, moving_averages, num_orders=5, percentage=2.0):
+    orders = engine.plan(moving_averages, num_orders, percentage, usd_per_order=10.0)
+    results = engine.place(orders)
+    for entry in results['success']:
+        engine.order_index.apply(entry['order'])
+    return orders
+
+
+def open_buys(engine, symbol):
+    return [order for order in engine.order_index.for_symbol(symbol) if order['side'] == 'buy']
+
+
+def test_replacing_a_ladder_places_nothing(engine):
+    place(engine, {'BTC/USD': 100.0})
+    assert len(open_buys(engine, 'BTC/USD')) == 5
+    assert place(engine, {'BTC/USD': 100.0}) == []
+
+
+def test_moving_average_drift_never_exceeds_num_orders(engine):
+    averages = {'BTC/USD': 100.0, 'ETH/USD': 50.0}
+    for drift in (0.0, 0.03, 0.07, 0.15, -0.1, 0.4):
+        place(engine, {symbol: average * (1 + drift) for symbol, average in averages.items()})
+        for symbol in SYMBOLS:
+            assert len(open_buys(engine, symbol)) <= 5
+
+
+def test_filled_rung_is_replenished_after_drift(engine):
+    place(engine, {'BTC/USD': 100.0})
+    filled = open_buys(engine, 'BTC/USD')[0]
+    engine.order_index.remove(filled['id'])
+
+    orders = place(engine, {'BTC/USD': 120.0})
+    assert len(orders) == 1
+    assert len(open_buys(engine, 'BTC/USD')) == 5
+
+
+def test_other_open_buys_count_against_the_ladder(engine):
+    engine.order_index.apply({'id': 'manual', 'symbol': 'BTC/USD', 'side': 'buy', 'price': 10.0, 'status': 'open'})
+    orders = place(engine, {'BTC/USD': 100.0}, num_orders=3)
+    assert [order['price'] for order in orders] == [98.0, 96.0]
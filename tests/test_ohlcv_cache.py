@@ -0,0 +1,59 @@
+import os
+from ohlcv_cache import RECORD_SIZE, OhlcvCache
+
+DAY_MS = 86400 * 1000
+START = 1700000000000 - 1700000000000 % DAY_MS
+
+
+class CappedExchange:
+    """Exchange with daily candles that never returns more than max_bars per request."""
+
+    id = 'capped'
+
+    def __init__(self, max_bars, days=1000):
+        self.max_bars = max_bars
+        self.days = days
+        self.now = START + days * DAY_MS + DAY_MS // 2
+        self.calls = []
+
+    def parse_timeframe(self, timeframe):
+        return 86400
+
+    def milliseconds(self):
+        return self.now
+
+    def fetch_ohlcv(self, symbol, timeframe, since=None, limit=None):
+        self.calls.append((since, limit))
+        times = range(START, self.now, DAY_MS)
+        times = [time for time in times if since is None or time >= since]
+        count = min(limit or self.max_bars, self.max_bars)
+        times = times[:count] if since is not None else times[-count:]
+        return [[time, 1.0, 2.0, 0.5, 1.5, 10.0] for time in times]
+
+
+def test_a_symbol_capped_below_limit_is_extended_instead_of_refetched_in_full(tmp_path):
+    exchange = CappedExchange(max_bars=300)
+    cache = OhlcvCache(exchange, cache_dir=str(tmp_path))
+
+    assert len(cache.refresh(['BTC/USD'], 500)['BTC/USD']) == 299
+    assert exchange.calls[-1] == (None, 501)
+
+    exchange.now += DAY_MS
+    candles = cache.refresh(['BTC/USD'], 500)['BTC/USD']
+    since, _ = exchange.calls[-1]
+    assert since is not None
+    assert len(candles) == 300
+
+
+def test_a_torn_record_is_dropped_when_the_file_is_opened(tmp_path):
+    exchange = CappedExchange(max_bars=300, days=10)
+    cache = OhlcvCache(exchange, cache_dir=str(tmp_path))
+    cache.refresh(['BTC/USD'], 5)
+    path = cache._path('BTC/USD')
+    with open(path, 'ab') as file:
+        file.write(b'\0' * (RECORD_SIZE // 2))
+
+    reopened = OhlcvCache(exchange, cache_dir=str(tmp_path))
+
+    assert len(reopened.candles('BTC/USD')) == 5
+    assert os.path.getsize(path) == 5 * RECORD_SIZE
@@ -0,0 +1,35 @@
+import threading
+from order_index import OrderIndex
+
+
+def order(order_id, status='open'):
+    return {'id': str(order_id), 'symbol': f'C{order_id % 50}/USD', 'status': status}
+
+
+def test_reads_wait_for_an_update_in_progress():
+    index = OrderIndex([order(1)])
+    results = []
+    with index.lock:
+        # A worker halfway through a compound update
+        index.remove('1')
+        readers = [threading.Thread(target=lambda read=read: results.append(read()))
+                   for read in (index.orders, index.currency_counts, index.symbols, lambda: len(index))]
+        for reader in readers:
+            reader.start()
+        for reader in readers:
+            reader.join(0.05)
+        assert results == []
+        index.apply(order(51))
+    for reader in readers:
+        reader.join(2)
+    assert sorted(map(str, results)) == sorted(map(str, [[order(51)], {'C1': 1}, {'C1/USD'}, 1]))
+
+
+def test_lock_makes_compound_updates_atomic():
+    index = OrderIndex([order(1), order(51)])
+    with index.lock:
+        for existing in index.for_symbol('C1/USD'):
+            index.remove(existing['id'])
+        index.apply(order(101))
+    assert [entry['id'] for entry in index] == ['101']
+    assert index.currencies() == {'C1'} and index.symbols() == {'C1/USD'}
@@ -0,0 +1,67 @@
+import threading
+import ccxt
+import pytest
+from order_submitter import OrderSubmitter
+
+
+class Exchange:
+    """Places market buys, failing each symbol's first attempts with the queued errors."""
+
+    def __init__(self, order_errors=None, ticker_errors=None):
+        self.order_errors = {symbol: list(errors) for symbol, errors in (order_errors or {}).items()}
+        self.ticker_errors = {symbol: list(errors) for symbol, errors in (ticker_errors or {}).items()}
+        self.orders = []
+        self.lock = threading.Lock()
+
+    def fetch_ticker(self, symbol):
+        errors = self.ticker_errors.get(symbol)
+        if errors:
+            raise errors.pop(0)
+        return {'symbol': symbol, 'last': 50.0}
+
+    def create_market_buy_order(self, symbol, amount):
+        errors = self.order_errors.get(symbol)
+        if errors:
+            raise errors.pop(0)
+        with self.lock:
+            self.orders.append((symbol, amount))
+            return {'id': str(len(self.orders))}
+
+
+def buy(exchange, symbol='BTC/USD', max_retries=3):
+    return OrderSubmitter(exchange, max_retries=max_retries, backoff=0).market_buy_multiple([symbol], 100)
+
+
+@pytest.mark.parametrize('error', [ccxt.RateLimitExceeded('429'), ccxt.DDoSProtection('418'),
+                                   ccxt.ExchangeNotAvailable('503')])
+def test_rejections_that_never_reached_the_engine_are_retried(error):
+    exchange = Exchange(order_errors={'BTC/USD': [error]})
+    results = buy(exchange)
+    assert [entry['attempts'] for entry in results['success']] == [2]
+    assert exchange.orders == [('BTC/USD', 2.0)]
+
+
+def test_a_timed_out_order_is_not_retried():
+    # The order may have been placed; a retry could buy twice
+    exchange = Exchange(order_errors={'BTC/USD': [ccxt.RequestTimeout('read timed out')]})
+    results = buy(exchange)
+    assert results['success'] == [] and exchange.orders == []
+    assert results['failed'][0]['attempts'] == 1 and 'timed out' in results['failed'][0]['error']
+
+
+def test_price_lookups_are_retried_on_any_network_error():
+    exchange = Exchange(ticker_errors={'BTC/USD': [ccxt.RequestTimeout('slow'), ccxt.NetworkError('reset')]})
+    results = buy(exchange)
+    assert [entry['attempts'] for entry in results['success']] == [3]
+
+
+def test_exchange_errors_are_not_retried():
+    exchange = Exchange(order_errors={'BTC/USD': [ccxt.InsufficientFunds('no balance')]})
+    results = buy(exchange)
+    assert results['failed'][0]['attempts'] == 1 and exchange.orders == []
+
+
+def test_retries_stop_at_max_retries():
+    exchange = Exchange(order_errors={'BTC/USD': [ccxt.RateLimitExceeded('429')] * 5})
+    results = buy(exchange, max_retries=2)
+    assert results['failed'][0]['attempts'] == 3 and exchange.orders == []
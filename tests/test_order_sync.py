@@ -0,0 +1,197 @@
+import pytest
+from order_index import OrderIndex
+from order_sync import OrderSync
+
+
+class PagedExchange:
+    """Exchange returning orders oldest first from since, at most limit per page, like most REST APIs."""
+
+    id = 'paged'
+    options = {}
+    has = {'fetchOpenOrders': True, 'fetchClosedOrders': True}
+
+    def __init__(self, orders):
+        self.orders = sorted(orders, key=lambda order: order['timestamp'])
+        self.calls = []
+
+    def fetch_open_orders(self, symbol=None, since=None, limit=None):
+        self.calls.append(since)
+        matching = [order for order in self.orders if since is None or order['timestamp'] >= since]
+        return [dict(order) for order in matching[:limit]]
+
+    def milliseconds(self):
+        return 1700000100000
+
+
+def order(order_id, timestamp):
+    return {'id': str(order_id), 'symbol': 'BTC/USD', 'side': 'sell', 'price': 100.0, 'amount': 1.0,
+            'remaining': 1.0, 'status': 'open', 'timestamp': timestamp}
+
+
+def test_orders_sharing_a_millisecond_across_a_page_boundary_are_all_fetched():
+    # Pages of 3: the first ends inside the burst of orders at 1700000000002
+    orders = [order(1, 1700000000001), order(2, 1700000000002), order(3, 1700000000002),
+              order(4, 1700000000002), order(5, 1700000000003), order(6, 1700000000004)]
+    sync = OrderSync(PagedExchange(orders), OrderIndex(), page_limit=3)
+
+    fetched = sync._fetch_paged('fetch_open_orders', None, 1700000000000)
+
+    assert sorted(order['id'] for order in fetched) == ['1', '2', '3', '4', '5', '6']
+
+
+class NewestFirstExchange(PagedExchange):
+    """Exchange returning the newest orders first, honouring ccxt's unified 'until' param."""
+
+    def fetch_open_orders(self, symbol=None, since=None, limit=None, params=None):
+        self.calls.append((since, dict(params or {})))
+        until = (params or {}).get('until')
+        matching = [order for order in reversed(self.orders)
+                    if (since is None or order['timestamp'] >= since) and (until is None or order['timestamp'] <= until)]
+        return [dict(order) for order in matching[:limit]]
+
+
+class CcxtPaginatedExchange(PagedExchange):
+    """Exchange whose fetch_open_orders implements ccxt's 'paginate' option."""
+
+    def fetch_open_orders(self, symbol=None, since=None, limit=None, params=None):
+        self.calls.append(dict(params or {}))
+        if (params or {}).get('paginate'):
+            return [dict(order) for order in self.orders]
+        return [dict(order) for order in self.orders[:3]]
+
+
+def test_newest_first_pages_are_followed_back_through_until():
+    orders = [order(i, 1700000000000 + i // 2) for i in range(10)]
+    exchange = NewestFirstExchange(orders)
+    sync = OrderSync(exchange, OrderIndex(), page_limit=3)
+
+    fetched = sync._fetch_paged('fetch_open_orders', None, None)
+
+    assert sorted(int(order['id']) for order in fetched) == list(range(10))
+    assert exchange.calls[0] == (None, {})
+    assert all(since is None for since, _ in exchange.calls)
+
+
+def test_full_sync_keeps_older_open_orders_on_a_newest_first_exchange():
+    orders = [order(i, 1700000000000 + i) for i in range(8)]
+    index = OrderIndex()
+    OrderSync(NewestFirstExchange(orders), index, page_limit=3).full_sync()
+
+    assert len(index) == 8
+
+
+def test_ccxt_pagination_is_used_where_the_exchange_implements_it():
+    orders = [order(i, 1700000000000 + i) for i in range(7)]
+    exchange = CcxtPaginatedExchange(orders)
+    sync = OrderSync(exchange, OrderIndex(), page_limit=3)
+
+    fetched = sync._fetch_paged('fetch_open_orders', None, None)
+
+    assert len(fetched) == 7
+    assert exchange.calls == [{'paginate': True}]
+
+
+def test_an_unknown_since_is_left_out_instead_of_sent_as_zero():
+    orders = [order(i, 1700000000000 + i) for i in range(7)]
+    exchange = PagedExchange(orders)
+    sync = OrderSync(exchange, OrderIndex(), page_limit=3)
+
+    fetched = sync._fetch_paged('fetch_open_orders', None, None)
+
+    assert len(fetched) == 7
+    assert exchange.calls[0] is None
+    assert 0 not in exchange.calls
+
+
+class HistoryExchange:
+    """Exchange holding orders of every status, with ccxt's emulated fetch_closed_orders filter."""
+
+    id = 'history'
+    options = {}
+
+    def __init__(self, orders, has):
+        self.orders = orders
+        self.has = {'fetchOpenOrders': True, **has}
+        self.now = 1700000100000
+
+    def _since(self, since, status=None):
+        return [dict(order) for order in self.orders
+                if (since is None or (order.get('lastUpdateTimestamp') or order['timestamp']) >= since)
+                and (status is None or order['status'] == status)]
+
+    def fetch_open_orders(self, symbol=None, since=None, limit=None):
+        return self._since(None, 'open')
+
+    def fetch_orders(self, symbol=None, since=None, limit=None):
+        return self._since(since)
+
+    def fetch_closed_orders(self, symbol=None, since=None, limit=None):
+        # ccxt emulates this as fetch_orders filtered by status
+        return self._since(since, 'closed')
+
+    def fetch_canceled_orders(self, symbol=None, since=None, limit=None):
+        return self._since(since, 'canceled')
+
+    def milliseconds(self):
+        return self.now
+
+
+@pytest.mark.parametrize('has', [
+    {'fetchOrders': True, 'fetchClosedOrders': 'emulated'},
+    {'fetchOrders': False, 'fetchClosedOrders': True, 'fetchCanceledOrders': True},
+])
+def test_an_order_canceled_outside_the_app_leaves_the_index_on_the_next_incremental_sync(has):
+    resting = order(1, 1700000000000)
+    exchange = HistoryExchange([resting], has)
+    index = OrderIndex()
+    sync = OrderSync(exchange, index)
+    sync.sync()
+    assert '1' in index
+
+    # Canceled on the exchange's website after the full sync
+    exchange.orders = [{**resting, 'status': 'canceled', 'lastUpdateTimestamp': 1700000100000}]
+    exchange.now += 1000
+    changed = sync.sync()
+
+    assert changed == {'BTC'}
+    assert '1' not in index
+
+
+class PerSymbolExchange:
+    """Exchange that needs a symbol per open orders request, with markets that can be made to fail."""
+
+    id = 'persymbol'
+    options = {'warnOnFetchOpenOrdersWithoutSymbol': True}
+    has = {'fetchOpenOrders': True, 'fetchOrders': True}
+
+    def __init__(self, orders):
+        self.orders = orders
+        self.failing = set()
+
+    def fetch_open_orders(self, symbol=None, since=None, limit=None):
+        if symbol in self.failing:
+            raise RuntimeError("gateway timeout")
+        return [dict(order) for order in self.orders if order['symbol'] == symbol]
+
+    fetch_orders = fetch_open_orders
+
+    def milliseconds(self):
+        return 1700000100000
+
+
+def test_a_market_that_fails_a_full_sync_keeps_its_indexed_orders():
+    orders = [order(1, 1700000000000), {**order(2, 1700000000000), 'symbol': 'ETH/USD'}]
+    exchange = PerSymbolExchange(orders)
+    index = OrderIndex()
+    sync = OrderSync(exchange, index)
+    sync.full_sync(['BTC/USD', 'ETH/USD'])
+    assert set(index.by_id) == {'1', '2'}
+
+    exchange.failing = {'ETH/USD'}
+    exchange.orders = [orders[1]]
+    sync.full_sync(['BTC/USD', 'ETH/USD'])
+
+    assert set(index.by_id) == {'2'}
+    assert [order['id'] for order in index.for_currency('ETH')] == ['2']
+    # Not counted as a complete resync, so the next sync retries the failed market
+    assert sync.last_full_sync == 0.0
@@ -0,0 +1,54 @@
+from PyQt5.QtCore import Qt
+from coin_pairs_model import CoinPairsTableModel
+from usd_pairs_model import USDPairsTableModel
+
+
+def display(model):
+    return [[model.data(model.index(row, column)) for column in range(model.columnCount())]
+            for row in range(model.rowCount())]
+
+
+def check(model, row):
+    model.setData(model.index(row, 0), Qt.Checked, Qt.CheckStateRole)
+
+
+def test_coin_pairs_are_formatted_and_keep_their_selection():
+    model = CoinPairsTableModel()
+    model.update_pairs([{'symbol': 'BTC/USD', 'moving_average': 64250.123456, 'open_buys': 2},
+                        {'symbol': 'ETH/USD', 'moving_average': '3100.5', 'open_buys': 0}])
+    assert [model.headerData(column, Qt.Horizontal) for column in range(4)] == [
+        "Select", "Symbol", "Moving Average", "Open Buys"]
+    assert display(model) == [[None, 'BTC/USD', '64250.123', '2'], [None, 'ETH/USD', '3100.5', '0']]
+
+    check(model, 1)
+    model.update_pairs([{'symbol': 'ETH/USD', 'moving_average': 3000, 'open_buys': 1}])
+    assert model.get_selected_pairs() == ['ETH/USD']
+    assert model.data(model.index(0, 0), Qt.CheckStateRole) == Qt.Checked
+
+
+def test_usd_pairs_are_formatted_and_refreshed_unselected():
+    model = USDPairsTableModel()
+    model.update_pairs([{'currency': 'SOL', 'balance': 3.456, 'symbol': 'SOL/USD'}])
+    assert model.headerData(2, Qt.Horizontal) == "Current Balance ($)"
+    assert display(model) == [[None, 'SOL', '3.46', 'SOL/USD']]
+    assert model.data(model.index(0, 1), Qt.TextAlignmentRole) == Qt.AlignLeft | Qt.AlignVCenter
+
+    model.select_all()
+    assert model.get_selected_pairs() == ['SOL/USD']
+    model.update_pairs([{'currency': 'SOL', 'balance': 3.456, 'symbol': 'SOL/USD'}])
+    assert model.get_selected_pairs() == []
+
+
+def test_select_all_repaints_the_checkboxes_without_a_reset():
+    model = USDPairsTableModel()
+    model.update_pairs([{'currency': c, 'balance': 1, 'symbol': f'{c}/USD'} for c in ('ADA', 'DOT', 'SOL')])
+    resets, changes = [], []
+    model.modelReset.connect(lambda: resets.append(True))
+    model.dataChanged.connect(lambda top_left, bottom_right, roles=():
+                              changes.append((top_left.row(), top_left.column(), bottom_right.row(),
+                                              bottom_right.column(), list(roles))))
+
+    model.select_all()
+    model.deselect_all()
+    assert resets == []
+    assert changes == [(0, 0, 2, 0, [Qt.CheckStateRole])] * 2
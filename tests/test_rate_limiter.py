@@ -0,0 +1,113 @@
+import threading
+import time
+import pytest
+from backends import GovernedExchange
+from rate_limiter import BULK, CRITICAL, NORMAL, RateLimitGovernor
+
+
+def tokens(governor):
+    # Stop the refill so the balance can be read exactly
+    governor.rate = governor.base_rate = 0.0
+    governor._refill(governor._updated)
+    return governor._tokens
+
+
+def test_critical_requests_are_served_before_queued_bulk_ones():
+    governor = RateLimitGovernor(rate=5, capacity=5)
+    governor.acquire(5)
+    served = []
+
+    def request(name, priority):
+        governor.acquire(1, priority)
+        served.append(name)
+
+    bulk = threading.Thread(target=request, args=('bulk', BULK))
+    bulk.start()
+    time.sleep(0.05)
+    critical = threading.Thread(target=request, args=('critical', CRITICAL))
+    critical.start()
+    bulk.join(5)
+    critical.join(5)
+
+    assert served == ['critical', 'bulk']
+
+
+def test_bulk_requests_never_dip_into_the_reserve():
+    governor = RateLimitGovernor(rate=0.001, capacity=10, reserve=0.2)
+    while governor.try_acquire(1, BULK):
+        pass
+    assert governor._tokens >= 2
+    assert governor.try_acquire(1, NORMAL)
+
+
+def test_throttled_halves_the_rate_and_pauses_for_retry_after():
+    governor = RateLimitGovernor(rate=10, capacity=10, recovery=0.0)
+    governor.throttled({'Retry-After': '0.3'})
+
+    assert governor.rate == 5
+    assert not governor.try_acquire(1, CRITICAL)
+    started = time.monotonic()
+    governor.acquire(1, CRITICAL)
+    assert time.monotonic() - started >= 0.3
+
+    governor.throttled()
+    assert governor.rate == 2.5 and governor.rejections == 2
+
+
+def test_throttled_rate_stops_at_its_floor():
+    governor = RateLimitGovernor(rate=10, capacity=10, recovery=0.0, min_rate_fraction=0.1, backoff=0.0)
+    for _ in range(10):
+        governor.throttled()
+    assert governor.rate == 1
+
+
+def test_observe_leaves_the_burst_alone_while_the_window_has_headroom():
+    governor = RateLimitGovernor(rate=10, capacity=10)
+    governor.observe({'X-RateLimit-Remaining': '300', 'X-RateLimit-Limit': '600'})
+    assert tokens(governor) == pytest.approx(10)
+
+
+def test_observe_lowers_the_balance_to_what_is_left_of_the_window():
+    # 6 of 600 per minute left is 1% of the 10/s * 60s budget, i.e. 6 tokens
+    governor = RateLimitGovernor(rate=10, capacity=10)
+    governor.observe({'x-ratelimit-remaining': '6', 'x-ratelimit-limit': '600'})
+    assert tokens(governor) == pytest.approx(6)
+
+
+def test_observe_reads_used_weight_against_the_weight_limit():
+    governor = RateLimitGovernor(rate=10, capacity=10, weight_limit=6000)
+    governor.observe({'X-MBX-USED-WEIGHT-1M': '5970'})
+    assert tokens(governor) == pytest.approx(3)
+
+
+def test_observe_ignores_used_weight_without_a_weight_limit():
+    governor = RateLimitGovernor(rate=10, capacity=10)
+    governor.observe({'X-MBX-USED-WEIGHT-1M': '5999'})
+    assert tokens(governor) == pytest.approx(10)
+
+
+def test_symbol_lists_are_charged_per_market_up_to_the_all_markets_weight():
+    governor = RateLimitGovernor(rate=10, capacity=100, weights={'fetch_tickers': 1, 'fetch_tickers:all': 40})
+    assert governor.weight('fetch_tickers') == 1
+    assert governor.weight('fetch_tickers', symbol_count=5) == 5
+    assert governor.weight('fetch_tickers', symbol_count=500) == 40
+    assert governor.weight('fetch_tickers', symbol_given=False) == 40
+
+
+def test_governed_exchange_charges_a_ticker_list_by_its_length():
+    class Exchange:
+        last_response_headers = {}
+
+        def fetch_tickers(self, symbols=None, params={}):
+            return {}
+
+    governor = RateLimitGovernor(rate=10, capacity=100, weights={'fetch_tickers': 1, 'fetch_tickers:all': 40})
+    charged = []
+    governor.acquire = lambda weight, priority: charged.append(weight)
+    exchange = GovernedExchange(Exchange(), governor)
+
+    exchange.fetch_tickers(['BTC/USD', 'ETH/USD', 'SOL/USD'])
+    exchange.fetch_tickers([])
+    exchange.fetch_tickers()
+    exchange.fetch_tickers(symbols=['BTC/USD'])
+    assert charged == [3, 40, 40, 1]
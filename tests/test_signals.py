@@ -0,0 +1,13 @@
+from signals import VolumeSpikeScanner
+
+
+def test_a_window_shorter_than_min_periods_still_flags_spikes():
+    scanner = VolumeSpikeScanner(window=10, threshold=3.0)
+    for tick in range(10):
+        signals, _ = scanner.on_tick(tick, {'BTC/USD': 100.0 + tick % 2}, {'BTC/USD': 50.0})
+        assert signals == []
+
+    signals, _ = scanner.on_tick(10, {'BTC/USD': 1000.0}, {'BTC/USD': 50.0})
+
+    assert scanner.min_periods == 10
+    assert [signal['symbol'] for signal in signals] == ['BTC/USD']
@@ -0,0 +1,105 @@
+import json
+import pytest
+import requests
+from aster import signing
+from aster.client import AsterClient
+from aster.signing import RequestSigner, ServerClock
+
+# The signed-endpoint example from the Binance-compatible API documentation Aster follows
+SECRET = 'NhqPtmdSJYdKjVHjA7PZj4Mge3R5YNiP1e3UZjInClVN65XAbvqqM6A7H5fATj0j'
+QUERY = ('symbol=LTCBTC&side=BUY&type=LIMIT&timeInForce=GTC&quantity=1&price=0.1'
+         '&recvWindow=5000&timestamp=1499827319559')
+SIGNATURE = 'c8db56825ae71d6d79447849e617115f4a920fa2acdcab2b053c4b2838bd6b71'
+
+
+def response(status, body, headers=None):
+    result = requests.Response()
+    result.status_code = status
+    result._content = json.dumps(body).encode()
+    result.headers.update(headers or {})
+    return result
+
+
+class TimeSession:
+    """Session answering /time with the given server times, or raising the given exceptions."""
+
+    def __init__(self, replies):
+        self.replies = list(replies)
+
+    def get(self, url, timeout=None):
+        reply = self.replies.pop(0)
+        if isinstance(reply, Exception):
+            raise reply
+        return response(200, {'serverTime': reply})
+
+
+def test_signer_matches_the_documented_signature():
+    signer = RequestSigner(SECRET)
+    assert signer.sign(QUERY) == SIGNATURE
+    # The keyed state is copied, never consumed
+    assert signer.sign(QUERY) == SIGNATURE
+    assert signer.sign('symbol=LTCBTC') != SIGNATURE
+
+
+def test_clock_keeps_the_offset_of_the_shortest_round_trip(monkeypatch):
+    # (sent, received) local seconds per sample; the second has the shortest round trip
+    moments = iter([1.000, 1.100, 2.000, 2.010, 3.000, 3.050])
+    monkeypatch.setattr(signing.time, 'time', lambda: next(moments))
+    clock = ServerClock(TimeSession([2050, 3505, 3525]), 'https://example.invalid', samples=3)
+
+    assert clock.sync()
+    assert clock.offset == 3505 - 2005
+
+
+def test_clock_keeps_its_offset_when_every_sample_fails():
+    clock = ServerClock(TimeSession([requests.ConnectionError('down')] * 3), 'https://example.invalid')
+    clock.offset = 250
+    assert not clock.sync()
+    assert clock.offset == 250 and clock.synced_at is None
+
+
+class OrderSession:
+    """Session returning the queued responses to requests and recording the signed queries."""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.queries = []
+
+    def request(self, method, url, params=None, timeout=None):
+        self.queries.append(params)
+        return self.responses.pop(0)
+
+
+def client_with(responses):
+    client = AsterClient('key', SECRET, base_url='https://example.invalid')
+    client.session = OrderSession(responses)
+    syncs = []
+    client.clock.sync = lambda: syncs.append(True) or True
+    return client, syncs
+
+
+def test_timestamp_rejection_resyncs_and_resends_once():
+    client, syncs = client_with([response(400, {'code': -1021, 'msg': 'Timestamp outside recvWindow'}),
+                                 response(200, {'orderId': 1}, {'X-MBX-USED-WEIGHT-1M': '3'})])
+
+    assert client.request('POST', '/order', {'symbol': 'ETHUSDT'}, signed=True) == {'orderId': 1}
+    assert len(syncs) == 1 and len(client.session.queries) == 2
+    assert all(query['signature'] for query in client.session.queries)
+    assert client.last_response_headers['X-MBX-USED-WEIGHT-1M'] == '3'
+
+
+def test_a_second_timestamp_rejection_is_raised():
+    rejected = {'code': -1021, 'msg': 'Timestamp outside recvWindow'}
+    client, syncs = client_with([response(400, rejected), response(400, rejected)])
+
+    with pytest.raises(requests.HTTPError):
+        client.request('POST', '/order', {'symbol': 'ETHUSDT'}, signed=True)
+    assert len(syncs) == 1 and len(client.session.queries) == 2
+
+
+def test_other_rejections_are_not_resent():
+    client, syncs = client_with([response(400, {'code': -2010, 'msg': 'Insufficient balance'})])
+
+    with pytest.raises(requests.HTTPError):
+        client.request('POST', '/order', {'symbol': 'ETHUSDT'}, signed=True)
+    assert syncs == [] and len(client.session.queries) == 1
@@ -0,0 +1,68 @@
+import threading
+import time
+from exchange_client import CoinInfo
+from store import LocalStore
+
+DAY_MS = 86400 * 1000
+
+
+def fill(order_id, price=100.0, timestamp=1700000000000):
+    return {'id': order_id, 'symbol': 'BTC/USD', 'side': 'sell', 'price': price, 'filled': 1.0, 'cost': price,
+            'timestamp': timestamp}
+
+
+def coin_info(coins):
+    info = CoinInfo()
+    info.available_coins = coins
+    return info
+
+
+def flush(store):
+    """Flush on a helper thread so a writer that never marks its work done fails the test instead of hanging."""
+    thread = threading.Thread(target=store.flush, daemon=True)
+    thread.start()
+    thread.join(5)
+    assert not thread.is_alive(), "flush() did not return"
+
+
+def test_flush_returns_after_a_write_fails_with_a_non_sqlite_error(tmp_path):
+    store = LocalStore(str(tmp_path / 'history.db'))
+    store._queue.put(('snapshot', 'malformed'))
+    flush(store)
+
+    store.record_fills('kraken', [fill('1')])
+    flush(store)
+    assert [row[1] for row in store.fills()] == ['1']
+    store.close()
+
+
+def test_a_bad_write_loses_only_itself_not_the_rest_of_its_batch(tmp_path):
+    store = LocalStore(str(tmp_path / 'history.db'))
+    store.record_fills('kraken', [fill('1')])
+    # A price sqlite cannot bind fails this write
+    store.record_fills('kraken', [fill('2', price={'bad': 'value'})])
+    store.record_fills('kraken', [fill('3')])
+    store.record_snapshot('kraken', {'BTC': coin_info(1.0)}, [], 100.0, 0.0)
+    flush(store)
+
+    assert [row[1] for row in store.fills()] == ['1', '3']
+    assert store.load_last_state('kraken')['balances'][0][:2] == ('BTC', 1.0)
+    store.close()
+
+
+def test_prune_drops_old_snapshots_but_keeps_each_exchanges_latest(tmp_path):
+    store = LocalStore(str(tmp_path / 'history.db'), retention_days=30)
+    now = int(time.time() * 1000)
+    for exchange, days_ago in [('kraken', 60), ('kraken', 40), ('kraken', 1), ('binance', 50)]:
+        store.record_snapshot(exchange, {'BTC': coin_info(days_ago)}, [{'id': days_ago, 'symbol': 'BTC/USD'}],
+                              100.0, 0.0, timestamp=now - days_ago * DAY_MS)
+    store.record_fills('kraken', [fill('1', timestamp=now - 300 * DAY_MS)])
+    flush(store)
+
+    # The writer prunes after its first batch too; whichever run got there, the same snapshots are gone
+    store.prune()
+    assert [(exchange, timestamp) for exchange, timestamp, _, _ in store.pnl_history()] == [
+        ('binance', now - 50 * DAY_MS), ('kraken', now - DAY_MS)]
+    assert sorted(row[2] for row in store.currency_history('BTC')) == [1.0, 50.0]
+    assert len(store.fills()) == 1
+    store.close()
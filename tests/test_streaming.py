@@ -0,0 +1,257 @@
+import asyncio
+import json
+import queue
+import threading
+import time
+import pytest
+from aiohttp import web
+from PyQt5.QtCore import Qt
+from account_value_model import AccountValueTableModel
+from aggregator import ExchangeAggregator
+from exchange_client import ExchangeClient
+from market_cache import MarketCache
+from order_sync import OrderSync
+from streaming import StreamingSession
+from ticker_snapshot import TickerSnapshot
+
+MARKETS = {
+    'BTC/USD': {'id': 'BTC-USD', 'symbol': 'BTC/USD', 'base': 'BTC', 'quote': 'USD', 'baseId': 'BTC',
+                'quoteId': 'USD', 'type': 'spot', 'spot': True, 'active': True, 'precision': {}, 'limits': {}},
+}
+TIMEOUT = 10
+
+
+class FakeOkxServer:
+    """Local stand-in for OKX's v5 WebSocket API: logins, subscriptions and pushed updates."""
+
+    def __init__(self):
+        self.subscriptions = []
+        self.connections = 0
+        self.loop = None
+        self.url = None
+        self._runner = None
+
+    def start(self):
+        ready = threading.Event()
+
+        def run():
+            self.loop = asyncio.new_event_loop()
+            app = web.Application()
+            app.router.add_get('/ws/v5/{access}', self._handle)
+            self._runner = web.AppRunner(app)
+            self.loop.run_until_complete(self._runner.setup())
+            site = web.TCPSite(self._runner, '127.0.0.1', 0)
+            self.loop.run_until_complete(site.start())
+            self.url = f"ws://127.0.0.1:{self._runner.addresses[0][1]}/ws/v5"
+            ready.set()
+            self.loop.run_forever()
+
+        threading.Thread(target=run, daemon=True).start()
+        ready.wait()
+
+    def stop(self):
+        self._call(self._runner.cleanup())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+    async def _handle(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.connections += 1
+        async for message in ws:
+            if message.data == 'ping':
+                await ws.send_str('pong')
+                continue
+            request = json.loads(message.data)
+            if request['op'] == 'login':
+                await ws.send_json({'event': 'login', 'code': '0', 'msg': ''})
+            elif request['op'] == 'subscribe':
+                for arg in request['args']:
+                    self.subscriptions.append((ws, arg))
+                    await ws.send_json({'event': 'subscribe', 'arg': arg})
+        self.subscriptions = [(socket, arg) for socket, arg in self.subscriptions if socket is not ws]
+        return ws
+
+    def _call(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result(TIMEOUT)
+
+    def subscribed(self, channel):
+        return any(arg['channel'] == channel for _, arg in self.subscriptions)
+
+    def push(self, channel, data):
+        async def send():
+            for ws, arg in list(self.subscriptions):
+                if arg['channel'] == channel and not ws.closed:
+                    await ws.send_json({'arg': arg, 'data': data})
+        self._call(send())
+
+    def drop(self):
+        """Close every connection, as when the exchange restarts its gateway."""
+        async def close():
+            for ws in {ws for ws, _ in self.subscriptions}:
+                await ws.close()
+        self._call(close())
+
+
+class FakeRestExchange:
+    """REST exchange with one market, a balance and open orders held in memory."""
+
+    id = 'fake'
+    has = {'fetchBalance': True, 'fetchTickers': True, 'fetchOpenOrders': True, 'fetchOrders': True}
+    options = {}
+
+    def __init__(self):
+        self.markets = dict(MARKETS)
+        self.currencies = {}
+        self.balance = {'BTC': 1.0, 'USD': 100.0}
+        self.open_orders = []
+        self.last = 100.0
+
+    def load_markets(self, reload=False):
+        return self.markets
+
+    def fetch_balance(self):
+        return {'total': dict(self.balance)}
+
+    def fetch_tickers(self, symbols=None):
+        return {'BTC/USD': {'symbol': 'BTC/USD', 'last': self.last}}
+
+    def fetch_open_orders(self, symbol=None, since=None, limit=None):
+        return [dict(order) for order in self.open_orders]
+
+    def fetch_orders(self, symbol=None, since=None, limit=None):
+        return [dict(order) for order in self.open_orders]
+
+    def milliseconds(self):
+        return int(time.time() * 1000)
+
+
+def make_client(tmp_path, exchange_name):
+    """An ExchangeClient wired to a FakeRestExchange the way connect() wires a real one."""
+    client = ExchangeClient(config={'exchange': exchange_name, 'api_key': 'key', 'api_secret': 'secret'})
+    rest = FakeRestExchange()
+    client.ticker_snapshot = TickerSnapshot(rest)
+    client.order_sync = OrderSync(rest, client.order_index)
+    client.market_cache = MarketCache(rest, exchange_name, cache_dir=str(tmp_path))
+    client.exchange = rest
+    client.refresh_data()
+    return client
+
+
+class Harness:
+    """Runs a StreamingSession and applies its updates the way the UI does, on the test thread."""
+
+    def __init__(self, clients, session):
+        self.aggregator = ExchangeAggregator(clients)
+        self.aggregator.refresh_data()
+        self.model = AccountValueTableModel(self.aggregator.account_values, self.aggregator.open_order_counts())
+        self.session = session
+        self.updates = queue.Queue()
+        self.statuses = []
+        # The UI receives these queued on the GUI thread; here the test thread plays that part
+        session.update.connect(lambda *update: self.updates.put(update), Qt.DirectConnection)
+        session.status.connect(self.statuses.append, Qt.DirectConnection)
+
+    def wait_for(self, kind, predicate=lambda payload: True):
+        """Apply updates until one of the given kind matches predicate. Returns its payload."""
+        deadline = time.monotonic() + TIMEOUT
+        while time.monotonic() < deadline:
+            try:
+                exchange, update_kind, payload = self.updates.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            changed = self.aggregator.apply_stream_update(exchange, update_kind, payload)
+            if changed:
+                self.model.update_rows(self.aggregator.account_values, self.aggregator.open_order_counts(changed),
+                                       changed)
+            if update_kind == kind and predicate(payload):
+                return payload
+        raise AssertionError(f"No {kind} update within {TIMEOUT}s; statuses: {self.statuses}")
+
+    def row(self, exchange, currency):
+        for row in range(self.model.rowCount()):
+            if self.model.row_key(row) == (exchange, currency):
+                return [self.model.data(self.model.index(row, column)) for column in range(self.model.columnCount())]
+        return None
+
+
+def wait_until(condition):
+    deadline = time.monotonic() + TIMEOUT
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def server():
+    server = FakeOkxServer()
+    server.start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def okx_session(server, tmp_path):
+    client = make_client(tmp_path, 'okx')
+
+    class LocalSession(StreamingSession):
+        @staticmethod
+        def create_exchange(ccxtpro, client):
+            return ccxtpro.okx({'apiKey': client.api_key, 'secret': client.api_secret, 'password': 'passphrase',
+                                'urls': {'api': {'ws': server.url}}})
+
+    harness = Harness([client], LocalSession({client.name: client}, max_backoff=0.2))
+    harness.session.start()
+    yield harness
+    harness.session.stop()
+    harness.session._thread.join(TIMEOUT)
+
+
+def test_streamed_tickers_and_orders_reach_the_model(server, okx_session):
+    wait_until(lambda: all(server.subscribed(channel) for channel in ('tickers', 'orders', 'account')))
+
+    server.push('tickers', [{'instType': 'SPOT', 'instId': 'BTC-USD', 'last': '120', 'ts': '1700000000000'}])
+    okx_session.wait_for('tickers', lambda tickers: tickers.get('BTC/USD', {}).get('last') == 120.0)
+    assert okx_session.aggregator.account_values[('okx', 'BTC')].current_value == pytest.approx(120.0)
+    assert okx_session.row('okx', 'BTC')[3] == '0'
+
+    server.push('orders', [{'instType': 'SPOT', 'instId': 'BTC-USD', 'ordId': '7', 'px': '150', 'sz': '1',
+                            'side': 'sell', 'ordType': 'limit', 'state': 'live', 'accFillSz': '0',
+                            'cTime': '1700000000000', 'uTime': '1700000000000'}])
+    okx_session.wait_for('orders')
+    assert okx_session.aggregator.clients['okx'].order_index.get('7')['price'] == 150.0
+    assert okx_session.row('okx', 'BTC')[3] == '1'
+    coin_info = okx_session.aggregator.account_values[('okx', 'BTC')]
+    assert coin_info.potential_gain == pytest.approx(150.0)
+    assert coin_info.percentage_gain == pytest.approx(25.0)
+
+
+def test_stream_reconnects_after_the_server_drops(server, okx_session):
+    wait_until(lambda: server.subscribed('tickers'))
+    connections = server.connections
+
+    server.drop()
+    wait_until(lambda: server.connections > connections and server.subscribed('tickers'))
+
+    server.push('tickers', [{'instType': 'SPOT', 'instId': 'BTC-USD', 'last': '90', 'ts': '1700000000000'}])
+    okx_session.wait_for('tickers', lambda tickers: tickers.get('BTC/USD', {}).get('last') == 90.0)
+    assert okx_session.aggregator.account_values[('okx', 'BTC')].current_value == pytest.approx(90.0)
+
+
+def test_exchanges_without_streaming_fall_back_to_rest_polling(tmp_path):
+    client = make_client(tmp_path, 'nostream')
+    harness = Harness([client], StreamingSession({client.name: client}, poll_interval=0.05))
+    harness.session.start()
+    try:
+        harness.wait_for('refresh')
+        assert any('polling' in status for status in harness.statuses)
+
+        rest = client.exchange
+        rest.balance['BTC'] = 2.0
+        rest.open_orders = [{'id': '1', 'symbol': 'BTC/USD', 'side': 'sell', 'price': 150.0, 'amount': 1.0,
+                             'remaining': 1.0, 'status': 'open', 'timestamp': rest.milliseconds()}]
+        harness.wait_for('refresh', lambda update: update['total']['BTC'] == 2.0 and 'BTC' in update['currencies'])
+        assert harness.aggregator.balances[('nostream', 'BTC')] == 2.0
+        assert harness.row('nostream', 'BTC')[3] == '1'
+    finally:
+        harness.session.stop()
+        harness.session._thread.join(TIMEOUT)
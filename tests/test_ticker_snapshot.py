@@ -0,0 +1,71 @@
+import threading
+import ccxt
+from ticker_snapshot import TickerSnapshot
+
+
+class Exchange:
+    def __init__(self, batch=True, batch_fails=False, missing=()):
+        self.has = {'fetchTickers': batch}
+        self.batch_fails = batch_fails
+        self.missing = set(missing)
+        self.batch_calls = []
+        self.single_calls = []
+        self.lock = threading.Lock()
+
+    def fetch_tickers(self, symbols=None):
+        self.batch_calls.append(symbols)
+        if self.batch_fails:
+            raise ccxt.NetworkError("batch endpoint down")
+        # Exchanges may return more markets than asked for
+        return {symbol: {'symbol': symbol, 'last': 1.0} for symbol in ['BTC/USD', 'ETH/USD', 'SOL/USD']}
+
+    def fetch_ticker(self, symbol):
+        with self.lock:
+            self.single_calls.append(symbol)
+        if symbol in self.missing:
+            raise ccxt.BadSymbol(symbol)
+        return {'symbol': symbol, 'last': 2.0}
+
+
+def test_batch_fetch_keeps_only_the_requested_symbols():
+    exchange = Exchange()
+    progress = []
+    snapshot = TickerSnapshot(exchange)
+    tickers = snapshot.refresh(['BTC/USD', 'ETH/USD'], progress=lambda *args: progress.append(args))
+
+    assert set(tickers) == {'BTC/USD', 'ETH/USD'} and snapshot.get('SOL/USD') is None
+    assert exchange.batch_calls == [['BTC/USD', 'ETH/USD']] and exchange.single_calls == []
+    assert progress == [(2, 2)] and snapshot.timestamp is not None
+
+
+def test_per_symbol_fetch_without_a_batch_endpoint_skips_failures():
+    exchange = Exchange(batch=False, missing=['DOGE/USD'])
+    progress = []
+    snapshot = TickerSnapshot(exchange, max_workers=2)
+    tickers = snapshot.refresh(['BTC/USD', 'ETH/USD', 'DOGE/USD'], progress=lambda *args: progress.append(args))
+
+    assert set(tickers) == {'BTC/USD', 'ETH/USD'}
+    assert sorted(exchange.single_calls) == ['BTC/USD', 'DOGE/USD', 'ETH/USD'] and exchange.batch_calls == []
+    assert [done for done, total in progress] == [1, 2, 3]
+
+
+def test_failed_batch_falls_back_to_per_symbol_fetch_and_merges_the_snapshot():
+    exchange = Exchange()
+    snapshot = TickerSnapshot(exchange)
+    snapshot.refresh(['SOL/USD'])
+
+    exchange.batch_fails = True
+    tickers = snapshot.refresh(['BTC/USD'])
+    assert tickers == {'BTC/USD': {'symbol': 'BTC/USD', 'last': 2.0}}
+    assert exchange.single_calls == ['BTC/USD']
+    # Earlier tickers stay in the snapshot
+    assert snapshot.get('SOL/USD')['last'] == 1.0
+
+
+def test_cancel_stops_the_per_symbol_fetch():
+    exchange = Exchange(batch=False)
+    cancel_event = threading.Event()
+    cancel_event.set()
+    tickers = TickerSnapshot(exchange, max_workers=1).refresh([f'C{i}/USD' for i in range(50)],
+                                                              cancel_event=cancel_event)
+    assert len(tickers) < 50 and len(exchange.single_calls) < 50
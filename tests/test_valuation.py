@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+from valuation import PriceGraph, ValuationEngine
+
+
+def sell(symbol, price, amount, remaining=None):
+    return {'id': symbol + str(price), 'symbol': symbol, 'side': 'sell', 'status': 'open', 'price': price,
+            'amount': amount, 'remaining': remaining}
+
+
+def test_usdt_only_venue_values_in_usd_through_the_peg():
+    tickers = {'BTC/USDT': {'last': 100.0}, 'ETH/BTC': {'last': 0.5}}
+    graph = PriceGraph(tickers, 'USD')
+
+    assert graph.price('USDT') == 1.0
+    assert graph.price('BTC') == pytest.approx(100.0)
+    assert graph.price('ETH') == pytest.approx(50.0)
+    assert np.isnan(graph.price('DOGE'))
+
+
+def test_a_market_against_the_valuation_currency_beats_the_peg():
+    graph = PriceGraph({'USDT/USD': {'last': 0.99}, 'BTC/USDT': {'last': 100.0}}, 'USD')
+
+    assert graph.price('USDT') == pytest.approx(0.99)
+    assert graph.price('BTC') == pytest.approx(99.0)
+
+
+def test_value_counts_remaining_amounts_and_falls_back_to_the_order_amount():
+    tickers = {'BTC/USDT': {'last': 100.0}, 'ETH/USDC': {'last': 10.0}}
+    orders = [sell('BTC/USDT', 150.0, 2.0, remaining=1.0), sell('ETH/USDC', '20', 3.0),
+              {**sell('BTC/USDT', 200.0, 1.0), 'side': 'buy'}]
+
+    valuation = ValuationEngine('USD').value({'BTC': 1.0, 'USDT': 50.0}, orders, tickers)
+
+    assert valuation.currencies == ['BTC', 'ETH', 'USDT']
+    assert list(valuation.current_value) == pytest.approx([100.0, 0.0, 50.0])
+    assert list(valuation.potential_gain) == pytest.approx([150.0, 60.0, 0.0])
+    assert list(valuation.percentage_gain) == pytest.approx([50.0, 100.0, 0.0])
+
+
+def test_value_without_orders():
+    valuation = ValuationEngine('USD').value({'BTC': 1.0}, [], {'BTC/USDT': {'last': 100.0}})
+
+    assert valuation.total_current_value == pytest.approx(100.0)
+    assert valuation.total_potential_gain == 0.0
+
+
+def test_symbols_for_hops_through_pegged_quotes():
+    markets = {symbol: {'symbol': symbol, 'base': symbol.split('/')[0], 'quote': symbol.split('/')[1],
+                        'active': True}
+               for symbol in ('ETH/BTC', 'BTC/USDT', 'SOL/USDC')}
+
+    assert ValuationEngine('USD').symbols_for(markets, {'ETH', 'SOL'}) == ['BTC/USDT', 'ETH/BTC', 'SOL/USDC']
@@ -0,0 +1,72 @@
+from workers import TaskRunner
+
+
+class ManualPool:
+    """Thread pool stand-in that runs workers on the test thread when asked, so signals arrive directly."""
+
+    def __init__(self):
+        self.started = []
+
+    def start(self, worker):
+        self.started.append(worker)
+
+    def run_all(self):
+        while self.started:
+            self.started.pop(0).run()
+
+
+def test_a_key_in_flight_coalesces_submits_until_it_finishes():
+    pool = ManualPool()
+    runner = TaskRunner(pool=pool)
+    results = []
+
+    first, started = runner.submit('balances', lambda task: 'first', on_result=results.append)
+    again, started_again = runner.submit('balances', lambda task: 'second', on_result=results.append)
+    assert started and not started_again and again is first
+    assert runner.is_running('balances') and len(pool.started) == 1
+
+    pool.run_all()
+    assert results == ['first'] and not runner.is_running('balances')
+    _, started = runner.submit('balances', lambda task: 'third', on_result=results.append)
+    assert started
+
+
+def test_a_cancelled_task_delivers_no_result():
+    pool = ManualPool()
+    runner = TaskRunner(pool=pool)
+    results, seen_cancelled = [], []
+
+    def fetch(task):
+        seen_cancelled.append(task.is_cancelled())
+        return 'stale'
+
+    runner.submit('pairs', fetch, on_result=results.append)
+    runner.cancel('pairs')
+    pool.run_all()
+    assert seen_cancelled == [True] and results == []
+    assert not runner.is_running('pairs')
+
+
+def test_errors_and_progress_reach_their_slots():
+    pool = ManualPool()
+    runner = TaskRunner(pool=pool)
+    errors, progress, results = [], [], []
+
+    def fail(task, total):
+        task.progress(1, total)
+        raise RuntimeError("exchange down")
+
+    runner.submit('orders', fail, 3, on_result=results.append, on_error=errors.append,
+                  on_progress=lambda done, total: progress.append((done, total)))
+    pool.run_all()
+    assert errors == ["exchange down"] and progress == [(1, 3)] and results == []
+    assert not runner.is_running('orders')
+
+
+def test_cancel_all_reaches_every_task_in_flight():
+    pool = ManualPool()
+    runner = TaskRunner(pool=pool)
+    a, _ = runner.submit('a', lambda task: None)
+    b, _ = runner.submit('b', lambda task: None)
+    runner.cancel_all()
+    assert a.task.is_cancelled() and b.task.is_cancelled()
@@ -0,0 +1,85 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import time
+
+
+class TickerSnapshot:
+    """In-memory snapshot of exchange tickers, fetched in as few round trips as possible."""
+
+    def __init__(self, exchange, max_workers=8):
+        """
+        Initialize the ticker snapshot.
+
+        Args:
+            exchange (ccxt.Exchange): Exchange instance used to fetch tickers.
+            max_workers (int): Maximum concurrent fetch_ticker calls when the
+                exchange has no batch ticker endpoint.
+        """
+        self.exchange = exchange
+        self.max_workers = max_workers
+        self.tickers = {}
+        self.timestamp = None
+
+    def refresh(self, symbols, progress=None, cancel_event=None):
+        """
+        Fetch tickers for the given symbols and merge them into the snapshot.
+
+        Uses a single fetch_tickers call when the exchange supports it and
+        falls back to a bounded pool of fetch_ticker calls otherwise.
+
+        Args:
+            symbols (list): Market symbols (e.g., ['BTC/USD', 'ETH/USD']).
+            progress (callable, optional): Called with (done, total) as tickers arrive.
+            cancel_event (threading.Event, optional): Stops pending per-symbol fetches when set.
+
+        Returns:
+            dict: The fetched tickers keyed by symbol. Symbols that could not be fetched are omitted.
+        """
+        symbols = list(symbols)
+        tickers = None
+
+        if self.exchange.has.get('fetchTickers', False):
+            try:
+                tickers = self._fetch_batch(symbols)
+            except Exception as e:
+                print(f"Error fetching tickers in batch, falling back to per-symbol fetch: {e}")
+
+        if tickers is None:
+            tickers = self._fetch_concurrent(symbols, progress, cancel_event)
+        elif progress:
+            progress(len(symbols), len(symbols))
+
+        self.tickers = {**self.tickers, **tickers}
+        self.timestamp = time.time()
+        return tickers
+
+    def get(self, symbol):
+        """Return the ticker for a symbol from the current snapshot, or None."""
+        return self.tickers.get(symbol)
+
+    def _fetch_batch(self, symbols):
+        """Fetch all tickers in one call, keeping only the requested symbols."""
+        wanted = set(symbols)
+        result = self.exchange.fetch_tickers(symbols)
+        return {symbol: ticker for symbol, ticker in result.items() if symbol in wanted}
+
+    def _fetch_concurrent(self, symbols, progress=None, cancel_event=None):
+        """Fetch tickers one symbol at a time with bounded concurrency."""
+        tickers = {}
+        if not symbols:
+            return tickers
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(self.exchange.fetch_ticker, symbol): symbol for symbol in symbols}
+            for done, future in enumerate(as_completed(futures), start=1):
+                symbol = futures[future]
+                try:
+                    tickers[symbol] = future.result()
+                except Exception as e:
+                    print(f"Error fetching ticker for {symbol}: {e}")
+                if progress:
+                    progress(done, len(symbols))
+                if cancel_event is not None and cancel_event.is_set():
+                    for pending in futures:
+                        pending.cancel()
+                    break
+        return tickers
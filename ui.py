@@ -1,12 +1,23 @@
 from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, 
                             QTableView, QPushButton, QLabel, 
-                            QGroupBox, QSplitter, QMessageBox, QHBoxLayout, QTabWidget, QSpinBox, QDoubleSpinBox)
-from PyQt5.QtCore import Qt
+                            QGroupBox, QSplitter, QMessageBox, QHBoxLayout, QTabWidget, QSpinBox, QDoubleSpinBox,
+                            QCheckBox, QComboBox)
+from PyQt5.QtCore import Qt, QTimer
 from account_value_model import AccountValueTableModel
+from candlestick_chart import create_candlestick_chart
+from coin_pairs_model import CoinPairsTableModel
+from paper_trades_model import PaperTradesTableModel
+from streaming import StreamingSession
 from usd_pairs_model import USDPairsTableModel
-import traceback
+from workers import TaskRunner
 import time
 
+# How often ladders are topped up while "Keep Ladders Replenished" is checked
+REPLENISH_INTERVAL_MS = 5 * 60 * 1000
+
+# Resolution of the volume spike scanner
+SIGNAL_SCAN_INTERVAL_MS = 60 * 1000
+
 class UI(QMainWindow):
     """Main window"""
     
@@ -15,12 +26,22 @@ class UI(QMainWindow):
         self.coinbase_client = coinbase_client
         self.account_value_model = AccountValueTableModel()
         self.usd_pairs_model = USDPairsTableModel()
+        self.coin_pairs_model = CoinPairsTableModel()
+        self.replenish_timer = QTimer(self)
+        self.replenish_timer.setInterval(REPLENISH_INTERVAL_MS)
+        self._replenish_params = None
+        self.paper_trades_model = PaperTradesTableModel()
+        self.signal_timer = QTimer(self)
+        self.signal_timer.setInterval(SIGNAL_SCAN_INTERVAL_MS)
+        self.task_runner = TaskRunner(self)
+        self.streaming_session = StreamingSession(coinbase_client.clients)
         
         self.init_ui()
         self.setup_connections()
         
-        # Initial data fetch
-        self.refresh_data()
+        # Show the last recorded state right away, then fetch fresh data once the window is up
+        self.show_last_state()
+        QTimer.singleShot(0, self.refresh_data)
     
     def init_ui(self):
         """Set up the user interface."""
@@ -53,6 +74,7 @@ class UI(QMainWindow):
         self.account_table = QTableView()
         self.account_table.setModel(self.account_value_model)
         self.account_table.setSortingEnabled(True)
+        self.account_table.sortByColumn(2, Qt.DescendingOrder)
         self.account_table.setAlternatingRowColors(True)
         self.account_table.horizontalHeader().setStretchLastSection(True)
         self.account_table.setSelectionBehavior(QTableView.SelectRows)
@@ -104,6 +126,9 @@ class UI(QMainWindow):
         self.refresh_button = QPushButton("Refresh Data")
         main_tab_layout.addWidget(self.refresh_button)
         
+        self.live_updates_checkbox = QCheckBox("Live Updates (WebSocket)")
+        main_tab_layout.addWidget(self.live_updates_checkbox)
+        
         # Add main tab to tab widget
         tab_widget.addTab(main_tab, "Order Tracker")
         
@@ -117,8 +142,24 @@ class UI(QMainWindow):
         coin_pairs_label = QLabel("Coin Pairs:")
         fat_finger_layout.addWidget(coin_pairs_label)
         self.coin_pairs_list = QTableView()
-        #self.coin_pairs_list.setModel(self.coin_pairs_model)  # You need to create this model
+        self.coin_pairs_list.setModel(self.coin_pairs_model)
+        self.coin_pairs_list.setAlternatingRowColors(True)
+        self.coin_pairs_list.horizontalHeader().setStretchLastSection(True)
         fat_finger_layout.addWidget(self.coin_pairs_list)
+        
+        # Selection buttons
+        coin_pairs_buttons_widget = QWidget()
+        coin_pairs_buttons_layout = QHBoxLayout(coin_pairs_buttons_widget)
+        
+        self.select_all_coin_pairs_button = QPushButton("Select All")
+        self.deselect_all_coin_pairs_button = QPushButton("Deselect All")
+        self.refresh_coin_pairs_button = QPushButton("Refresh Pairs")
+        
+        coin_pairs_buttons_layout.addWidget(self.select_all_coin_pairs_button)
+        coin_pairs_buttons_layout.addWidget(self.deselect_all_coin_pairs_button)
+        coin_pairs_buttons_layout.addWidget(self.refresh_coin_pairs_button)
+        
+        fat_finger_layout.addWidget(coin_pairs_buttons_widget)
 
         # UI for placing limit buy orders
         order_ui_label = QLabel("Place Limit Buy Orders:")
@@ -140,11 +181,26 @@ class UI(QMainWindow):
         order_ui_layout.addWidget(QLabel("Percentage Below Moving Average:"))
         order_ui_layout.addWidget(self.percentage_input)
         
+        # USD per order input
+        self.order_usd_input = QDoubleSpinBox()
+        self.order_usd_input.setRange(1, 10000)
+        self.order_usd_input.setValue(10)
+        self.order_usd_input.setPrefix("$")
+        order_ui_layout.addWidget(QLabel("USD per Order:"))
+        order_ui_layout.addWidget(self.order_usd_input)
+        
         # Place orders button
         self.place_orders_button = QPushButton("Place Orders")
         order_ui_layout.addWidget(self.place_orders_button)
         
+        self.replenish_checkbox = QCheckBox("Keep Ladders Replenished")
+        order_ui_layout.addWidget(self.replenish_checkbox)
+        
         fat_finger_layout.addWidget(order_ui_widget)
+        
+        # Fat finger status
+        self.fat_finger_status = QLabel("Refresh pairs, select coins and click Place Orders")
+        fat_finger_layout.addWidget(self.fat_finger_status)
         tab_widget.addTab(fat_finger_tab, "Fat Finger Catcher")
         
         # Create Market Buy tab
@@ -194,6 +250,10 @@ class UI(QMainWindow):
         self.execute_buy_button.setStyleSheet("background-color: #4CAF50; color: white; font-weight: bold;")
         buy_layout.addWidget(self.execute_buy_button)
         
+        self.stop_market_buy_button = QPushButton("Stop")
+        self.stop_market_buy_button.setEnabled(False)
+        buy_layout.addWidget(self.stop_market_buy_button)
+        
         market_buy_layout.addWidget(buy_widget)
         
         # Market buy status
@@ -202,6 +262,65 @@ class UI(QMainWindow):
         
         tab_widget.addTab(market_buy_tab, "Market Buy")
         
+        # Create Signals tab
+        signals_tab = QWidget()
+        signals_layout = QVBoxLayout(signals_tab)
+        
+        signals_label = QLabel("<h2>Volume Spike Signals</h2>")
+        signals_desc = QLabel("Scans every market each minute for abnormal volume and paper-trades each spike.")
+        signals_desc.setWordWrap(True)
+        signals_layout.addWidget(signals_label)
+        signals_layout.addWidget(signals_desc)
+        
+        self.paper_trades_table = QTableView()
+        self.paper_trades_table.setModel(self.paper_trades_model)
+        self.paper_trades_table.setAlternatingRowColors(True)
+        self.paper_trades_table.horizontalHeader().setStretchLastSection(True)
+        signals_layout.addWidget(self.paper_trades_table)
+        
+        self.signals_checkbox = QCheckBox("Scan Markets Every Minute")
+        signals_layout.addWidget(self.signals_checkbox)
+        
+        self.signals_status = QLabel("Scanner stopped")
+        signals_layout.addWidget(self.signals_status)
+        
+        tab_widget.addTab(signals_tab, "Signals")
+        
+        # Create Charts tab
+        charts_tab = QWidget()
+        charts_layout = QVBoxLayout(charts_tab)
+        
+        chart_controls_widget = QWidget()
+        chart_controls_layout = QHBoxLayout(chart_controls_widget)
+        
+        self.chart_exchange_input = QComboBox()
+        self.chart_exchange_input.addItems(list(self.coinbase_client.clients))
+        self.chart_symbol_input = QComboBox()
+        self.chart_symbol_input.setEditable(True)
+        self.chart_symbol_input.setMinimumWidth(140)
+        self.chart_timeframe_input = QComboBox()
+        self.chart_timeframe_input.addItems(["1m", "5m", "15m", "1h", "4h", "1d"])
+        self.chart_timeframe_input.setCurrentText("1h")
+        self.load_chart_button = QPushButton("Load Chart")
+        
+        chart_controls_layout.addWidget(QLabel("Exchange:"))
+        chart_controls_layout.addWidget(self.chart_exchange_input)
+        chart_controls_layout.addWidget(QLabel("Symbol:"))
+        chart_controls_layout.addWidget(self.chart_symbol_input)
+        chart_controls_layout.addWidget(QLabel("Timeframe:"))
+        chart_controls_layout.addWidget(self.chart_timeframe_input)
+        chart_controls_layout.addWidget(self.load_chart_button)
+        chart_controls_layout.addStretch()
+        charts_layout.addWidget(chart_controls_widget)
+        
+        self.candlestick_chart = create_candlestick_chart()
+        charts_layout.addWidget(self.candlestick_chart, 1)
+        
+        self.chart_status = QLabel("Scroll to zoom, drag to pan. Dashed lines are open orders.")
+        charts_layout.addWidget(self.chart_status)
+        
+        tab_widget.addTab(charts_tab, "Charts")
+        
         # Add tab widget to main layout
         main_layout.addWidget(tab_widget)
         
@@ -210,43 +329,106 @@ class UI(QMainWindow):
     def setup_connections(self):
         """Set up signal/slot connections."""
         self.refresh_button.clicked.connect(self.refresh_data)
+        self.live_updates_checkbox.toggled.connect(self.toggle_live_updates)
+        self.streaming_session.update.connect(self.apply_stream_update)
+        self.streaming_session.status.connect(self.status_label.setText)
         self.account_table.selectionModel().selectionChanged.connect(self.update_stats_for_selected_coin)
         self.cancel_orders_button.clicked.connect(self.cancel_all_orders)
         self.market_sell_button.clicked.connect(self.market_sell_entire_position)
         
+        # Fat finger tab connections
+        self.select_all_coin_pairs_button.clicked.connect(self.coin_pairs_model.select_all)
+        self.deselect_all_coin_pairs_button.clicked.connect(self.coin_pairs_model.deselect_all)
+        self.refresh_coin_pairs_button.clicked.connect(self.refresh_coin_pairs)
+        self.place_orders_button.clicked.connect(self.place_fat_finger_orders)
+        self.replenish_checkbox.toggled.connect(self.toggle_replenish)
+        self.replenish_timer.timeout.connect(self.replenish_ladders)
+        
+        # Signals tab connections
+        self.signals_checkbox.toggled.connect(self.toggle_signal_scanner)
+        self.signal_timer.timeout.connect(self.scan_volume_spikes)
+        
+        # Charts tab connections
+        self.load_chart_button.clicked.connect(self.load_chart)
+        self.chart_exchange_input.currentTextChanged.connect(self._update_chart_symbols)
+        
         # Market buy tab connections
         self.select_all_button.clicked.connect(self.select_all_pairs)
         self.deselect_all_button.clicked.connect(self.deselect_all_pairs)
         self.refresh_pairs_button.clicked.connect(self.refresh_usd_pairs)
         self.execute_buy_button.clicked.connect(self.execute_market_buy)
+        self.stop_market_buy_button.clicked.connect(self.stop_market_buy_tasks)
+    
+    def closeEvent(self, event):
+        """Cancel background tasks so their results are not delivered to a closed window."""
+        self.task_runner.cancel_all()
+        self.replenish_timer.stop()
+        self.signal_timer.stop()
+        self.streaming_session.stop()
+        self.coinbase_client.close()
+        super().closeEvent(event)
+    
+    def show_task_error(self, status_label, prefix, message):
+        """Report a failed background task in a status label and a message box."""
+        error_message = f"{prefix}: {message}"
+        status_label.setText(error_message)
+        QMessageBox.critical(self, "Error", error_message)
     
     def refresh_data(self):
-        """Refresh all data from Coinbase."""
-
-        try:
+        """Refresh all data from the exchange in the background."""
+        _, started = self.task_runner.submit(
+            'refresh_data', self._fetch_account_data,
+            on_result=self._apply_account_data,
+            on_error=lambda message: self.show_task_error(self.status_label, "Error refreshing data", message))
+        if started:
             self.status_label.setText("Refreshing data...")
-            
-            # Fetch data via WebSocket and get updated account values
-            self.coinbase_client.refresh_data()
-            
-            # Get open orders
-            orders = self.coinbase_client.get_open_orders()
-            
-            # Update account values in the model
-            self.account_value_model.update_account_values(self.coinbase_client.balances, orders)
-            
-            self.total_potential_gain_label.setText(f"Total Potential Gain: {self.coinbase_client.total_potential_gain:.8f}")
-            
-            # Resize table columns to contents
-            self.account_table.resizeColumnsToContents()
-            
-            self.status_label.setText(f"Data refreshed at {time.strftime('%H:%M:%S')}")
+    
+    def _fetch_account_data(self, task):
+        """Worker: fetch balances and open orders and compute account values."""
+        account_values = self.coinbase_client.refresh_data()
+        return account_values, self.coinbase_client.open_order_counts()
+    
+    def _apply_account_data(self, result):
+        """Push freshly fetched account data into the views."""
+        account_values, open_order_counts = result
+        
+        # Update account values in the model
+        self.account_value_model.update_account_values(account_values, open_order_counts)
+        
+        self.total_potential_gain_label.setText(f"Total Potential Gain: {self.coinbase_client.total_potential_gain:.8f}")
         
-        except Exception as e:
-            error_message = f"Error refreshing data: {str(e)}"
-            self.status_label.setText(error_message)
-            QMessageBox.critical(self, "Error", error_message)
-            traceback.print_exc()
+        # Resize table columns to contents
+        self.account_table.resizeColumnsToContents()
+        
+        self.status_label.setText(f"Data refreshed at {time.strftime('%H:%M:%S')}")
+        self._update_chart_symbols()
+    
+    def show_last_state(self):
+        """Render the account snapshot recorded by the previous session, if any."""
+        timestamp = self.coinbase_client.restore_last_state()
+        if timestamp is None:
+            return
+        self._apply_account_data((self.coinbase_client.account_values, self.coinbase_client.open_order_counts()))
+        self.status_label.setText(f"Showing data from {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(timestamp / 1000))}")
+    
+    def toggle_live_updates(self, enabled):
+        """Start or stop streaming balances, orders and tickers."""
+        if enabled:
+            self.streaming_session.start()
+            self.status_label.setText("Live updates started")
+        else:
+            self.streaming_session.stop()
+    
+    def apply_stream_update(self, exchange, kind, payload):
+        """Apply a streamed update to the client and push only the changed rows into the table."""
+        changed = self.coinbase_client.apply_stream_update(exchange, kind, payload)
+        if not changed:
+            return
+        
+        self.account_value_model.update_rows(self.coinbase_client.account_values,
+                                             self.coinbase_client.open_order_counts(changed), changed)
+        self.total_potential_gain_label.setText(f"Total Potential Gain: {self.coinbase_client.total_potential_gain:.8f}")
+        self.status_label.setText(f"Live update at {time.strftime('%H:%M:%S')}")
     
     def cancel_all_orders(self):
         """Cancel all orders for the selected coin."""
@@ -255,17 +437,24 @@ class UI(QMainWindow):
             QMessageBox.warning(self, "Warning", "No coin selected.")
             return
         
-        selected_index = selected_indexes[0]
-        coin = self.account_value_model.data(selected_index, Qt.DisplayRole)
+        exchange, coin = self.account_value_model.row_key(selected_indexes[0].row())
         
-        try:
-            self.coinbase_client.cancel_all_orders(coin)
-            QMessageBox.information(self, "Success", f"All orders for {coin} have been canceled.")
+        def on_done(results):
+            if results['failed']:
+                failed_details = "\n".join([f"{item['order_id']}: {item['error']}" for item in results['failed']])
+                QMessageBox.warning(self, "Partial Cancel",
+                                    f"Canceled {len(results['success'])} orders for {coin}.\n\n"
+                                    f"Failed:\n{failed_details}")
+            else:
+                QMessageBox.information(self, "Success", f"All orders for {coin} on {exchange} have been canceled.")
             self.refresh_data()
-        except Exception as e:
-            error_message = f"Error canceling orders: {str(e)}"
-            QMessageBox.critical(self, "Error", error_message)
-            traceback.print_exc()
+        
+        self.status_label.setText(f"Canceling orders for {coin}...")
+        self.task_runner.submit(
+            f'cancel_all_orders:{exchange}:{coin}',
+            lambda task: self.coinbase_client.cancel_all_orders(exchange, currency=coin),
+            on_result=on_done,
+            on_error=lambda message: self.show_task_error(self.status_label, "Error canceling orders", message))
     
     def market_sell_entire_position(self):
         """Market sell the entire position for the selected coin."""
@@ -274,17 +463,18 @@ class UI(QMainWindow):
             QMessageBox.warning(self, "Warning", "No coin selected.")
             return
         
-        selected_index = selected_indexes[0]
-        coin = self.account_value_model.data(selected_index, Qt.DisplayRole)
+        exchange, coin = self.account_value_model.row_key(selected_indexes[0].row())
         
-        try:
-            self.coinbase_client.market_sell_entire_position(coin)
-            QMessageBox.information(self, "Success", f"Entire position for {coin} has been sold.")
+        def on_done(_):
+            QMessageBox.information(self, "Success", f"Entire position for {coin} on {exchange} has been sold.")
             self.refresh_data()
-        except Exception as e:
-            error_message = f"Error selling position: {str(e)}"
-            QMessageBox.critical(self, "Error", error_message)
-            traceback.print_exc()
+        
+        self.status_label.setText(f"Selling {coin}...")
+        self.task_runner.submit(
+            f'market_sell:{exchange}:{coin}',
+            lambda task: self.coinbase_client.market_sell_entire_position(exchange, coin),
+            on_result=on_done,
+            on_error=lambda message: self.show_task_error(self.status_label, "Error selling position", message))
     
     def update_stats_for_selected_coin(self):
         """Update stats for the selected coin in the account table."""
@@ -292,45 +482,196 @@ class UI(QMainWindow):
         if not selected_indexes:
             return
         
-        selected_index = selected_indexes[0]
-        coin = self.account_value_model.data(selected_index, Qt.DisplayRole)
+        exchange, coin = self.account_value_model.row_key(selected_indexes[0].row())
         
         # Find the corresponding account value
-        if coin in self.coinbase_client.balances:
-            coin_info = self.coinbase_client.balances[coin]
-            potential_gain = coin_info.potential_gain
+        if (exchange, coin) in self.coinbase_client.account_values:
+            coin_info = self.coinbase_client.account_values[(exchange, coin)]
             current_value = coin_info.current_value
-            percentage_gain = ((potential_gain - current_value) / current_value) * 100 if current_value != 0 else 0
+            percentage_gain = coin_info.percentage_gain
             
             # Update stats labels
-            self.total_orders_label.setText(f"Total Orders: {len([order for order in self.coinbase_client.get_open_orders() if order['product_id'].startswith(coin)])}")
+            self.total_orders_label.setText(f"Total Orders: {len(self.coinbase_client.get_open_orders_for_currency(exchange, coin))}")
             self.current_value_label.setText(f"Current Total Value: {current_value:.2f} USD")
             self.percentage_gain_label.setText(f"Percentage Gain: {percentage_gain:.2f}%")
     
+    def refresh_coin_pairs(self):
+        """Refresh the Fat Finger Catcher pairs and their moving averages in the background."""
+        _, started = self.task_runner.submit(
+            'coin_pairs', lambda task: self.coinbase_client.get_fat_finger_pairs(
+                progress=task.progress, cancel_event=task.cancel_event),
+            on_result=self._apply_coin_pairs,
+            on_progress=lambda done, total: self.fat_finger_status.setText(f"Fetching candles... {done}/{total}"),
+            on_error=lambda message: self.show_task_error(self.fat_finger_status, "Error fetching pairs", message))
+        if started:
+            self.fat_finger_status.setText("Fetching pairs...")
+    
+    def _apply_coin_pairs(self, pairs):
+        self.coin_pairs_model.update_pairs(pairs)
+        self.coin_pairs_list.resizeColumnsToContents()
+        self.fat_finger_status.setText(f"Found {len(pairs)} pairs")
+    
+    def _ladder_params(self):
+        """Return (symbols, num_orders, percentage, usd_per_order) from the Fat Finger inputs, or None."""
+        symbols = self.coin_pairs_model.get_selected_pairs()
+        if not symbols:
+            QMessageBox.warning(self, "Warning", "No coin pairs selected.")
+            return None
+        
+        params = (symbols, self.num_orders_input.value(), self.percentage_input.value(), self.order_usd_input.value())
+        _, num_orders, percentage, usd_per_order = params
+        confirm_msg = (f"Place up to {num_orders} limit buys of ${usd_per_order} on {len(symbols)} pairs, "
+                       f"every {percentage}% below the moving average?\n"
+                       f"Maximum total: ${usd_per_order * num_orders * len(symbols):.2f}")
+        reply = QMessageBox.question(self, "Confirm Limit Buys", confirm_msg, QMessageBox.Yes | QMessageBox.No)
+        if reply == QMessageBox.No:
+            return None
+        return params
+    
+    def place_fat_finger_orders(self):
+        """Place ladders of limit buys below the moving average of the selected pairs."""
+        if self.task_runner.is_running('fat_finger'):
+            QMessageBox.warning(self, "Warning", "Orders are already being placed.")
+            return
+        
+        params = self._ladder_params()
+        if params is not None:
+            self._run_ladders(params, on_result=self._show_fat_finger_results)
+    
+    def toggle_replenish(self, enabled):
+        """Periodically top up the ladders with the current inputs while checked."""
+        if not enabled:
+            self.replenish_timer.stop()
+            self._replenish_params = None
+            return
+        
+        self._replenish_params = self._ladder_params()
+        if self._replenish_params is None:
+            self.replenish_checkbox.setChecked(False)
+            return
+        self.replenish_ladders()
+        self.replenish_timer.start()
+    
+    def replenish_ladders(self):
+        """Place the rungs missing from the replenished ladders."""
+        if self._replenish_params is not None:
+            self._run_ladders(self._replenish_params, on_result=lambda results: self.fat_finger_status.setText(
+                f"Ladders replenished at {time.strftime('%H:%M:%S')}: "
+                f"{len(results['success'])} placed, {len(results['failed'])} failed"))
+    
+    def _run_ladders(self, params, on_result):
+        symbols, num_orders, percentage, usd_per_order = params
+        _, started = self.task_runner.submit(
+            'fat_finger', lambda task: self.coinbase_client.place_fat_finger_orders(
+                symbols, num_orders, percentage, usd_per_order,
+                progress=task.progress, cancel_event=task.cancel_event),
+            on_result=on_result,
+            on_progress=lambda done, total: self.fat_finger_status.setText(f"Placing orders... {done}/{total}"),
+            on_error=lambda message: self.show_task_error(self.fat_finger_status, "Error placing orders", message))
+        if started:
+            self.fat_finger_status.setText(f"Placing ladders on {len(symbols)} pairs...")
+    
+    def _show_fat_finger_results(self, results):
+        success_count = len(results['success'])
+        failed_count = len(results['failed'])
+        
+        result_msg = f"Placed: {success_count}\nFailed: {failed_count}"
+        if results['failed']:
+            failed_details = "\n".join([f"{item['symbol']} @ {item['price']}: {item['error']}" for item in results['failed']])
+            result_msg += f"\n\nFailed orders:\n{failed_details}"
+        
+        QMessageBox.information(self, "Limit Buy Results", result_msg)
+        self.fat_finger_status.setText(f"Completed: {success_count} placed, {failed_count} failed")
+        self.refresh_data()
+    
+    def toggle_signal_scanner(self, enabled):
+        """Start or stop the once-a-minute volume spike scan."""
+        if enabled:
+            self.scan_volume_spikes()
+            self.signal_timer.start()
+            self.signals_status.setText("Collecting volume history...")
+        else:
+            self.signal_timer.stop()
+            self.signals_status.setText("Scanner stopped")
+    
+    def scan_volume_spikes(self):
+        """Run one scanner tick in the background."""
+        self.task_runner.submit(
+            'signals', lambda task: self.coinbase_client.scan_volume_spikes(),
+            on_result=self._apply_signals,
+            on_error=lambda message: self.signals_status.setText(f"Error scanning markets: {message}"))
+    
+    def _apply_signals(self, result):
+        self.paper_trades_model.update_trades(result['open'], result['closed'])
+        closed_count, win_rate, average_pnl = self.paper_trades_model.closed_summary()
+        self.signals_status.setText(
+            f"Scanned at {time.strftime('%H:%M:%S')}: {len(result['signals'])} spikes, "
+            f"{len(result['open'])} open paper trades, {closed_count} closed "
+            f"({win_rate:.0f}% winners, average {average_pnl:+.2f}%)")
+    
+    def _update_chart_symbols(self):
+        """Offer the symbols with open orders on the chart's exchange, keeping what was typed."""
+        exchange = self.chart_exchange_input.currentText()
+        if exchange not in self.coinbase_client.clients:
+            return
+        current = self.chart_symbol_input.currentText()
+        symbols = sorted(self.coinbase_client.clients[exchange].order_index.symbols())
+        self.chart_symbol_input.clear()
+        self.chart_symbol_input.addItems(symbols)
+        self.chart_symbol_input.setCurrentText(current or (symbols[0] if symbols else ""))
+    
+    def load_chart(self):
+        """Load candles and open orders for the chosen symbol in the background."""
+        exchange = self.chart_exchange_input.currentText()
+        symbol = self.chart_symbol_input.currentText().strip()
+        timeframe = self.chart_timeframe_input.currentText()
+        if not symbol:
+            QMessageBox.warning(self, "Warning", "No symbol entered.")
+            return
+        
+        def on_done(result):
+            candles, buy_prices, sell_prices = result
+            self.candlestick_chart.set_candles(candles)
+            self.candlestick_chart.set_order_lines(buy_prices, sell_prices)
+            self.chart_status.setText(f"{symbol} {timeframe}: {len(candles)} candles, "
+                                      f"{len(buy_prices)} buy and {len(sell_prices)} sell orders")
+        
+        self.chart_status.setText(f"Loading {symbol}...")
+        self.task_runner.submit(
+            f'chart:{exchange}:{symbol}:{timeframe}',
+            lambda task: self.coinbase_client.get_chart_data(exchange, symbol, timeframe),
+            on_result=on_done,
+            on_error=lambda message: self.show_task_error(self.chart_status, "Error loading chart", message))
+    
     def refresh_usd_pairs(self):
-        """Refresh the list of USD pairs under $20 threshold."""
-        try:
+        """Refresh the list of USD pairs under $20 threshold in the background."""
+        worker, started = self.task_runner.submit(
+            'usd_pairs', self._fetch_usd_pairs,
+            on_result=self._apply_usd_pairs,
+            on_progress=lambda done, total: self.market_buy_status.setText(f"Fetching prices... {done}/{total}"),
+            on_error=lambda message: self.show_task_error(self.market_buy_status, "Error fetching USD pairs", message))
+        if started:
             self.market_buy_status.setText("Fetching USD pairs...")
-            
-            # Fetch balances first
-            self.coinbase_client.fetch_balances()
-            
-            # Get USD pairs under threshold
-            pairs = self.coinbase_client.get_usd_pairs_under_threshold(threshold=20.0)
-            
-            # Update model
-            self.usd_pairs_model.update_pairs(pairs)
-            
-            # Resize columns
-            self.usd_pairs_table.resizeColumnsToContents()
-            
-            self.market_buy_status.setText(f"Found {len(pairs)} USD pairs under $20")
+            self.stop_market_buy_button.setEnabled(True)
+            worker.signals.finished.connect(self._on_market_buy_task_finished)
+    
+    def _fetch_usd_pairs(self, task):
+        """Worker: fetch balances then the USD pairs under threshold."""
+        # Fetch balances first
+        self.coinbase_client.fetch_balances()
+        
+        # Get USD pairs under threshold
+        return self.coinbase_client.get_usd_pairs_under_threshold(
+            threshold=20.0, progress=task.progress, cancel_event=task.cancel_event)
+    
+    def _apply_usd_pairs(self, pairs):
+        # Update model
+        self.usd_pairs_model.update_pairs(pairs)
+        
+        # Resize columns
+        self.usd_pairs_table.resizeColumnsToContents()
         
-        except Exception as e:
-            error_message = f"Error fetching USD pairs: {str(e)}"
-            self.market_buy_status.setText(error_message)
-            QMessageBox.critical(self, "Error", error_message)
-            traceback.print_exc()
+        self.market_buy_status.setText(f"Found {len(pairs)} USD pairs under $20")
     
     def select_all_pairs(self):
         """Select all USD pairs."""
@@ -340,8 +681,24 @@ class UI(QMainWindow):
         """Deselect all USD pairs."""
         self.usd_pairs_model.deselect_all()
     
+    def stop_market_buy_tasks(self):
+        """Cancel the running USD pair scan and market buy, if any."""
+        self.task_runner.cancel('usd_pairs')
+        self.task_runner.cancel('market_buy')
+        self.market_buy_status.setText("Stopping...")
+    
+    def _on_market_buy_task_finished(self):
+        running = self.task_runner.is_running('usd_pairs') or self.task_runner.is_running('market_buy')
+        self.stop_market_buy_button.setEnabled(running)
+        if not running and self.market_buy_status.text() == "Stopping...":
+            self.market_buy_status.setText("Stopped")
+    
     def execute_market_buy(self):
         """Execute market buy for selected pairs."""
+        if self.task_runner.is_running('market_buy'):
+            QMessageBox.warning(self, "Warning", "A market buy is already in progress.")
+            return
+        
         selected_symbols = self.usd_pairs_model.get_selected_pairs()
         
         if not selected_symbols:
@@ -361,32 +718,43 @@ class UI(QMainWindow):
         if reply == QMessageBox.No:
             return
         
-        try:
-            self.market_buy_status.setText(f"Executing market buy for {len(selected_symbols)} coins...")
-            
-            # Execute market buys
-            results = self.coinbase_client.market_buy_multiple(selected_symbols, usd_amount)
-            
-            # Show results
-            success_count = len(results['success'])
-            failed_count = len(results['failed'])
-            
-            result_msg = f"Success: {success_count}\nFailed: {failed_count}"
-            
-            if results['failed']:
-                failed_details = "\n".join([f"{item['symbol']}: {item['error']}" for item in results['failed']])
-                result_msg += f"\n\nFailed orders:\n{failed_details}"
-            
-            QMessageBox.information(self, "Market Buy Results", result_msg)
-            
-            self.market_buy_status.setText(f"Completed: {success_count} success, {failed_count} failed")
-            
-            # Refresh data
-            self.refresh_data()
-            self.refresh_usd_pairs()
+        self.market_buy_status.setText(f"Executing market buy for {len(selected_symbols)} coins...")
+        worker, _ = self.task_runner.submit(
+            'market_buy', self._run_market_buy, selected_symbols, usd_amount,
+            on_result=self._show_market_buy_results,
+            on_partial=lambda item: self.market_buy_status.setText(
+                f"{item[1]['symbol']}: {item[0]} ({item[1]['latency'] * 1000:.0f} ms)"),
+            on_error=lambda message: self.show_task_error(self.market_buy_status, "Error executing market buy", message))
+        worker.signals.finished.connect(self._on_market_buy_task_finished)
+        self.stop_market_buy_button.setEnabled(True)
+    
+    def _run_market_buy(self, task, symbols, usd_amount):
+        """Worker: place the market buys, streaming each order result."""
+        return self.coinbase_client.market_buy_multiple(
+            symbols, usd_amount,
+            on_result=lambda status, entry: task.partial((status, entry)),
+            cancel_event=task.cancel_event)
+    
+    def _show_market_buy_results(self, results):
+        # Show results
+        success_count = len(results['success'])
+        failed_count = len(results['failed'])
+        
+        result_msg = f"Success: {success_count}\nFailed: {failed_count}"
         
-        except Exception as e:
-            error_message = f"Error executing market buy: {str(e)}"
-            self.market_buy_status.setText(error_message)
-            QMessageBox.critical(self, "Error", error_message)
-            traceback.print_exc()
\ No newline at end of file
+        if results['success']:
+            latencies = sorted(item['latency'] for item in results['success'])
+            result_msg += (f"\nOrder latency: median {latencies[len(latencies) // 2] * 1000:.0f} ms, "
+                           f"max {latencies[-1] * 1000:.0f} ms")
+        
+        if results['failed']:
+            failed_details = "\n".join([f"{item['symbol']}: {item['error']}" for item in results['failed']])
+            result_msg += f"\n\nFailed orders:\n{failed_details}"
+        
+        QMessageBox.information(self, "Market Buy Results", result_msg)
+        
+        self.market_buy_status.setText(f"Completed: {success_count} success, {failed_count} failed")
+        
+        # Refresh data
+        self.refresh_data()
+        self.refresh_usd_pairs()
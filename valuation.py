@@ -0,0 +1,173 @@
+from collections import deque
+import numpy as np
+
+# Stablecoins valued at 1.0 in their reference currency when no market prices them against it,
+# so venues that only list USDT or USDC pairs still value in USD
+PEGGED = {
+    'USD': ('USDT', 'USDC', 'FDUSD', 'DAI', 'TUSD', 'USDP', 'PYUSD'),
+}
+
+
+class PriceGraph:
+    """Converts any currency into a valuation currency by walking ticker prices."""
+
+    def __init__(self, tickers, quote='USD', pegged=None):
+        """
+        Build the graph from a ticker snapshot.
+
+        Every market BASE/QUOTE with a last price links the two currencies in
+        both directions. Prices are resolved by breadth-first search from the
+        valuation currency, so each currency uses the shortest conversion path.
+        Pegged currencies the search does not reach are then priced at 1.0 and
+        searched from in turn.
+
+        Args:
+            tickers (dict): ccxt tickers keyed by symbol.
+            quote (str): Valuation currency every price is expressed in.
+            pegged (iterable, optional): Currencies worth 1.0 of quote. Defaults to PEGGED[quote].
+        """
+        edges = {}
+        for symbol, ticker in tickers.items():
+            last = ticker.get('last') or ticker.get('close')
+            if not last or '/' not in symbol:
+                continue
+            base, market_quote = symbol.split('/')
+            market_quote = market_quote.split(':')[0]
+            # One unit of base is worth `last` units of market_quote
+            edges.setdefault(market_quote, []).append((base, last))
+            edges.setdefault(base, []).append((market_quote, 1.0 / last))
+
+        self.quote = quote
+        self.prices = {quote: 1.0}
+        self._search(edges, [quote])
+        unreached = [currency for currency in (PEGGED.get(quote, ()) if pegged is None else pegged)
+                     if currency not in self.prices]
+        for currency in unreached:
+            self.prices[currency] = 1.0
+        self._search(edges, unreached)
+
+    def _search(self, edges, roots):
+        queue = deque(roots)
+        while queue:
+            currency = queue.popleft()
+            for other, rate in edges.get(currency, ()):
+                if other not in self.prices:
+                    self.prices[other] = rate * self.prices[currency]
+                    queue.append(other)
+
+    def price(self, currency):
+        """Return the price of one unit of currency in the valuation currency, or NaN if unreachable."""
+        return self.prices.get(currency, np.nan)
+
+
+class Valuation:
+    """Per-currency valuation arrays. Entry i of every array belongs to currencies[i]."""
+
+    def __init__(self, currencies, balances, prices, current_value, potential_gain, percentage_gain):
+        self.currencies = currencies
+        self.balances = balances
+        self.prices = prices
+        self.current_value = current_value
+        self.potential_gain = potential_gain
+        self.percentage_gain = percentage_gain
+
+    @property
+    def total_current_value(self):
+        return float(self.current_value.sum())
+
+    @property
+    def total_potential_gain(self):
+        return float(self.potential_gain.sum())
+
+
+class ValuationEngine:
+    """Values balances and open sell orders in one vectorized pass."""
+
+    def __init__(self, quote='USD', pegged=None):
+        """
+        Args:
+            quote (str): Valuation currency, e.g. 'USD'.
+            pegged (iterable, optional): Currencies worth 1.0 of quote. Defaults to PEGGED[quote].
+        """
+        self.quote = quote
+        self.pegged = tuple(PEGGED.get(quote, ()) if pegged is None else pegged)
+
+    def value(self, balances, open_orders, tickers):
+        """
+        Value every currency held or being sold.
+
+        Args:
+            balances (dict): Total balance keyed by currency.
+            open_orders (list): ccxt orders. Only open sell orders count towards potential gain.
+            tickers (dict): ccxt tickers keyed by symbol, used to build the price graph.
+
+        Returns:
+            Valuation: current value (balance at market price), potential gain (proceeds of
+            open sell orders) and percentage gain of those orders over the market value of
+            the coins they sell, all in the valuation currency.
+        """
+        graph = PriceGraph(tickers, self.quote, self.pegged)
+
+        # One pass copies the fields out of the order dicts; the conversions below run on whole columns
+        sells = np.array([
+            (order['symbol'], order['price'], order.get('remaining'), order['amount'])
+            for order in open_orders if order['side'] == 'sell' and order['status'] == 'open'
+        ], dtype=object).reshape(-1, 4)
+        order_symbols = sells[:, 0]
+        order_prices = sells[:, 1].astype(np.float64)
+        # Orders that do not report what remains count in full
+        order_amounts = np.where(np.equal(sells[:, 2], None), sells[:, 3], sells[:, 2]).astype(np.float64)
+
+        # Split each distinct symbol once, then broadcast back to the orders
+        if len(sells):
+            symbols, symbol_index = np.unique(order_symbols, return_inverse=True)
+        else:
+            symbols, symbol_index = np.array([], dtype=object), np.array([], dtype=np.intp)
+        symbol_bases = [symbol.split('/')[0] for symbol in symbols]
+        symbol_quotes = [symbol.split('/')[1].split(':')[0] for symbol in symbols]
+
+        currencies = sorted({currency for currency, amount in balances.items() if amount} | set(symbol_bases))
+        currency_index = {currency: i for i, currency in enumerate(currencies)}
+        count = len(currencies)
+
+        prices = np.array([graph.price(currency) for currency in currencies], dtype=np.float64)
+        balance_array = np.array([balances.get(currency) or 0.0 for currency in currencies], dtype=np.float64)
+
+        base_index = np.array([currency_index[base] for base in symbol_bases], dtype=np.intp)[symbol_index]
+        quote_prices = np.array([graph.price(quote) for quote in symbol_quotes], dtype=np.float64)[symbol_index]
+
+        proceeds = np.nan_to_num(order_prices * order_amounts * quote_prices)
+        potential_gain = np.bincount(base_index, weights=proceeds, minlength=count)
+        committed_value = np.nan_to_num(np.bincount(base_index, weights=order_amounts, minlength=count) * prices)
+        current_value = np.nan_to_num(balance_array * prices)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            percentage_gain = np.where(committed_value > 0,
+                                       (potential_gain - committed_value) / committed_value * 100, 0.0)
+
+        return Valuation(currencies, balance_array, prices, current_value, potential_gain, percentage_gain)
+
+    def symbols_for(self, markets, currencies):
+        """
+        Pick the markets whose tickers are needed to value the given currencies.
+
+        Includes every market of a currency plus, for each quote those markets
+        use, its market against the valuation currency or a currency pegged to
+        it, so currencies without a direct market are converted through one
+        intermediate hop.
+
+        Args:
+            markets (dict): ccxt markets keyed by symbol.
+            currencies (set): Currencies to value.
+
+        Returns:
+            list: Market symbols.
+        """
+        direct = [market for market in markets.values() if market['base'] in currencies and market['active'] is not False]
+        valued = {self.quote, *self.pegged}
+        hop_quotes = {market['quote'] for market in direct} - valued
+        hops = [
+            market for market in markets.values()
+            if market['base'] in hop_quotes and market['quote'] in valued and market['active'] is not False
+        ]
+        return sorted({market['symbol'] for market in direct + hops})
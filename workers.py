@@ -0,0 +1,115 @@
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+import threading
+import traceback
+
+
+class WorkerSignals(QObject):
+    """Signals emitted by a Worker. Delivered on the GUI thread."""
+
+    result = pyqtSignal(object)
+    error = pyqtSignal(str)
+    progress = pyqtSignal(int, int)
+    partial = pyqtSignal(object)
+    finished = pyqtSignal()
+
+
+class Task:
+    """Handle passed to background functions for reporting progress and checking cancellation."""
+
+    def __init__(self, signals):
+        self._signals = signals
+        self.cancel_event = threading.Event()
+
+    def progress(self, done, total):
+        """Report progress as a count of completed units out of a total."""
+        self._signals.progress.emit(done, total)
+
+    def partial(self, item):
+        """Stream a partial result back to the GUI thread."""
+        self._signals.partial.emit(item)
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def is_cancelled(self):
+        return self.cancel_event.is_set()
+
+
+class Worker(QRunnable):
+    """Runs a function on the thread pool, passing it a Task as the first argument."""
+
+    def __init__(self, fn, *args, **kwargs):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = WorkerSignals()
+        self.task = Task(self.signals)
+
+    def run(self):
+        try:
+            result = self.fn(self.task, *self.args, **self.kwargs)
+        except Exception as e:
+            traceback.print_exc()
+            self.signals.error.emit(str(e))
+        else:
+            if not self.task.is_cancelled():
+                self.signals.result.emit(result)
+        finally:
+            self.signals.finished.emit()
+
+
+class TaskRunner(QObject):
+    """Dispatches keyed background tasks, coalescing duplicates that are already in flight."""
+
+    def __init__(self, parent=None, pool=None):
+        super().__init__(parent)
+        self.pool = pool or QThreadPool.globalInstance()
+        self._in_flight = {}
+
+    def submit(self, key, fn, *args, on_result=None, on_error=None, on_progress=None,
+               on_partial=None, **kwargs):
+        """
+        Run fn(task, *args, **kwargs) in the background.
+
+        Args:
+            key (str): Identifies the task. A submit with the key of a task that
+                is still running is coalesced into the running task.
+            fn (callable): Function to run. Receives a Task as its first argument.
+            on_result, on_error, on_progress, on_partial (callable, optional):
+                Slots connected to the corresponding WorkerSignals.
+
+        Returns:
+            tuple: (Worker, bool) with the worker running the task and whether
+            a new worker was started.
+        """
+        if key in self._in_flight:
+            return self._in_flight[key], False
+
+        worker = Worker(fn, *args, **kwargs)
+        if on_result:
+            worker.signals.result.connect(on_result)
+        if on_error:
+            worker.signals.error.connect(on_error)
+        if on_progress:
+            worker.signals.progress.connect(on_progress)
+        if on_partial:
+            worker.signals.partial.connect(on_partial)
+        worker.signals.finished.connect(lambda: self._in_flight.pop(key, None))
+
+        self._in_flight[key] = worker
+        self.pool.start(worker)
+        return worker, True
+
+    def is_running(self, key):
+        return key in self._in_flight
+
+    def cancel(self, key):
+        """Request cancellation of a running task. Its result will not be delivered."""
+        worker = self._in_flight.get(key)
+        if worker:
+            worker.task.cancel()
+
+    def cancel_all(self):
+        for worker in list(self._in_flight.values()):
+            worker.task.cancel()